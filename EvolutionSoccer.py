@@ -1,113 +1,165 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
+import plotly.io as pio
 import os
-import requests
 from datetime import datetime
-from bs4 import BeautifulSoup
+from base_compartilhada import BaseCompartilhada
+from cache_wikipedia import obter_cache_wikipedia
+from cenarios import Cenario, comparar_tabelas, resultados_da_grade
+from classificacao import MotorClassificacao
+from eliminacao import SolverZonas
+from extrator_wikipedia import extrair_tabelas
+from gravador_tabelas import GravadorTabelas
+from indices import IndiceConfrontos, IndiceJogos, indice_rodadas, listar_rodadas_completas, obter_rodada_atual
+from instrumentacao import ATIVO as METRICAS_ATIVAS, eventos_execucao, finalizar_execucao, iniciar_execucao, instrumentar_cache, medir
+from ratings import CAMINHO_CHECKPOINT, MotorRatings
+from relatorios import analise_time
+from simulador import probabilidades_zonas, simular, zonas_por_posicao
+from temporadas import COMPETICAO_PADRAO, CatalogoTemporadas
+from usuarios import autenticar_usuario, migrar_xlsx, registrar_usuario
 
 # Pasta base (garante que os arquivos fiquem na mesma pasta do script)
 PASTA_BASE = os.path.dirname(__file__)
 
+# Tempos desta execução (instrumentacao.py; só coleta com EVOLUTION_METRICAS=1)
+iniciar_execucao()
+
 # ---------- Cache: evita recarregar tudo a cada interação ----------
-@st.cache_data
-def obter_soup_wikipedia():
-    url = "https://pt.wikipedia.org/wiki/Campeonato_Brasileiro_de_Futebol_de_2025_-_S%C3%A9rie_A"
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-    try:
-        requisicao = requests.get(url, headers=headers, timeout=10)  # Timeout de 10 segundos
-        requisicao.raise_for_status()  # dispara erro se não for 200
-        return BeautifulSoup(requisicao.text, "html.parser")
-    except requests.exceptions.Timeout:
-        st.error("Tempo de resposta esgotado. Tente novamente mais tarde.")
-        return None
-    except requests.exceptions.RequestException as e:
-        st.error(f"Erro ao acessar a Wikipedia: {e}")
-        return None
-
-@st.cache_data
-def extrair_tabela_soup_por_titulo(_soup, titulo):
-    for header in _soup.find_all(["h2", "h3"]):
-        if titulo.lower() in header.get_text(strip=True).lower():
-            tabela = header.find_next("table", {"class": "wikitable"})
-            if tabela is not None:
-                return pd.read_html(str(tabela))[0]
-    return None
+# O HTML vem do cache em disco (cache_wikipedia.py); cada versão é extraída uma única vez,
+# numa só passada com lxml para todas as tabelas (extrator_wikipedia.py)
+@instrumentar_cache(st.cache_data)
+def extrair_tabelas_wikipedia(versao, _html):
+    return extrair_tabelas(_html, ["Classificação", "Confrontos"])
 
 # ---------- Funções de IO (cacheadas, mas não chamam st.* internamente) ----------
-@st.cache_data
-def carregar_jogos_arquivo(caminho_completo):
-    if not os.path.exists(caminho_completo):
-        raise FileNotFoundError(caminho_completo)
-    df = pd.read_excel(caminho_completo)
-    df['data'] = pd.to_datetime(df['data'])
-    return df
-
-@st.cache_data
-def carregar_classificacao_arquivo(caminho_completo, sheet_name="Classificação"):
-    if not os.path.exists(caminho_completo):
-        raise FileNotFoundError(caminho_completo)
-    # tenta ler Excel com aba "Classificação" (se existir)
-    try:
-        return pd.read_excel(caminho_completo, sheet_name=sheet_name)
-    except Exception:
-        # se falhar, tenta CSV
-        return pd.read_csv(caminho_completo)
-
-# ---------- Funções utilitárias ----------
-def calcular_aproveitamento(pontos, jogos):
-    return (pontos / (jogos * 3)) * 100 if jogos > 0 else 0
-
-def calcular_saldo(df, time):
-    gols_pro = df[df['mandante'] == time]['gols_mandante'].sum() + df[df['visitante'] == time]['gols_visitante'].sum()
-    gols_contra = df[df['mandante'] == time]['gols_visitante'].sum() + df[df['visitante'] == time]['gols_mandante'].sum()
-    return gols_pro - gols_contra
-
-def registrar_usuario(nome, senha):
-    path = os.path.join(PASTA_BASE, "usuarios_registrados.xlsx")
-    if os.path.exists(path):
-        df = pd.read_excel(path)
-    else:
-        df = pd.DataFrame(columns=["usuario", "senha"])
-    if nome in df['usuario'].values:
-        return False
-    novo_usuario = pd.DataFrame({"usuario": [nome], "senha": [senha]})
-    df = pd.concat([df, novo_usuario], ignore_index=True)
-    df.to_excel(path, index=False)
-    return True
-
-def autenticar_usuario(nome, senha):
-    path = os.path.join(PASTA_BASE, "usuarios_registrados.xlsx")
-    if not os.path.exists(path):
-        return False
-    df = pd.read_excel(path)
-    return ((df['usuario'] == nome) & (df['senha'] == senha)).any()
-
-
-def filtrar_jogos(df, time=None, ultimos=True, n=5):
-    df_ordenado = df.sort_values('data', ascending=not ultimos)
-    if time:
-        df_time = df_ordenado[(df_ordenado['mandante'] == time) | (df_ordenado['visitante'] == time)]
-    else:
-        df_time = df_ordenado
-    return df_time.head(n)
+# Estruturas derivadas de um conjunto de jogos (motor, índices, times, ratings, simulação)
+# são chaveadas por chave_jogos, que muda a cada recarga: max_entries=2 guarda a versão
+# atual e a anterior (sessões que ainda não reexecutaram) e libera as mais antigas
+# jogos_atualizados.xlsx + classificação: um objeto só para todas as sessões do processo
+# (base_compartilhada.py); uma thread troca a versão inteira quando algum arquivo muda.
+# As leituras passam pela cópia Parquet da planilha (armazenamento.py)
+@instrumentar_cache(st.cache_resource)
+def obter_base_compartilhada():
+    return BaseCompartilhada(
+        os.path.join(PASTA_BASE, "jogos_atualizados.xlsx"),
+        # para classificação, o xlsx gerado pela wiki; se não existir, o CSV do projeto
+        [os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.xlsx"),
+         os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.csv")],
+    ).iniciar_vigia()
+
+# Catálogo de temporadas particionadas; só as partições escolhidas são lidas
+@instrumentar_cache(st.cache_resource)
+def obter_catalogo_temporadas():
+    return CatalogoTemporadas()
+
+# cache_resource: o mesmo frame (somente leitura) para todas as sessões, sem cópia por sessão
+@instrumentar_cache(st.cache_resource(max_entries=16))
+def carregar_jogos_temporadas(temporadas, versao_catalogo):
+    return obter_catalogo_temporadas().carregar([COMPETICAO_PADRAO], list(temporadas))
+
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def listar_times(_df_jogos, chave_jogos):
+    return sorted(t for t in pd.unique(_df_jogos[['mandante', 'visitante']].values.ravel('K')) if pd.notna(t))
+
+# Motor de classificação (somas prefixadas por rodada), um por conjunto de jogos carregado
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def obter_motor_classificacao(_df_jogos, chave_jogos):
+    return MotorClassificacao(_df_jogos)
+
+# Índice de rodadas (completa/pendente), um por conjunto de jogos carregado; somente
+# leitura, então um só objeto para todas as sessões (cache_data copiaria por sessão)
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def obter_indice_rodadas(_df_jogos, chave_jogos):
+    return indice_rodadas(_df_jogos)
+
+# Índice time -> jogos (ordenados por data), um por conjunto de jogos carregado
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def obter_indice_jogos(_df_jogos, chave_jogos):
+    return IndiceJogos(_df_jogos)
+
+# Confrontos diretos (matrizes times x times + encontros por par), um por conjunto de jogos carregado
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def obter_indice_confrontos(_df_jogos, chave_jogos):
+    return IndiceConfrontos(_df_jogos)
+
+# Simulação do restante do campeonato (100 mil temporadas), uma por conjunto de jogos
+@instrumentar_cache(st.cache_data(max_entries=2))
+def simular_campeonato(_df_jogos, chave_jogos, n_simulacoes=100_000):
+    return simular(_df_jogos, n_simulacoes)
+
+# Garantidos/eliminados por zona: um solver no processo, que reaproveita os limites
+# de melhor/pior posição da atualização anterior quando só entram placares novos
+@instrumentar_cache(st.cache_resource)
+def obter_solver_zonas():
+    return SolverZonas()
+
+@instrumentar_cache(st.cache_data(max_entries=2))
+def situacao_zonas(_df_jogos, chave_jogos, zonas):
+    return obter_solver_zonas().atualizar(_df_jogos, dict(zonas))
+
+# Análise de um time (métricas + figuras em JSON), compartilhada entre sessões.
+# Chave: versão dos jogos, time e conjunto de rodadas já ordenado e sem repetição;
+# guarda as 256 combinações mais recentes por até 1 hora
+@instrumentar_cache(st.cache_data(max_entries=256, ttl=3600))
+def analise_time_cacheada(_df_jogos, chave_jogos, time, rodadas, eixo_x="rodada"):
+    return analise_time(_df_jogos, time, list(rodadas), eixo_x)
+
+# Ratings Elo/Poisson: um motor por checkpoint no processo; cada conjunto de jogos
+# novo só aplica os jogos que ainda não estão no checkpoint (ratings.py)
+@instrumentar_cache(st.cache_resource)
+def obter_motor_ratings(caminho_checkpoint):
+    return MotorRatings(caminho_checkpoint)
+
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def atualizar_ratings(_df_jogos, chave_jogos, caminho_checkpoint):
+    motor = obter_motor_ratings(caminho_checkpoint)
+    motor.atualizar(_df_jogos)
+    return motor
+
+# Com o catálogo, as temporadas anteriores à última do registro já estão no checkpoint:
+# só as partições a partir dela são lidas (uma vez por versão do catálogo)
+@instrumentar_cache(st.cache_resource(max_entries=2))
+def atualizar_ratings_catalogo(competicao, versao_catalogo, caminho_checkpoint):
+    motor = obter_motor_ratings(caminho_checkpoint)
+    catalogo = obter_catalogo_temporadas()
+    ultima = motor.ultima_temporada()
+    temporadas = [t for t in catalogo.temporadas(competicao) if ultima is None or t >= ultima]
+    if temporadas:
+        motor.atualizar(catalogo.carregar([competicao], temporadas))
+    return motor
 
 # ---------- Extrai tabelas da Wikipedia e salva arquivo de classificação (uma vez por execução do código) ----------
+# Compara as tabelas com a última versão gravada uma vez por versão do HTML; a planilha só é
+# regravada (troca atômica) quando alguma linha/jogo mudou, e as mudanças vão para o log
+@instrumentar_cache(st.cache_data)
+def salvar_tabelas_wikipedia(versao, _tabela_classificacao, _tabela_jogos):
+    caminho_xlsx = os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.xlsx")
+    # Planilha com duas abas (Classificação e Confrontos) quando possível
+    tabelas = {"Classificação": _tabela_classificacao}
+    if _tabela_jogos is not None:
+        tabelas["Confrontos"] = _tabela_jogos
+    versao_dados, _ = GravadorTabelas(caminho_xlsx).gravar(tabelas)
+    return caminho_xlsx, versao_dados
+
 def atualizar_tabelas_wikipedia(e_salvar=True):
-    soup = obter_soup_wikipedia()
-    tabela_classificacao = extrair_tabela_soup_por_titulo(soup, "Classificação")
-    tabela_jogos = extrair_tabela_soup_por_titulo(soup, "Confrontos")
+    cache = obter_cache_wikipedia()
+    html, versao = cache.obter()  # nunca bloqueia: a consulta à rede roda em segundo plano
+    if html is None:
+        if cache.baixando():
+            raise RuntimeError("página ainda sendo baixada; recarregue em instantes")
+        raise cache.ultimo_erro or RuntimeError("página indisponível")
+    tabelas = extrair_tabelas_wikipedia(versao, html)
+    tabela_classificacao = tabelas["Classificação"]
+    tabela_jogos = tabelas["Confrontos"]
 
     if e_salvar and tabela_classificacao is not None:
-        caminho_xlsx = os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.xlsx")
-        # Salva em uma planilha com duas abas (Classificação e Confrontos) quando possível
-        with pd.ExcelWriter(caminho_xlsx) as writer:
-            tabela_classificacao.to_excel(writer, sheet_name="Classificação", index=False)
-            if tabela_jogos is not None:
-                tabela_jogos.to_excel(writer, sheet_name="Confrontos", index=False)
-        return caminho_xlsx, tabela_classificacao, tabela_jogos
-    return None, tabela_classificacao, tabela_jogos
+        caminho_xlsx, versao_dados = salvar_tabelas_wikipedia(versao, tabela_classificacao, tabela_jogos)
+        return caminho_xlsx, versao_dados, tabela_classificacao, tabela_jogos
+    return None, None, tabela_classificacao, tabela_jogos
+
+# Usuários ficam em SQLite (usuarios.py); o usuarios_registrados.xlsx antigo é migrado uma única vez
+migrar_xlsx()
 
 # ---------- Autenticação ----------
 if "autenticado" not in st.session_state:
@@ -132,24 +184,15 @@ if not st.session_state.autenticado:
                 st.sidebar.success("Usuário registrado com sucesso")
             else:
                 st.sidebar.error("Usuário já existe")
-else:
-    # ---------- Atualização de tabelas APÓS login ----------
-    try:
-        arquivo_classificacao_xlsx, tabela_classificacao, tabela_jogos = atualizar_tabelas_wikipedia(e_salvar=True)
-        if arquivo_classificacao_xlsx:
-            st.sidebar.success("Classificação atualizada (fonte: Wikipedia).")
-    except Exception as e:
-        st.sidebar.error(f"Erro ao atualizar dados da Wikipedia: {e}")
-        tabela_classificacao, tabela_jogos = None, None
-        arquivo_classificacao_xlsx = None
 
 # ---------- Configuração da página ----------
 st.set_page_config(page_title="Sistema de Análise", layout="wide")
 st.title("Sistema de Análise de Jogos do Brasileirão Série A")
 
-# Atualiza as tabelas (opcional: você pode comentar essa chamada se não quiser atualizar sempre)
+# Atualiza as tabelas (cópia em disco com TTL; a consulta à Wikipedia roda em segundo plano)
 try:
-    arquivo_classificacao_xlsx, tabela_classificacao, tabela_jogos = atualizar_tabelas_wikipedia(e_salvar=True)
+    with medir("wikipedia"):
+        arquivo_classificacao_xlsx, _, tabela_classificacao, tabela_jogos = atualizar_tabelas_wikipedia(e_salvar=True)
     # se quiser, exiba um log
     if arquivo_classificacao_xlsx:
         st.sidebar.success("Classificação atualizada (fonte: Wikipedia).")
@@ -185,39 +228,46 @@ if not st.session_state.autenticado:
 # ---------- ÁREA RESTRITA (tudo que usa df_jogos/df_class deve ficar aqui) ----------
 if st.session_state.autenticado:
     # Carrega arquivos locais (tratando exceções)
+    # Com temporadas registradas no catálogo (temporadas.py) o usuário escolhe quais analisar;
+    # sem catálogo, segue valendo o jogos_atualizados.xlsx
+    catalogo = obter_catalogo_temporadas()
+    temporadas_disponiveis = catalogo.temporadas(COMPETICAO_PADRAO)
+    temporadas_selecionadas = []
+    if temporadas_disponiveis:
+        temporadas_selecionadas = st.sidebar.multiselect(
+            "Temporadas", temporadas_disponiveis, default=temporadas_disponiveis[-1:]
+        )
     try:
-        caminho_jogos = os.path.join(PASTA_BASE, "jogos_atualizados.xlsx")
-        df_jogos = carregar_jogos_arquivo(caminho_jogos)
-    except FileNotFoundError:
-        st.error(f"Arquivo de jogos não encontrado: {caminho_jogos}")
+        dados = obter_base_compartilhada().atual()
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {e}")
         st.stop()
-
-    # Para classificação, tentamos usar o xlsx gerado pela wiki; se não existir, tenta CSV do projeto
-    caminho_classificacao_xlsx = os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.xlsx")
-    caminho_classificacao_csv = os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.csv")
-    caminho_para_abrir = None
-    if os.path.exists(caminho_classificacao_xlsx):
-        caminho_para_abrir = caminho_classificacao_xlsx
-    elif os.path.exists(caminho_classificacao_csv):
-        caminho_para_abrir = caminho_classificacao_csv
+    if temporadas_selecionadas:
+        versao_catalogo = catalogo.versao()
+        df_jogos = carregar_jogos_temporadas(tuple(temporadas_selecionadas), versao_catalogo)
+        chave_jogos = f"{COMPETICAO_PADRAO}:{sorted(temporadas_selecionadas)}:{versao_catalogo}"
+        times_disponiveis = listar_times(df_jogos, chave_jogos)
     else:
-        st.warning("Arquivo de classificação atualizado não encontrado. A parte de classificação ficará vazia.")
-        df_class = pd.DataFrame()  # tabela vazia
-    if caminho_para_abrir:
-        try:
-            df_class = carregar_classificacao_arquivo(caminho_para_abrir, sheet_name="Classificação")
-        except Exception as e:
-            st.error(f"Erro ao carregar classificação: {e}")
+        if dados.jogos is None:
+            st.error(f"Arquivo de jogos não encontrado: {obter_base_compartilhada().caminho_jogos}")
             st.stop()
+        # versão atual da base compartilhada (a chave muda quando a planilha é recarregada)
+        df_jogos, chave_jogos, times_disponiveis = dados.jogos, dados.chave, dados.times
+        if dados.erro_confrontos is not None:
+            st.warning(f"Placares da Wikipedia não aplicados aos jogos: {dados.erro_confrontos}")
 
-    # Lista de times
-    times = ["Todos"] + sorted(
-        [t for t in pd.unique(df_jogos[['mandante', 'visitante']].values.ravel('K')) if pd.notna(t)]
-    )
+    df_class = dados.classificacao
+    if dados.caminho_classificacao is None:
+        st.warning("Arquivo de classificação atualizado não encontrado. A parte de classificação ficará vazia.")
+
+    # Lista de times (uma por versão dos dados, compartilhada entre as sessões)
+    times = ["Todos"] + times_disponiveis
 
     # Rodadas e seletor (default = rodada atual)
-    rodadas = sorted(df_jogos['rodada'].unique())
-    rodada_atual = max(rodadas) if len(rodadas) else 1
+    # Índice por rodada (jogos marcados/disputados, datas, completa), calculado uma vez por arquivo
+    indice = obter_indice_rodadas(df_jogos, chave_jogos)
+    rodadas = indice.index.tolist()
+    rodada_atual = obter_rodada_atual(indice)
 
     rodada_selecionada = st.multiselect(
         "Selecione as rodadas",
@@ -235,88 +285,173 @@ if st.session_state.autenticado:
         df_filtrado = df_jogos[df_jogos['rodada'].isin(rodada_selecionada)]
 
         # Função analisar_time definida aqui (antes de ser usada pelo botão)
-        def analisar_time(df, time):
-            df_time = df[(df['mandante'] == time) | (df['visitante'] == time)].copy()
-            if df_time.empty:
+        # Só exibe: métricas e figuras vêm prontas de analise_time_cacheada
+        def analisar_time(time):
+            eixo_x = "data" if len(temporadas_selecionadas) > 1 else "rodada"  # rodadas se repetem entre temporadas
+            analise = analise_time_cacheada(df_jogos, chave_jogos, time, tuple(sorted(set(rodada_selecionada))), eixo_x)
+            if analise is None:
                 st.info(f"Não há jogos para {time} nas rodadas selecionadas.")
                 return
 
-            df_time['resultado'] = df_time.apply(
-                lambda row: 'V' if (row['mandante'] == time and row['gols_mandante'] > row['gols_visitante']) or
-                            (row['visitante'] == time and row['gols_visitante'] > row['gols_mandante'])
-                            else ('E' if row['gols_mandante'] == row['gols_visitante'] else 'D'),
-                axis=1
-            )
-            vitorias = (df_time['resultado'] == 'V').sum()
-            empates = (df_time['resultado'] == 'E').sum()
-            derrotas = (df_time['resultado'] == 'D').sum()
-            jogos = len(df_time)
-            pontos = vitorias * 3 + empates
-            aproveitamento = calcular_aproveitamento(pontos, jogos)
-            saldo = calcular_saldo(df_time, time)
-
-            gols_feitos = df_time[df_time['mandante'] == time]['gols_mandante'].sum() + df_time[df_time['visitante'] == time]['gols_visitante'].sum()
-            gols_mandante = df_time[df_time['mandante'] == time]['gols_mandante'].sum()
-            gols_visitante = df_time[df_time['visitante'] == time]['gols_visitante'].sum()
-            gols_sofridos_visitante = df_time[df_time['visitante'] == time]['gols_mandante'].sum()
-            media_mandante = gols_mandante / max(1, len(df_time[df_time['mandante'] == time]))
-            media_visitante = gols_visitante / max(1, len(df_time[df_time['visitante'] == time]))
-
+            m = analise["metricas"]
             st.markdown(f"## Desempenho do {time}")
             st.markdown(f"""
-            - **Jogos:** {jogos}  
-            - **Vitórias:** {vitorias}  
-            - **Empates:** {empates}  
-            - **Derrotas:** {derrotas}  
-            - **Pontos:** {pontos}  
-            - **Aproveitamento:** {aproveitamento:.2f}%  
-            - **Saldo de Gols:** {saldo}  
-            - **Gols Feitos (Total):** {gols_feitos}  
-            - **Gols Mandante:** {gols_mandante}  
-            - **Gols Visitante:** {gols_visitante}  
-            - **Gols Sofridos como Visitante:** {gols_sofridos_visitante}  
-            - **Média Gols Mandante:** {media_mandante:.2f}  
-            - **Média Gols Visitante:** {media_visitante:.2f}  
+            - **Jogos:** {m['jogos']}  
+            - **Vitórias:** {m['vitorias']}  
+            - **Empates:** {m['empates']}  
+            - **Derrotas:** {m['derrotas']}  
+            - **Pontos:** {m['pontos']}  
+            - **Aproveitamento:** {m['aproveitamento']:.2f}%  
+            - **Saldo de Gols:** {m['saldo']}  
+            - **Gols Feitos (Total):** {m['gols_feitos']}  
+            - **Gols Mandante:** {m['gols_mandante']}  
+            - **Gols Visitante:** {m['gols_visitante']}  
+            - **Gols Sofridos como Visitante:** {m['gols_sofridos_visitante']}  
+            - **Média Gols Mandante:** {m['media_mandante']:.2f}  
+            - **Média Gols Visitante:** {m['media_visitante']:.2f}  
             """)
 
-            fig_bar = go.Figure(data=[
-                go.Bar(name='Vitórias', x=["Resultados"], y=[vitorias]),
-                go.Bar(name='Empates', x=["Resultados"], y=[empates]),
-                go.Bar(name='Derrotas', x=["Resultados"], y=[derrotas])
-            ])
-            fig_bar.update_layout(barmode='group', title=f"Resultados do {time}", template="plotly_white")
+            fig_bar, fig_linha = (pio.from_json(figura) for figura in analise["figuras"])
             st.plotly_chart(fig_bar, use_container_width=True)
-
-            df_time = df_time.sort_values("rodada")
-            df_time['tendencia'] = df_time['resultado'].map({'V': 1, 'E': 0, 'D': -1}).cumsum()
-            fig_linha = px.line(df_time, x="rodada", y="tendencia", markers=True, title=f"Evolução da Performance - {time}")
             st.plotly_chart(fig_linha, use_container_width=True)
 
         # Botão: sorteia quando gerar as análises (lazy loading)
         if st.button("🔍 Gerar análises detalhadas"):
-            if time1 != "Todos" and time2 != "Todos" and time1 != time2:
-                col1, col2 = st.columns(2)
-                with col1:
-                    analisar_time(df_filtrado, time1)
-                with col2:
-                    analisar_time(df_filtrado, time2)
-            elif time1 != "Todos":
-                analisar_time(df_filtrado, time1)
-            elif time2 != "Todos":
-                analisar_time(df_filtrado, time2)
+            with medir("análise dos times"):
+                if time1 != "Todos" and time2 != "Todos" and time1 != time2:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        analisar_time(time1)
+                    with col2:
+                        analisar_time(time2)
+
+                    # Confronto direto entre os dois (todos os jogos carregados, não só as rodadas escolhidas)
+                    confrontos = obter_indice_confrontos(df_jogos, chave_jogos)
+                    r = confrontos.retrospecto(time1, time2)
+                    st.markdown(f"## Confronto direto: {time1} x {time2}")
+                    st.markdown(f"**{r['jogos']} jogos:** {r['vitorias']} vitórias do {time1}, {r['empates']} empates, "
+                                f"{r['derrotas']} vitórias do {time2} | Gols: {r['gols_pro']} x {r['gols_contra']}")
+                    st.dataframe(confrontos.ultimos(time1, time2, n=5)[['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']], hide_index=True)
+                elif time1 != "Todos":
+                    analisar_time(time1)
+                elif time2 != "Todos":
+                    analisar_time(time2)
+
+            # Trajetória do Elo e previsão do confronto (time 1 como mandante)
+            # Ratings seguem todo o histórico da competição, em ordem, qualquer que seja a seleção
+            if temporadas_selecionadas:
+                caminho_ratings = CAMINHO_CHECKPOINT.replace(".json", f"_{COMPETICAO_PADRAO}.json")
+                motor_ratings = atualizar_ratings_catalogo(COMPETICAO_PADRAO, versao_catalogo, caminho_ratings)
+            else:
+                motor_ratings = atualizar_ratings(df_jogos, chave_jogos, CAMINHO_CHECKPOINT)
+            times_ratings = [t for t in [time1, time2] if t != "Todos"]
+            if times_ratings:
+                df_elo = motor_ratings.trajetoria(times_ratings)
+                fig_elo = px.line(df_elo, x="data", y="elo", color="time", title="Evolução do Elo")
+                st.plotly_chart(fig_elo, use_container_width=True)
+            if len(times_ratings) == 2 and time1 != time2:
+                p = motor_ratings.prever(time1, time2)
+                st.markdown(f"""
+                **Previsão {time1} x {time2}:** {p['vitoria_mandante']:.1%} / {p['empate']:.1%} / {p['vitoria_visitante']:.1%}  
+                Gols esperados: {p['gols_esperados_mandante']:.2f} x {p['gols_esperados_visitante']:.2f}
+                """)
         else:
             st.info("Selecione os times e clique em 'Gerar análises detalhadas' para carregar gráficos.")
 
         # Exibição da classificação (limpa e protegida contra ausência de df_class)
         st.subheader("Classificação Atual")
-        if not df_class.empty and (time1 != "Todos" or time2 != "Todos"):
+        # Tabela calculada de df_jogos para as rodadas selecionadas (somas prefixadas por rodada)
+        with medir("classificação"):
+            df_tabela = obter_motor_classificacao(df_jogos, chave_jogos).tabela_rodadas(rodada_selecionada)
+        if not df_class.empty and "Classificação ou descenso" in df_class.columns:
+            zonas = df_class.set_index(df_class.columns[0])["Classificação ou descenso"]
+            df_tabela["Classificação ou descenso"] = df_tabela["Pos"].map(zonas)
+        if not df_tabela.empty and (time1 != "Todos" or time2 != "Todos"):
             times_filtrados = [t for t in [time1, time2] if t != "Todos"]
-            st.dataframe(df_class[df_class.iloc[:,0].isin(times_filtrados)].head(50))  # ajusta coluna índice dinamicamente
-        elif not df_class.empty:
-            st.dataframe(df_class.head(50))
+            st.dataframe(df_tabela[df_tabela["Equipe"].isin(times_filtrados)], hide_index=True)
+        elif not df_tabela.empty:
+            st.dataframe(df_tabela, hide_index=True)
         else:
             st.info("Classificação não disponível.")
 
+        # Mapa de confrontos diretos da liga (saldo de gols de cada time contra cada adversário)
+        if st.checkbox("Mostrar mapa de confrontos diretos"):
+            saldo_confrontos = obter_indice_confrontos(df_jogos, chave_jogos).matriz('saldo')
+            fig_mapa = px.imshow(saldo_confrontos, color_continuous_scale="RdYlGn", color_continuous_midpoint=0,
+                                 labels=dict(x="Adversário", y="Time", color="Saldo"))
+            st.plotly_chart(fig_mapa, use_container_width=True)
+
+        # Probabilidades de posição/zona ao fim do campeonato (Monte Carlo sobre os jogos restantes)
+        if len(temporadas_selecionadas) <= 1 and st.button("🎲 Simular restante do campeonato"):
+            probabilidades = simular_campeonato(df_jogos, chave_jogos)
+            zonas = probabilidades_zonas(probabilidades, zonas_por_posicao(df_class))
+            st.dataframe((zonas * 100).round(1).sort_values(list(zonas.columns), ascending=False))
+
+        # Quem já garantiu ou perdeu cada zona, pela matemática dos jogos restantes (eliminacao.py)
+        if len(temporadas_selecionadas) <= 1 and st.checkbox("🧮 Garantidos e eliminados por zona"):
+            with medir("garantidos/eliminados"):
+                zonas = tuple((zona, tuple(posicoes)) for zona, posicoes in zonas_por_posicao(df_class).items())
+                st.dataframe(situacao_zonas(df_jogos, chave_jogos, zonas), hide_index=True)
+            st.caption("Empates em pontos contam a favor do time na melhor posição e contra ele na pior; "
+                       "\"em aberto\" = ainda depende dos resultados.")
+
+        # Modo cenário: placares hipotéticos nos jogos sem resultado, aplicados como deltas (cenarios.py)
+        if len(temporadas_selecionadas) <= 1 and st.checkbox("🧪 Modo cenário (e se...?)"):
+            motor = obter_motor_classificacao(df_jogos, chave_jogos)
+            estado = st.session_state.setdefault("cenarios", {"salvos": {}, "inicial": {}, "editor": 0})
+            # um Cenario por sessão; refeito (com os mesmos placares) quando os jogos mudam
+            cenario = st.session_state.get("cenario")
+            if cenario is None or cenario.motor is not motor:
+                resultados_anteriores = cenario.resultados if cenario is not None else estado["inicial"]
+                cenario = st.session_state["cenario"] = Cenario(motor, df_jogos)
+                cenario.sincronizar(resultados_anteriores)
+
+            col_c1, col_c2 = st.columns(2)
+            with col_c1:
+                cenario_salvo = st.selectbox("Cenários salvos", [""] + sorted(estado["salvos"]))
+                if st.button("Carregar cenário") and cenario_salvo:
+                    estado["inicial"], estado["editor"] = estado["salvos"][cenario_salvo], estado["editor"] + 1
+            with col_c2:
+                nome_cenario = st.text_input("Nome do cenário")
+                if st.button("Limpar placares"):
+                    estado["inicial"], estado["editor"] = {}, estado["editor"] + 1
+
+            # A grade só muda ao carregar/limpar; cada edição chega como a grade editada e
+            # o cenário aplica apenas os placares que mudaram desde a execução anterior
+            grade = st.data_editor(
+                cenario.grade(estado["inicial"]), key=f"editor_cenario_{estado['editor']}", hide_index=True,
+                disabled=["chave", "data", "rodada", "mandante", "visitante"], column_config={
+                    "chave": None,
+                    "gols_mandante": st.column_config.NumberColumn(min_value=0, step=1),
+                    "gols_visitante": st.column_config.NumberColumn(min_value=0, step=1),
+                })
+            with medir("cenário") as m:
+                m["mudancas"] = cenario.sincronizar(resultados_da_grade(grade))
+                df_cenario = cenario.tabela()
+            if nome_cenario and st.button("Salvar cenário"):
+                estado["salvos"][nome_cenario] = dict(cenario.resultados)
+                st.success(f"Cenário '{nome_cenario}' salvo nesta sessão.")
+
+            if not df_class.empty and "Classificação ou descenso" in df_class.columns:
+                zonas = df_class.set_index(df_class.columns[0])["Classificação ou descenso"]
+                df_cenario["Classificação ou descenso"] = df_cenario["Pos"].map(zonas)
+            st.markdown(f"**Classificação do cenário** ({len(cenario.resultados)} placares hipotéticos)")
+            st.dataframe(df_cenario, hide_index=True)
+
+            # Diferença para a tabela real ou para outro cenário salvo
+            referencia = st.selectbox("Comparar com", ["Tabela real"] + sorted(estado["salvos"]))
+            if referencia == "Tabela real":
+                df_referencia = motor.tabela()
+            else:
+                outro = Cenario(motor, df_jogos)
+                outro.sincronizar(estado["salvos"][referencia])
+                df_referencia = outro.tabela()
+            diferenca = comparar_tabelas(df_referencia, df_cenario, (" ref.", " cenário"))
+            if diferenca.empty:
+                st.info("Nenhuma mudança em relação à referência.")
+            else:
+                st.dataframe(diferenca, hide_index=True)
+
         st.subheader("Tabela de Jogos Selecionados")
         st.dataframe(df_filtrado[['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']].head(100))
     else:
@@ -324,41 +459,36 @@ if st.session_state.autenticado:
 
     # ---------- Filtro de últimos e próximos jogos ----------
     st.subheader("📅 Filtro de Jogos por Rodada")
-    times_disponiveis = sorted(
-        [t for t in pd.unique(df_jogos[['mandante', 'visitante']].values.ravel('K')) if pd.notna(t)]
-    )
-
     time_filtro = st.selectbox("Selecione um time para análise dos jogos", ["Todos"] + times_disponiveis)
+    # Jogos ordenados por data uma única vez, com as posições de cada time (disputados x pendentes)
+    indice_jogos = obter_indice_jogos(df_jogos, chave_jogos)
     col1, col2 = st.columns(2)
 
     with col1:
         if st.button("Mostrar Últimos 5 Jogos"):
-            df_filtro = filtrar_jogos(df_jogos, None if time_filtro == "Todos" else time_filtro, ultimos=True, n=5)
+            df_filtro = indice_jogos.ultimos(None if time_filtro == "Todos" else time_filtro, n=5)
             st.dataframe(df_filtro[['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']])
 
     with col2:
         if st.button("Mostrar Próximos 5 Jogos"):
-            df_futuros = df_jogos[df_jogos['gols_mandante'].isna() | df_jogos['gols_visitante'].isna()]
-            df_filtro = filtrar_jogos(df_futuros, None if time_filtro == "Todos" else time_filtro, ultimos=False, n=5)
+            df_filtro = indice_jogos.proximos(None if time_filtro == "Todos" else time_filtro, n=5)
             st.dataframe(df_filtro[['data', 'rodada', 'mandante', 'visitante']])
 
     # ---------- Últimas rodadas com resultados ----------
-    jogos_com_resultado = df_jogos[
-        df_jogos['gols_mandante'].notnull() &
-        df_jogos['gols_visitante'].notnull() &
-        (df_jogos['gols_mandante'] != '') &
-        (df_jogos['gols_visitante'] != '')
-    ]
-
-    rodadas_completas = jogos_com_resultado.groupby('rodada').filter(
-        lambda x: x.shape[0] == df_jogos[df_jogos['rodada'] == x['rodada'].iloc[0]].shape[0]
-    )['rodada'].unique()
-
-    ultimas_5_rodadas = sorted(rodadas_completas)[-5:]
+    ultimas_5_rodadas = listar_rodadas_completas(indice)[-5:]
     if len(ultimas_5_rodadas) > 0:
         rodada_resultados = st.selectbox("Selecione uma rodada com resultados disponíveis:", ultimas_5_rodadas)
-        jogos_rodada = jogos_com_resultado[jogos_com_resultado['rodada'] == rodada_resultados]
+        jogos_rodada = df_jogos[df_jogos['rodada'] == rodada_resultados]  # rodada completa: todos com resultado
         st.write(f"Jogos da rodada {rodada_resultados} com resultado:")
         st.dataframe(jogos_rodada)
     else:
         st.info("Ainda não há rodadas completas com resultados.")
+
+# ---------- Painel de métricas (administração) ----------
+# Tempos, linhas e acertos de cache desta execução; também vão para metricas/ (JSON-lines/Prometheus)
+if METRICAS_ATIVAS:
+    with st.sidebar.expander("⏱️ Métricas desta execução"):
+        eventos = eventos_execucao()
+        if eventos:
+            st.dataframe(pd.DataFrame(eventos), hide_index=True)
+    finalizar_execucao()
@@ -1,67 +1,62 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import os
 from datetime import datetime
+from armazenamento import ler_tabela
+from classificacao import MotorClassificacao
+from esquema import COLUNAS_CLASSIFICACAO, ErroEsquema, ler_jogos
+from estatisticas import metricas_time, montar_partidas_por_time, resumir_times, tendencia_times
+from graficos import CORES_RESULTADOS, figura_resultados, figura_tendencia
+from indices import IndiceJogos, indice_rodadas, listar_rodadas_completas
+from usuarios import autenticar_usuario, migrar_xlsx, registrar_usuario
 
 # ── Funções auxiliares ──
 def carregar_jogos(nome_arquivo):
     if not os.path.exists(nome_arquivo):
         st.error(f"Arquivo '{nome_arquivo}' não encontrado.")
         st.stop()
-    df = pd.read_excel(nome_arquivo)
-    esperadas = {'data', 'rodada', 'mandante', 'visitante', 'gols_mandante', 'gols_visitante'}
-    if not esperadas.issubset(set(df.columns)):
-        st.error("Arquivo de jogos está com colunas incorretas.")
+    # colunas e tipos validados (esquema.py); cópia Parquet refeita só quando a planilha muda
+    try:
+        return ler_jogos(nome_arquivo)
+    except ErroEsquema as e:
+        st.error(f"Arquivo de jogos com problemas: {e}")
         st.stop()
-    df['data'] = pd.to_datetime(df['data'])
-    return df
 
 def carregar_classificacao(nome_arquivo):
     if not os.path.exists(nome_arquivo):
         st.error(f"Arquivo '{nome_arquivo}' não encontrado.")
         st.stop()
-    return pd.read_csv(nome_arquivo)
-
-def calcular_aproveitamento(pontos, jogos):
-    return (pontos / (jogos * 3)) * 100 if jogos > 0 else 0
-
-def calcular_saldo(df, time):
-    gols_pro = df[df['mandante'] == time]['gols_mandante'].sum() + df[df['visitante'] == time]['gols_visitante'].sum()
-    gols_contra = df[df['mandante'] == time]['gols_visitante'].sum() + df[df['visitante'] == time]['gols_mandante'].sum()
-    return gols_pro - gols_contra
-
-def registrar_usuario(nome, senha):
-    if os.path.exists("usuarios_registrados.xlsx"):
-        df = pd.read_excel("usuarios_registrados.xlsx")
-    else:
-        df = pd.DataFrame(columns=["usuario", "senha"])
-    if nome in df['usuario'].values:
-        return False
-    novo_usuario = pd.DataFrame({"usuario": [nome], "senha": [senha]})
-    df = pd.concat([df, novo_usuario], ignore_index=True)
-    df.to_excel("usuarios_registrados.xlsx", index=False)
-    return True
-
-def autenticar_usuario(nome, senha):
-    if not os.path.exists("usuarios_registrados.xlsx"):
-        return False
-    df = pd.read_excel("usuarios_registrados.xlsx")
-    return ((df['usuario'] == nome) & (df['senha'] == senha)).any()
-
-def filtrar_jogos(df, time=None, ultimos=True, n=5):
-    df_ordenado = df.sort_values('data', ascending=not ultimos)
-    if time:
-        df_time = df_ordenado[(df_ordenado['mandante'] == time) | (df_ordenado['visitante'] == time)]
-    else:
-        df_time = df_ordenado
-    return df_time.head(n)
+    return ler_tabela(nome_arquivo, colunas=COLUNAS_CLASSIFICACAO)  # só posição e zona são usadas
+
+# Versão do arquivo (mtime/tamanho): chave dos caches por conjunto de jogos carregado
+# (max_entries=2: a versão atual e a anterior; as mais antigas são liberadas)
+def versao_arquivo(nome_arquivo):
+    info = os.stat(nome_arquivo)
+    return f"{nome_arquivo}:{info.st_mtime_ns}:{info.st_size}"
+
+# Índice de rodadas (jogos marcados/disputados e datas por rodada), um por versão do arquivo de jogos
+@st.cache_resource(max_entries=2)
+def obter_indice_rodadas(_df_jogos, chave_jogos):
+    return indice_rodadas(_df_jogos)
+
+# Motor de classificação (somas prefixadas por rodada), um por versão do arquivo de jogos
+@st.cache_resource(max_entries=2)
+def obter_motor_classificacao(_df_jogos, chave_jogos):
+    return MotorClassificacao(_df_jogos)
+
+# Jogos ordenados por data uma única vez por versão do arquivo, com as posições de cada time
+# (disputados x pendentes); o mesmo índice (somente leitura) para todas as sessões
+@st.cache_resource(max_entries=2)
+def obter_indice_jogos(_df_jogos, chave_jogos):
+    return IndiceJogos(_df_jogos)
 
 # ── Configuração da Página ──
 st.set_page_config(page_title="Sistema de Análise", layout="wide")
 st.title("Sistema de Análise de Jogos do Brasileirão Série A")
 
+# Usuários ficam em SQLite (usuarios.py); o usuarios_registrados.xlsx antigo é migrado uma única vez
+migrar_xlsx()
+
 if "autenticado" not in st.session_state:
     st.session_state.autenticado = False
 
@@ -91,12 +86,14 @@ if not st.session_state.autenticado:
 if st.session_state.autenticado:
 
     df_jogos = carregar_jogos("jogos_atualizados_certo.xlsx")
+    chave_jogos = versao_arquivo("jogos_atualizados_certo.xlsx")
     df_class = carregar_classificacao("tabela_classificacao_atualizada.csv")
     times = ["Todos"] + sorted(
     [t for t in pd.unique(df_jogos[['mandante', 'visitante']].values.ravel('K')) if pd.notna(t)]
 )
 
-    rodadas = sorted(df_jogos['rodada'].unique())
+    indice = obter_indice_rodadas(df_jogos, chave_jogos)
+    rodadas = indice.index.tolist()
     rodada_selecionada = st.multiselect("Selecione as rodadas", rodadas, default=rodadas)
 
     col_a, col_b = st.columns(2)
@@ -108,76 +105,61 @@ if st.session_state.autenticado:
     if rodada_selecionada:
         df_filtrado = df_jogos[df_jogos['rodada'].isin(rodada_selecionada)]
 
-        def analisar_time(df, time):
-            df_time = df[(df['mandante'] == time) | (df['visitante'] == time)].copy()
-            df_time['resultado'] = df_time.apply(
-                lambda row: 'V' if (row['mandante'] == time and row['gols_mandante'] > row['gols_visitante']) or
-                                    (row['visitante'] == time and row['gols_visitante'] > row['gols_mandante'])
-                            else ('E' if row['gols_mandante'] == row['gols_visitante'] else 'D'),
-                axis=1
-            )
-            vitorias = (df_time['resultado'] == 'V').sum()
-            empates = (df_time['resultado'] == 'E').sum()
-            derrotas = (df_time['resultado'] == 'D').sum()
-            jogos = len(df_time)
-            pontos = vitorias * 3 + empates
-            aproveitamento = calcular_aproveitamento(pontos, jogos)
-            saldo = calcular_saldo(df_time, time)
-
-            gols_feitos = df_time[df_time['mandante'] == time]['gols_mandante'].sum() + df_time[df_time['visitante'] == time]['gols_visitante'].sum()
-            gols_mandante = df_time[df_time['mandante'] == time]['gols_mandante'].sum()
-            gols_visitante = df_time[df_time['visitante'] == time]['gols_visitante'].sum()
-            gols_sofridos_visitante = df_time[df_time['visitante'] == time]['gols_mandante'].sum()
-            media_mandante = gols_mandante / max(1, len(df_time[df_time['mandante'] == time]))
-            media_visitante = gols_visitante / max(1, len(df_time[df_time['visitante'] == time]))
+        def analisar_time(resumo, tendencia, time):
+            if time not in resumo.index:
+                st.info(f"Não há jogos para {time} nas rodadas selecionadas.")
+                return
 
+            m = metricas_time(resumo, time)
             st.markdown(f"## Desempenho do {time}")
             st.markdown(f"""
-            - **Jogos:** {jogos}  
-            - **Vitórias:** {vitorias}  
-            - **Empates:** {empates}  
-            - **Derrotas:** {derrotas}  
-            - **Pontos:** {pontos}  
-            - **Aproveitamento:** {aproveitamento:.2f}%  
-            - **Saldo de Gols:** {saldo}  
-            - **Gols Feitos (Total):** {gols_feitos}  
-            - **Gols Mandante:** {gols_mandante}  
-            - **Gols Visitante:** {gols_visitante}  
-            - **Gols Sofridos como Visitante:** {gols_sofridos_visitante}  
-            - **Média Gols Mandante:** {media_mandante:.2f}  
-            - **Média Gols Visitante:** {media_visitante:.2f}  
+            - **Jogos:** {m['jogos']}  
+            - **Vitórias:** {m['vitorias']}  
+            - **Empates:** {m['empates']}  
+            - **Derrotas:** {m['derrotas']}  
+            - **Pontos:** {m['pontos']}  
+            - **Aproveitamento:** {m['aproveitamento']:.2f}%  
+            - **Saldo de Gols:** {m['saldo']}  
+            - **Gols Feitos (Total):** {m['gols_feitos']}  
+            - **Gols Mandante:** {m['gols_mandante']}  
+            - **Gols Visitante:** {m['gols_visitante']}  
+            - **Gols Sofridos como Visitante:** {m['gols_sofridos_visitante']}  
+            - **Média Gols Mandante:** {m['media_mandante']:.2f}  
+            - **Média Gols Visitante:** {m['media_visitante']:.2f}  
             """)
 
-            fig_bar = go.Figure(data=[
-                go.Bar(name='Vitórias', x=["Resultados"], y=[vitorias], marker_color='#25c863'),
-                go.Bar(name='Empates', x=["Resultados"], y=[empates], marker_color='#f4a261'),
-                go.Bar(name='Derrotas', x=["Resultados"], y=[derrotas], marker_color='#e63946')
-            ])
-            fig_bar.update_layout(barmode='group', title=f"Resultados do {time}", template="plotly_white")
+            fig_bar = figura_resultados(m, time, CORES_RESULTADOS)
             st.plotly_chart(fig_bar, use_container_width=True)
 
-            df_time = df_time.sort_values("rodada")
-            df_time['tendencia'] = df_time['resultado'].map({'V': 1, 'E': 0, 'D': -1}).cumsum()
-            fig_linha = px.line(df_time, x="rodada", y="tendencia", markers=True, title=f"Evolução da Performance - {time}")
+            df_tendencia = tendencia[tendencia['time'] == time]
+            fig_linha = figura_tendencia(df_tendencia, time)
             st.plotly_chart(fig_linha, use_container_width=True)
 
+        # Métricas de todos os times numa única passada agrupada (estatisticas.py)
+        partidas = montar_partidas_por_time(df_filtrado)
+        resumo = resumir_times(partidas)
+        tendencia = tendencia_times(partidas)
+
         if time1 != "Todos" and time2 != "Todos" and time1 != time2:
             col1, col2 = st.columns(2)
             with col1:
-                analisar_time(df_filtrado, time1)
+                analisar_time(resumo, tendencia, time1)
             with col2:
-                analisar_time(df_filtrado, time2)
+                analisar_time(resumo, tendencia, time2)
         elif time1 != "Todos":
-            analisar_time(df_filtrado, time1)
+            analisar_time(resumo, tendencia, time1)
         elif time2 != "Todos":
-            analisar_time(df_filtrado, time2)
+            analisar_time(resumo, tendencia, time2)
 
         st.subheader("Classificação Atual")
+        # Tabela calculada de df_jogos para as rodadas selecionadas, com a zona da tabela oficial
+        df_tabela = obter_motor_classificacao(df_jogos, chave_jogos).tabela_rodadas(rodada_selecionada)
+        df_tabela['Classificação ou descenso'] = df_tabela['Pos'].map(df_class.set_index('Pos')['Classificação ou descenso'])
         if time1 != "Todos" or time2 != "Todos":
             times_filtrados = [t for t in [time1, time2] if t != "Todos"]
-            st.dataframe(df_class[df_class['Equipevde'].isin(times_filtrados)])
+            st.dataframe(df_tabela[df_tabela['Equipe'].isin(times_filtrados)], hide_index=True)
         else:
-            st.dataframe(df_class)
+            st.dataframe(df_tabela, hide_index=True)
 
         st.subheader("Tabela de Jogos Selecionados")
         st.dataframe(df_filtrado[['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']])
@@ -191,32 +173,22 @@ if st.session_state.autenticado:
 )
 
     time_filtro = st.selectbox("Selecione um time para análise dos jogos", ["Todos"] + times_disponiveis)
+    indice_jogos = obter_indice_jogos(df_jogos, chave_jogos)
     col1, col2 = st.columns(2)
 
     with col1:
         if st.button("Mostrar Últimos 5 Jogos"):
-            df_filtro = filtrar_jogos(df_jogos, None if time_filtro == "Todos" else time_filtro, ultimos=True, n=5)
+            df_filtro = indice_jogos.ultimos(None if time_filtro == "Todos" else time_filtro, n=5)
             st.dataframe(df_filtro[['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']])
 
     with col2:
         if st.button("Mostrar Próximos 5 Jogos"):
-            df_futuros = df_jogos[df_jogos['gols_mandante'].isna() | df_jogos['gols_visitante'].isna()]
-            df_filtro = filtrar_jogos(df_futuros, None if time_filtro == "Todos" else time_filtro, ultimos=False, n=5)
+            df_filtro = indice_jogos.proximos(None if time_filtro == "Todos" else time_filtro, n=5)
             st.dataframe(df_filtro[['data', 'rodada', 'mandante', 'visitante']])
 
     # Últimas rodadas com resultados
-    jogos_com_resultado = df_jogos[
-        df_jogos['gols_mandante'].notnull() &
-        df_jogos['gols_visitante'].notnull() &
-        (df_jogos['gols_mandante'] != '') &
-        (df_jogos['gols_visitante'] != '')
-    ]
-    rodadas_completas = jogos_com_resultado.groupby('rodada').filter(
-        lambda x: x.shape[0] == df_jogos[df_jogos['rodada'] == x['rodada'].iloc[0]].shape[0]
-    )['rodada'].unique()
-
-    ultimas_5_rodadas = sorted(rodadas_completas)[-5:]
+    ultimas_5_rodadas = listar_rodadas_completas(indice)[-5:]
     rodada_selecionada = st.selectbox("Selecione uma rodada com resultados disponíveis:", ultimas_5_rodadas)
-    jogos_rodada = jogos_com_resultado[jogos_com_resultado['rodada'] == rodada_selecionada]
+    jogos_rodada = df_jogos[df_jogos['rodada'] == rodada_selecionada]  # rodada completa: todos com resultado
     st.write(f"Jogos da rodada {rodada_selecionada} com resultado:")
     st.dataframe(jogos_rodada)
\ No newline at end of file
@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from aiohttp import web
+
+from base_compartilhada import BaseCompartilhada
+from classificacao import MotorClassificacao
+from estatisticas import metricas_time, montar_partidas_por_time, resumir_times
+from indices import IndiceJogos, indice_rodadas, listar_rodadas_completas, listar_rodadas_pendentes, obter_rodada_atual
+from relatorios import intervalo_rodadas
+
+# ---------- API JSON somente leitura ----------
+# Serviço ao lado do app Streamlit que expõe classificação, métricas por time,
+# últimos/próximos jogos e rodadas a partir da mesma base compartilhada
+# (base_compartilhada.py, com a recarga pelo mtime dos arquivos). Índices e
+# motor são montados uma vez por versão dos dados; as respostas prontas ficam
+# num LRU por (versão, URL). Toda resposta leva um ETag forte derivado da
+# versão dos dados (assinatura dos arquivos) + URL; com If-None-Match igual a
+# resposta é 304, sem montar nada (If-None-Match: * só vira 304 se a consulta
+# for válida). A montagem numa falha do LRU roda num executor, sem travar o
+# laço de eventos.
+#
+#   python api.py --porta 8502
+#   curl -i localhost:8502/classificacao?rodadas=1-10
+#
+# Rotas: /versao, /times, /rodadas, /classificacao?rodadas=,
+#        /times/{time}/metricas?rodadas=, /times/{time}/ultimos?n=, /times/{time}/proximos?n=
+
+PASTA_BASE = os.path.dirname(os.path.abspath(__file__))
+PORTA = 8502
+MAX_RESPOSTAS = 4096
+MAX_JOGOS = 50  # limite de n em ultimos/proximos
+COLUNAS_JOGOS = ['data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']
+
+
+class ErroConsulta(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+# Estruturas derivadas de uma versão dos dados, montadas só quando pedidas
+class Derivados:
+    def __init__(self, dados):
+        self.dados = dados
+        self._trava = threading.Lock()
+        self._cache = {}
+
+    def _obter(self, nome, montar):
+        with self._trava:
+            if nome not in self._cache:
+                self._cache[nome] = montar()
+            return self._cache[nome]
+
+    def motor(self):
+        return self._obter("motor", lambda: MotorClassificacao(self.dados.jogos))
+
+    def indice_jogos(self):
+        return self._obter("indice_jogos", lambda: IndiceJogos(self.dados.jogos))
+
+    def indice_rodadas(self):
+        return self._obter("indice_rodadas", lambda: indice_rodadas(self.dados.jogos))
+
+    # Só o resumo de todas as rodadas fica guardado; recortes por rodada ficam no LRU de respostas
+    def resumo(self, rodadas=None):
+        if rodadas:
+            jogos = self.dados.jogos
+            return resumir_times(montar_partidas_por_time(jogos[jogos['rodada'].isin(rodadas)]))
+        return self._obter("resumo", lambda: resumir_times(montar_partidas_por_time(self.dados.jogos)))
+
+
+def _json(valor):
+    return json.dumps(valor, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _registros(df):
+    return json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
+
+
+def _rodadas(request):
+    texto = request.query.get("rodadas")
+    if not texto:
+        return None
+    try:
+        return tuple(sorted(set(intervalo_rodadas(texto))))
+    except ValueError:
+        raise ErroConsulta(400, f"rodadas inválidas: {texto}")
+
+
+def _n(request):
+    try:
+        return max(0, min(int(request.query.get("n", 5)), MAX_JOGOS))
+    except ValueError:
+        raise ErroConsulta(400, f"n inválido: {request.query['n']}")
+
+
+def _time(request, derivados):
+    time_ = request.match_info["time"]
+    if time_ not in derivados.dados.times:
+        raise ErroConsulta(404, f"time não encontrado: {time_}")
+    return time_
+
+
+# ---------- Conteúdo de cada rota (recebe a requisição e os derivados da versão atual) ----------
+def rota_versao(request, derivados):
+    dados = derivados.dados
+    # sem o número da versão (recomeça em 1 a cada processo): o corpo depende só da assinatura, como o ETag.
+    # Nada de caminhos absolutos numa rota pública: a chave é um hash de mtime/tamanho e da
+    # classificação vai só o nome do arquivo
+    classificacao = dados.caminho_classificacao and os.path.basename(dados.caminho_classificacao)
+    return {"chave": dados.chave, "classificacao": classificacao}
+
+
+def rota_times(request, derivados):
+    return derivados.dados.times
+
+
+def rota_rodadas(request, derivados):
+    indice = derivados.indice_rodadas()
+    return {
+        "atual": obter_rodada_atual(indice),
+        "completas": listar_rodadas_completas(indice),
+        "pendentes": listar_rodadas_pendentes(indice),
+        "rodadas": _registros(indice.reset_index()),
+    }
+
+
+def rota_classificacao(request, derivados):
+    rodadas = _rodadas(request)
+    motor = derivados.motor()
+    tabela = motor.tabela_rodadas(rodadas) if rodadas else motor.tabela()
+    df_class = derivados.dados.classificacao
+    if not df_class.empty and "Classificação ou descenso" in df_class.columns:
+        zonas = df_class.set_index(df_class.columns[0])["Classificação ou descenso"]
+        tabela["Classificação ou descenso"] = tabela["Pos"].map(zonas)
+    return _registros(tabela)
+
+
+def rota_metricas(request, derivados):
+    time_ = _time(request, derivados)
+    resumo = derivados.resumo(_rodadas(request))
+    if time_ not in resumo.index:
+        raise ErroConsulta(404, f"sem jogos de {time_} nas rodadas pedidas")
+    return metricas_time(resumo, time_)
+
+
+def rota_ultimos(request, derivados):
+    jogos = derivados.indice_jogos().ultimos(_time(request, derivados), n=_n(request))
+    return _registros(jogos[COLUNAS_JOGOS])
+
+
+def rota_proximos(request, derivados):
+    jogos = derivados.indice_jogos().proximos(_time(request, derivados), n=_n(request))
+    return _registros(jogos[COLUNAS_JOGOS])
+
+
+ROTAS = [
+    ("/versao", rota_versao),
+    ("/times", rota_times),
+    ("/rodadas", rota_rodadas),
+    ("/classificacao", rota_classificacao),
+    ("/times/{time}/metricas", rota_metricas),
+    ("/times/{time}/ultimos", rota_ultimos),
+    ("/times/{time}/proximos", rota_proximos),
+]
+
+
+class ServicoEstatisticas:
+    def __init__(self, base, max_respostas=MAX_RESPOSTAS):
+        self.base = base
+        self.max_respostas = max_respostas
+        self._trava = threading.Lock()
+        self._derivados = None
+        self._respostas = OrderedDict()  # (chave da versão, URL) -> (etag, corpo)
+
+    def derivados(self, dados):
+        with self._trava:
+            if self._derivados is None or self._derivados.dados is not dados:
+                self._derivados = Derivados(dados)
+                self._respostas.clear()  # versão nova: respostas antigas não servem mais
+            return self._derivados
+
+    def _responder(self, conteudo):
+        async def handler(request):
+            dados = self.base.atual()
+            if dados.jogos is None:
+                return web.json_response({"erro": "arquivo de jogos não encontrado"}, status=503)
+            # a assinatura cobre jogos e classificação (mtime/tamanho), então o ETag sobrevive a reinícios
+            chave = (dados.assinatura, request.path_qs)
+            etag = '"' + hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()[:24] + '"'
+            cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+            pedidos = {e.strip() for e in request.headers.get("If-None-Match", "").split(",")}
+            # ETag igual: o cliente já recebeu um 200 desta URL nesta versão dos dados
+            if etag in pedidos:
+                return web.Response(status=304, headers=cabecalhos)
+
+            with self._trava:
+                pronta = self._respostas.get(chave)
+                if pronta is not None:
+                    self._respostas.move_to_end(chave)
+            if pronta is None:
+                try:
+                    corpo = await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: _json(conteudo(request, self.derivados(dados))))
+                except ErroConsulta as e:
+                    return web.json_response({"erro": str(e)}, status=e.status)
+                with self._trava:
+                    self._respostas[chave] = pronta = (etag, corpo)
+                    while len(self._respostas) > self.max_respostas:
+                        self._respostas.popitem(last=False)
+            if "*" in pedidos:  # a consulta é válida, então a representação existe
+                return web.Response(status=304, headers=cabecalhos)
+            return web.Response(body=pronta[1], content_type="application/json", charset="utf-8", headers=cabecalhos)
+        return handler
+
+    def app(self):
+        app = web.Application()
+        for caminho, conteudo in ROTAS:
+            app.router.add_get(caminho, self._responder(conteudo))
+        return app
+
+
+def criar_app(caminho_jogos=None, caminhos_classificacao=None):
+    base = BaseCompartilhada(
+        caminho_jogos or os.path.join(PASTA_BASE, "jogos_atualizados.xlsx"),
+        caminhos_classificacao or [os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.xlsx"),
+                                   os.path.join(PASTA_BASE, "tabela_classificacao_atualizada.csv")],
+    ).iniciar_vigia()
+    return ServicoEstatisticas(base).app()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API JSON (somente leitura) com as estatísticas do app.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--jogos", help="planilha de jogos (padrão: jogos_atualizados.xlsx)")
+    parser.add_argument("--classificacao", nargs="+", help="planilhas de classificação, na ordem de preferência")
+    args = parser.parse_args()
+
+    web.run_app(criar_app(args.jogos, args.classificacao), host=args.host, port=args.porta, access_log=None)
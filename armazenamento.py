@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow, lê direto da planilha (como antes)
+    pa = pq = None
+
+# ---------- Cache colunar (Parquet) das planilhas ----------
+# Para cada planilha/aba (e preparador) lida, guarda uma cópia em Parquet na
+# pasta "cache_parquet" ao lado do arquivo de origem. O mtime e o tamanho da origem
+# vão nos metadados do Parquet: enquanto batem, a leitura vem do Parquet (e só
+# das colunas pedidas); quando a origem muda, a cópia é refeita uma vez.
+# Se a cópia não puder ser gravada, a leitura da origem vale do mesmo jeito.
+
+PASTA_SIDECAR = "cache_parquet"
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return {b"origem_mtime_ns": str(info.st_mtime_ns).encode(), b"origem_tamanho": str(info.st_size).encode()}
+
+
+# O preparador entra na chave: leitura crua e leitura preparada do mesmo arquivo
+# ficam em cópias separadas (por nome qualificado, então use funções nomeadas)
+def _rotulo_preparador(preparar):
+    if preparar is None:
+        return ""
+    return f"{getattr(preparar, '__module__', '')}.{getattr(preparar, '__qualname__', repr(preparar))}"
+
+
+def caminho_sidecar(caminho, sheet_name=None, preparar=None):
+    caminho = os.path.abspath(caminho)
+    chave = hashlib.sha1(f"{caminho}|{sheet_name}|{_rotulo_preparador(preparar)}".encode("utf-8")).hexdigest()[:12]
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    return os.path.join(os.path.dirname(caminho), PASTA_SIDECAR, f"{nome}.{chave}.parquet")
+
+
+def sidecar_valido(caminho, sidecar):
+    if pq is None or not os.path.exists(sidecar):
+        return False
+    try:
+        metadados = pq.read_schema(sidecar).metadata or {}
+    except (OSError, pa.ArrowException):
+        return False
+    assinatura = _assinatura(caminho)
+    return all(metadados.get(k) == v for k, v in assinatura.items())
+
+
+def _ler_origem(caminho, sheet_name):
+    if caminho.lower().endswith(".csv"):
+        return pd.read_csv(caminho)
+    return pd.read_excel(caminho, sheet_name=0 if sheet_name is None else sheet_name)
+
+
+def _gravar_sidecar(df, caminho, sidecar, assinatura):
+    try:
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, ValueError, TypeError):
+        return False  # colunas com tipos misturados: segue sem cópia colunar
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), **assinatura})
+    temporario = f"{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, sidecar)
+    except OSError:  # pasta somente leitura, disco cheio: a leitura segue sem a cópia colunar
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+# Lê uma planilha (ou CSV) passando pelo Parquet. "preparar" ajusta tipos
+# (ex.: datas) antes de gravar a cópia, para não repetir a conversão a cada leitura.
+# "colunas": só estas (as que existirem na origem); a cópia guarda todas, então
+# leitores com colunas diferentes usam o mesmo Parquet.
+def ler_tabela(caminho, sheet_name=None, colunas=None, preparar=None):
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(caminho)
+    colunas = list(colunas) if colunas is not None else None
+    sidecar = caminho_sidecar(caminho, sheet_name, preparar)
+    if sidecar_valido(caminho, sidecar):
+        if colunas is not None:
+            existentes = set(pq.read_schema(sidecar).names)
+            colunas = [c for c in colunas if c in existentes]
+        return pd.read_parquet(sidecar, columns=colunas)
+
+    assinatura = _assinatura(caminho)
+    df = _ler_origem(caminho, sheet_name)
+    if preparar is not None:
+        df = preparar(df)
+    if pq is not None:
+        _gravar_sidecar(df, caminho, sidecar, assinatura)
+    return df[[c for c in colunas if c in df.columns]] if colunas is not None else df
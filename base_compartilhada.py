@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+from armazenamento import ler_tabela
+from esquema import COLUNAS_CLASSIFICACAO, ler_jogos, normalizar_jogos
+from extrator_wikipedia import confrontos_para_jogos
+
+# ---------- Base de dados compartilhada pelo processo ----------
+# Um único objeto por processo (no app, via st.cache_resource) guarda os jogos,
+# a classificação e a lista de times numa "versão"
+# imutável. Todas as sessões leem a mesma versão, sem cópia por sessão (o
+# pandas 3 usa copy-on-write, então um filtro numa sessão não altera a versão
+# compartilhada). Uma thread confere o mtime/tamanho dos arquivos de tempos em
+# tempos; se mudaram, monta a versão nova (relendo só o arquivo que mudou) e
+# só então troca a referência. As sessões nunca veem um estado pela metade nem
+# pagam a recarga.
+# Os jogos são o calendário da planilha com os placares da aba "Confrontos" que
+# o app grava a partir da Wikipedia (extrator_wikipedia.confrontos_para_jogos).
+# Se o quadro não casar com o calendário, valem os placares da planilha e o
+# motivo fica em erro_confrontos.
+
+INTERVALO_VERIFICACAO = float(os.environ.get("EVOLUTION_INTERVALO_RECARGA", 2.0))  # segundos
+
+
+def _assinatura(caminhos):
+    assinatura = []
+    for caminho in caminhos:
+        try:
+            info = os.stat(caminho)
+            assinatura.append((caminho, info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            assinatura.append((caminho, None, None))
+    return tuple(assinatura)
+
+
+# Aba "Confrontos" da planilha de classificação (o CSV e planilhas antigas não têm)
+def _ler_confrontos(caminho):
+    if not caminho.lower().endswith(".xlsx"):
+        return None
+    try:
+        return ler_tabela(caminho, sheet_name="Confrontos")
+    except ValueError:  # planilha sem a aba
+        return None
+
+
+def _aplicar_confrontos(calendario, confrontos):
+    if calendario is None or confrontos is None:
+        return calendario, None
+    try:
+        return normalizar_jogos(confrontos_para_jogos(confrontos, calendario)), None
+    except ValueError as e:
+        return calendario, e
+
+
+class VersaoDados:
+    def __init__(self, numero, assinatura, jogos, classificacao, caminho_classificacao, times=None,
+                 calendario=None, confrontos=None, erro_confrontos=None):
+        self.numero = numero
+        self.assinatura = assinatura
+        self.jogos = jogos
+        self.calendario = calendario
+        self.confrontos = confrontos
+        self.erro_confrontos = erro_confrontos
+        self.classificacao = classificacao
+        self.caminho_classificacao = caminho_classificacao
+        if times is None:
+            times = [] if jogos is None else sorted(
+                t for t in pd.unique(jogos[['mandante', 'visitante']].values.ravel('K')) if pd.notna(t))
+        self.times = times
+        # chave para os caches por conjunto de jogos: muda quando muda algum arquivo de onde
+        # os jogos vieram (a planilha e, com placares da Wikipedia, a de classificação).
+        # Só mtime/tamanho entram no hash: a chave é exposta pela API e não leva caminhos
+        fontes = assinatura if jogos is not calendario else assinatura[:1]
+        marcas = [(mtime_ns, tamanho) for _, mtime_ns, tamanho in fontes]
+        self.chave = hashlib.sha1(repr(marcas).encode("utf-8")).hexdigest()[:24]
+
+
+class BaseCompartilhada:
+    def __init__(self, caminho_jogos, caminhos_classificacao, intervalo=INTERVALO_VERIFICACAO):
+        self.caminho_jogos = caminho_jogos
+        self.caminhos_classificacao = list(caminhos_classificacao)  # o primeiro que existir é usado
+        self.intervalo = intervalo
+        self.ultimo_erro = None
+        self._trava = threading.Lock()
+        self._atual = self._carregar(1)  # a primeira carga é síncrona
+        self._thread = None
+
+    # anterior: versão atual; o que não mudou (jogos ou classificação) é reaproveitado dela
+    def _carregar(self, numero, anterior=None):
+        assinatura = _assinatura([self.caminho_jogos] + self.caminhos_classificacao)
+        if anterior is not None and assinatura[0] == anterior.assinatura[0]:
+            calendario, times = anterior.calendario, anterior.times
+        else:
+            calendario, times = None, None  # sem a planilha de jogos (só catálogo de temporadas, por exemplo)
+            if os.path.exists(self.caminho_jogos):
+                calendario = ler_jogos(self.caminho_jogos)  # validado e no esquema compacto (esquema.py)
+        if anterior is not None and assinatura[1:] == anterior.assinatura[1:]:
+            classificacao, caminho_classificacao = anterior.classificacao, anterior.caminho_classificacao
+            confrontos = anterior.confrontos
+        else:
+            caminho_classificacao = next((c for c in self.caminhos_classificacao if os.path.exists(c)), None)
+            classificacao, confrontos = pd.DataFrame(), None
+            if caminho_classificacao:
+                classificacao = ler_tabela(caminho_classificacao, sheet_name="Classificação",
+                                           colunas=COLUNAS_CLASSIFICACAO)
+                confrontos = _ler_confrontos(caminho_classificacao)
+        if anterior is not None and calendario is anterior.calendario and confrontos is anterior.confrontos:
+            jogos, erro_confrontos = anterior.jogos, anterior.erro_confrontos
+        else:
+            jogos, erro_confrontos = _aplicar_confrontos(calendario, confrontos)
+        return VersaoDados(numero, assinatura, jogos, classificacao, caminho_classificacao, times,
+                           calendario, confrontos, erro_confrontos)
+
+    # Leitura usada pelas sessões: só devolve a referência da versão atual
+    def atual(self):
+        return self._atual
+
+    # Recarrega se algum arquivo mudou; retorna True se trocou de versão
+    def verificar(self):
+        with self._trava:
+            atual = self._atual
+            if _assinatura([self.caminho_jogos] + self.caminhos_classificacao) == atual.assinatura:
+                return False
+            try:
+                nova = self._carregar(atual.numero + 1, atual)
+            except Exception as e:  # arquivo no meio de uma gravação, por exemplo: tenta de novo depois
+                self.ultimo_erro = e
+                return False
+            self.ultimo_erro = None
+            self._atual = nova  # troca atômica da referência
+            return True
+
+    def _vigiar(self):
+        while True:
+            time.sleep(self.intervalo)
+            self.verificar()
+
+    def iniciar_vigia(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._vigiar, name="vigia-base", daemon=True)
+            self._thread.start()
+        return self
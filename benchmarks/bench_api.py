@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+import numpy as np
+
+from liga_sintetica import liga_sintetica
+
+# ---------- Carga na API JSON (api.py) ----------
+# Sem --url, grava uma liga sintética numa pasta temporária e sobe o api.py
+# num processo separado em 127.0.0.1. Dispara requisições concorrentes num
+# ciclo de URLs (classificação, métricas, últimos/próximos, rodadas) em duas
+# fases: sem cabeçalho condicional (200 vindos do LRU de respostas) e
+# revalidando com o ETag recebido (304). Mostra req/s e latências.
+#
+#   python benchmarks/bench_api.py --requisicoes 20000 --concorrencia 64
+#   python benchmarks/bench_api.py --url http://127.0.0.1:8502
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir_api(pasta):
+    caminho = os.path.join(pasta, "jogos.xlsx")
+    liga_sintetica(disputadas=20).to_excel(caminho, index=False)
+    porta = porta_livre()
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.Popen([sys.executable, os.path.join(raiz, "api.py"), "--porta", str(porta),
+                                 "--jogos", caminho, "--classificacao", os.path.join(pasta, "classificacao.csv")],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return processo, f"http://127.0.0.1:{porta}"
+
+
+async def esperar(sessao, url, limite=60):
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite:
+        try:
+            async with sessao.get(f"{url}/versao") as resposta:
+                if resposta.status == 200:
+                    return
+        except aiohttp.ClientConnectionError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"API não respondeu em {url}")
+
+
+async def montar_urls(sessao, url):
+    async with sessao.get(f"{url}/times") as resposta:
+        times = await resposta.json()
+    urls = [f"{url}/classificacao", f"{url}/classificacao?rodadas=1-10", f"{url}/rodadas"]
+    for time_ in times:
+        nome = quote(time_)
+        urls += [f"{url}/times/{nome}/metricas", f"{url}/times/{nome}/ultimos?n=5", f"{url}/times/{nome}/proximos?n=5"]
+    return urls
+
+
+async def fase(sessao, urls, requisicoes, concorrencia, etags=None):
+    latencias = np.zeros(requisicoes)
+    status = {}
+    proxima = iter(range(requisicoes))
+
+    async def trabalhador():
+        for i in proxima:
+            url = urls[i % len(urls)]
+            cabecalhos = {"If-None-Match": etags[url]} if etags else None
+            inicio = time.perf_counter()
+            async with sessao.get(url, headers=cabecalhos) as resposta:
+                await resposta.read()
+                if etags is None:
+                    vistos[url] = resposta.headers.get("ETag")
+            latencias[i] = time.perf_counter() - inicio
+            status[resposta.status] = status.get(resposta.status, 0) + 1
+
+    vistos = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    segundos = time.perf_counter() - inicio
+    return {"segundos": segundos, "rps": requisicoes / segundos, "status": status,
+            "p50_ms": np.percentile(latencias, 50) * 1000, "p99_ms": np.percentile(latencias, 99) * 1000}, vistos
+
+
+async def rodar(url, requisicoes, concorrencia):
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(connector=conector) as sessao:
+        await esperar(sessao, url)
+        urls = await montar_urls(sessao, url)
+        await fase(sessao, urls, len(urls), concorrencia)  # aquecimento: monta índices e respostas
+        resultado, etags = await fase(sessao, urls, requisicoes, concorrencia)
+        revalidacao, _ = await fase(sessao, urls, requisicoes, concorrencia, etags)
+        return len(urls), [("200 (LRU)", resultado), ("304 (If-None-Match)", revalidacao)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API JSON em localhost.")
+    parser.add_argument("--url", help="API já rodando (padrão: sobe uma com dados sintéticos)")
+    parser.add_argument("--requisicoes", type=int, default=20000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    args = parser.parse_args()
+
+    processo = None
+    with tempfile.TemporaryDirectory(prefix="bench_api_") as pasta:
+        url = args.url
+        if url is None:
+            processo, url = subir_api(pasta)
+        try:
+            n_urls, fases = asyncio.run(rodar(url.rstrip("/"), args.requisicoes, args.concorrencia))
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait()
+    print(f"{args.requisicoes} requisições por fase, {args.concorrencia} conexões, {n_urls} URLs distintas")
+    for rotulo, r in fases:
+        print(f"{rotulo:>20}: {r['rps']:8.0f} req/s | p50 {r['p50_ms']:.2f} ms | p99 {r['p99_ms']:.2f} ms | "
+              f"status {r['status']}")
@@ -0,0 +1,87 @@
+import argparse
+import io
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from cache_wikipedia import CacheWikipedia
+from extrator_wikipedia import extrair_tabelas
+from liga_sintetica import CAMINHO_PAGINA
+
+# ---------- Benchmark: BeautifulSoup + pd.read_html x extrator lxml ----------
+# Cada caminho roda num processo próprio; o pico de memória é o aumento do
+# RSS máximo durante a extração (inclui as alocações em C do lxml/libxml2,
+# que o tracemalloc não enxerga).
+
+TITULOS = ["Classificação", "Confrontos"]
+
+
+# Caminho antigo do app: html.parser na página inteira e read_html por tabela
+def extrair_bs4_read_html(html):
+    soup = BeautifulSoup(html, "html.parser")
+    tabelas = {}
+    for titulo in TITULOS:
+        tabelas[titulo] = None
+        for header in soup.find_all(["h2", "h3"]):
+            if titulo.lower() in header.get_text(strip=True).lower():
+                tabela = header.find_next("table", {"class": "wikitable"})
+                if tabela is not None:
+                    tabelas[titulo] = pd.read_html(io.StringIO(str(tabela)))[0]
+                    break
+    return tabelas
+
+
+def extrair_lxml(html):
+    return extrair_tabelas(html, TITULOS)
+
+
+CAMINHOS = {"bs4+read_html": extrair_bs4_read_html, "lxml": extrair_lxml}
+
+
+def _medir(nome, html, repeticoes, fila):
+    funcao = CAMINHOS[nome]
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    funcao(html)
+    pico_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - antes
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(html)
+        tempos.append(time.perf_counter() - inicio)
+    fila.put({"caminho": nome, "melhor_ms": min(tempos) * 1000,
+              "mediana_ms": sorted(tempos)[len(tempos) // 2] * 1000, "pico_memoria_mb": pico_kb / 1024})
+
+
+def medir(html, repeticoes=10):
+    contexto = mp.get_context("spawn")
+    resultados = []
+    for nome in CAMINHOS:
+        fila = contexto.Queue()
+        processo = contexto.Process(target=_medir, args=(nome, html, repeticoes, fila))
+        processo.start()
+        resultados.append(fila.get())
+        processo.join()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o extrator lxml com BeautifulSoup + read_html.")
+    cache = CacheWikipedia().caminho_html
+    parser.add_argument("--html", default=cache if os.path.exists(cache) else CAMINHO_PAGINA,
+                        help="página da Wikipedia salva (padrão: cópia do cache em disco ou a fixture)")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    with open(args.html, encoding="utf-8") as f:
+        html = f.read()
+    print(f"Página: {args.html} ({len(html) / 1024:.0f} KiB)")
+    for r in medir(html, args.repeticoes):
+        print(f"{r['caminho']:>14}: melhor {r['melhor_ms']:7.1f} ms | mediana {r['mediana_ms']:7.1f} ms"
+              f" | pico de memória {r['pico_memoria_mb']:6.1f} MiB")
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from ingestao import ingerir
+from liga_sintetica import CAMINHO_PAGINA
+
+# ---------- Ingestão de ponta a ponta contra um servidor local ----------
+# Sobe um servidor aiohttp em 127.0.0.1 que serve a página de fixture em
+# várias URLs (uma por "competição"), com latência artificial, ETag e uma
+# falha 503 na primeira requisição de algumas páginas. Roda a ingestão em
+# sequência (concorrência 1) e concorrente, e depois de novo para conferir
+# que as páginas sem mudança voltam 304.
+
+
+def criar_app(html, latencia, falhas, estado):
+    etag = '"' + hashlib.sha1(html.encode("utf-8")).hexdigest() + '"'
+    vistas = set()
+
+    async def pagina(request):
+        await asyncio.sleep(latencia)
+        nome = request.match_info["nome"]
+        if nome in falhas and (estado["rodada"], nome) not in vistas:
+            vistas.add((estado["rodada"], nome))
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/wiki/{nome}", pagina)
+    return app
+
+
+def iniciar_servidor(app):
+    pronto = threading.Event()
+    estado = {}
+
+    def rodar():
+        laco = asyncio.new_event_loop()
+        asyncio.set_event_loop(laco)
+        runner = web.AppRunner(app)
+        laco.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        laco.run_until_complete(site.start())
+        estado["porta"] = site._server.sockets[0].getsockname()[1]
+        pronto.set()
+        laco.run_forever()
+
+    threading.Thread(target=rodar, daemon=True).start()
+    pronto.wait()
+    return estado["porta"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestão concorrente contra um servidor local de fixture.")
+    parser.add_argument("--fontes", type=int, default=8)
+    parser.add_argument("--latencia", type=float, default=0.3, help="segundos por resposta do servidor")
+    parser.add_argument("--concorrencia", type=int, default=4)
+    args = parser.parse_args()
+
+    with open(CAMINHO_PAGINA, encoding="utf-8") as f:
+        html = f.read()
+    nomes = [f"competicao_{i}" for i in range(args.fontes)]
+    estado = {"rodada": 0}  # muda a cada rodada para a falha 503 se repetir
+    app = criar_app(html, args.latencia, set(nomes[::3]), estado)
+    porta = iniciar_servidor(app)
+    fontes = [{"competicao": nome, "temporada": 2025, "url": f"http://127.0.0.1:{porta}/wiki/{nome}"} for nome in nomes]
+
+    # sequencial e concorrente partem de caches vazios; a última rodada reaproveita o da concorrente
+    with tempfile.TemporaryDirectory(prefix="ingestao_") as pasta_sequencial, \
+            tempfile.TemporaryDirectory(prefix="ingestao_") as pasta_concorrente:
+        for rodada, (rotulo, concorrencia, pasta) in enumerate([
+                ("sequencial", 1, pasta_sequencial), ("concorrente", args.concorrencia, pasta_concorrente),
+                ("concorrente (cache)", args.concorrencia, pasta_concorrente)]):
+            estado["rodada"] = rodada
+            inicio = time.perf_counter()
+            resultados = ingerir(fontes, concorrencia, pasta_cache=pasta, espera_base=0.05)
+            segundos = time.perf_counter() - inicio
+            extraidas = sum(all(t is not None for t in r["tabelas"].values()) for r in resultados)
+            status = sorted({r["status"] for r in resultados}, key=str)
+            erros = [r["erro"] for r in resultados if r["erro"]]
+            print(f"{rotulo:>20}: {segundos:6.2f} s | {extraidas}/{len(fontes)} com tabelas | status {status} | "
+                  f"{sum(r['tentativas'] for r in resultados)} tentativas | erros {erros}")
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import ler_tabela
+from liga_sintetica import liga_sintetica
+from simulador import preparar_simulacao, simular
+
+# ---------- Benchmark do simulador: temporadas simuladas por segundo ----------
+# Roda o mesmo número de simulações com 1, 2, 4, ... processos (até o número
+# de núcleos) e mostra a vazão e o ganho em relação a um processo.
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede temporadas simuladas por segundo.")
+    parser.add_argument("--jogos", help="planilha de jogos (padrão: liga sintética de 20 times)")
+    parser.add_argument("--disputadas", type=int, default=19, help="rodadas já disputadas na liga sintética")
+    parser.add_argument("--simulacoes", type=int, default=200_000)
+    parser.add_argument("--max-processos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    df_jogos = ler_tabela(args.jogos) if args.jogos else liga_sintetica(disputadas=args.disputadas)
+    estado = preparar_simulacao(df_jogos)
+    print(f"{len(estado['times'])} times, {len(estado['casa'])} jogos restantes, {args.simulacoes} simulações")
+
+    processos, base = 1, None
+    while processos <= args.max_processos:
+        inicio = time.perf_counter()
+        simular(df_jogos, args.simulacoes, processos=processos, estado=estado)
+        vazao = args.simulacoes / (time.perf_counter() - inicio)
+        base = base or vazao
+        print(f"{processos:3d} processo(s): {vazao:12,.0f} temporadas/s (x{vazao / base:.2f})")
+        processos *= 2
@@ -0,0 +1,389 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import caminho_sidecar, ler_tabela
+from bench_extrator import extrair_bs4_read_html
+from classificacao import MotorClassificacao
+from eliminacao import SolverZonas
+from esquema import normalizar_jogos
+from estatisticas import montar_partidas_por_time, resumir_times, tendencia_times
+from extrator_wikipedia import confrontos_para_jogos, extrair_tabelas
+from indices import IndiceJogos, indice_rodadas, listar_rodadas_completas
+from liga_sintetica import CAMINHO_PAGINA, historico_sintetico, liga_sintetica
+from ratings import MotorRatings
+from simulador import simular
+
+# ---------- Suíte de benchmarks dos caminhos de dados e de análise ----------
+# Cada etapa roda sobre uma liga sintética (liga_sintetica.py) ou sobre a
+# página da Wikipedia salva em fixtures/. Tempo: melhor e mediana de N
+# repetições intercaladas; memória: pico do tracemalloc numa execução separada
+# (só alocações Python/NumPy/pandas, não as do libxml2). As etapas que
+# substituíram um caminho do app original também medem uma cópia desse caminho
+# (abaixo), sobre o mesmo frame, e o resultado traz a aceleração medida. O
+# resultado vai para um JSON; com --baseline, cada etapa é comparada com um
+# resultado guardado e o script sai com código 1 se alguma ficou mais lenta que
+# a tolerância e a folga, e de novo numa segunda medição só dela.
+
+PASTA_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+PASTA_RESULTADOS = os.path.join(PASTA_BENCHMARKS, "resultados")
+CAMINHO_BASELINE = os.path.join(PASTA_BENCHMARKS, "baseline.json")
+TOLERANCIA = 1.25  # etapa 25% mais lenta que a baseline conta como regressão
+FOLGA_MS = 5.0  # diferenças menores que isso são ruído de medição (etapas de 10-20 ms oscilam alguns ms)
+REPETICOES = 20
+
+
+# ---------- Etapas ----------
+# Cada etapa recebe o contexto (liga, página, pasta temporária) e devolve a
+# função medida; o que é preparação fica fora da medição.
+
+
+# Numa cópia própria da planilha: apagar a cópia Parquet não afeta a etapa ler_parquet
+def etapa_ler_planilha(ctx):
+    planilha = os.path.join(ctx['pasta'], "fria", os.path.basename(ctx['planilha']))
+    os.makedirs(os.path.dirname(planilha), exist_ok=True)
+    shutil.copy(ctx['planilha'], planilha)
+
+    def medir():
+        shutil.rmtree(os.path.dirname(caminho_sidecar(planilha)), ignore_errors=True)
+        ler_tabela(planilha)
+    return medir
+
+
+def etapa_ler_parquet(ctx):
+    ler_tabela(ctx['planilha'])
+    return lambda: ler_tabela(ctx['planilha'])
+
+
+def etapa_normalizar_jogos(ctx):
+    return lambda: normalizar_jogos(ctx['bruto'])
+
+
+# Extração + placares dos Confrontos sobre o calendário da liga da página (20 times, sem placares)
+def etapa_extrair_wikipedia(ctx):
+    calendario = normalizar_jogos(liga_sintetica(disputadas=0))
+
+    def medir():
+        tabelas = extrair_tabelas(ctx['pagina'], ["Classificação", "Confrontos"])
+        normalizar_jogos(confrontos_para_jogos(tabelas["Confrontos"], calendario))
+    return medir
+
+
+def etapa_analise_times(ctx):
+    def medir():
+        partidas = montar_partidas_por_time(ctx['jogos'])
+        resumir_times(partidas)
+        tendencia_times(partidas)
+    return medir
+
+
+def etapa_classificacao(ctx):
+    rodadas = sorted(ctx['jogos']['rodada'].dropna().unique())
+    return lambda: MotorClassificacao(ctx['jogos']).tabela_rodadas(rodadas[-5:])
+
+
+def etapa_rodadas_completas(ctx):
+    return lambda: listar_rodadas_completas(indice_rodadas(ctx['jogos']))
+
+
+def etapa_ultimos_proximos(ctx):
+    times = sorted(pd.unique(ctx['jogos'][['mandante', 'visitante']].values.ravel('K')))
+
+    def medir():
+        indice = IndiceJogos(ctx['jogos'])
+        for time_ in times:
+            indice.ultimos(time_)
+            indice.proximos(time_)
+    return medir
+
+
+def etapa_ratings(ctx):
+    caminho = os.path.join(ctx['pasta'], "ratings.json")
+    return lambda: MotorRatings(caminho).atualizar(ctx['jogos'], salvar=False)
+
+
+def etapa_simulador(ctx):
+    ultima = ctx['jogos'][ctx['jogos']['temporada'] == ctx['jogos']['temporada'].max()]
+    return lambda: simular(ultima, ctx['simulacoes'], processos=1)
+
+
+# Solver frio (sem limites da rodada anterior) com as zonas do Brasileirão
+def etapa_eliminacao(ctx):
+    ultima = ctx['jogos'][ctx['jogos']['temporada'] == ctx['jogos']['temporada'].max()]
+    zonas = {'Título': [1], 'Libertadores': [1, 2, 3, 4, 5, 6], 'Rebaixamento': [17, 18, 19, 20]}
+    return lambda: SolverZonas().atualizar(ultima, zonas)
+
+
+# ---------- Caminhos antigos (cópia do app antes da otimização) ----------
+# Rodam sobre o frame cru, como o app lia da planilha; só o st.* foi tirado.
+def calcular_aproveitamento(pontos, jogos):
+    return (pontos / (jogos * 3)) * 100 if jogos > 0 else 0
+
+
+def calcular_saldo(df, time):
+    gols_pro = df[df['mandante'] == time]['gols_mandante'].sum() + df[df['visitante'] == time]['gols_visitante'].sum()
+    gols_contra = df[df['mandante'] == time]['gols_visitante'].sum() + df[df['visitante'] == time]['gols_mandante'].sum()
+    return gols_pro - gols_contra
+
+
+def filtrar_jogos(df, time=None, ultimos=True, n=5):
+    df_ordenado = df.sort_values('data', ascending=not ultimos)
+    if time:
+        df_time = df_ordenado[(df_ordenado['mandante'] == time) | (df_ordenado['visitante'] == time)]
+    else:
+        df_time = df_ordenado
+    return df_time.head(n)
+
+
+def analisar_time(df, time):
+    df_time = df[(df['mandante'] == time) | (df['visitante'] == time)].copy()
+    if df_time.empty:
+        return None
+    df_time['resultado'] = df_time.apply(
+        lambda row: 'V' if (row['mandante'] == time and row['gols_mandante'] > row['gols_visitante']) or
+                    (row['visitante'] == time and row['gols_visitante'] > row['gols_mandante'])
+                    else ('E' if row['gols_mandante'] == row['gols_visitante'] else 'D'),
+        axis=1
+    )
+    vitorias = (df_time['resultado'] == 'V').sum()
+    empates = (df_time['resultado'] == 'E').sum()
+    jogos = len(df_time)
+    pontos = vitorias * 3 + empates
+    metricas = {
+        "aproveitamento": calcular_aproveitamento(pontos, jogos),
+        "saldo": calcular_saldo(df_time, time),
+        "gols_feitos": df_time[df_time['mandante'] == time]['gols_mandante'].sum()
+        + df_time[df_time['visitante'] == time]['gols_visitante'].sum(),
+        "media_mandante": df_time[df_time['mandante'] == time]['gols_mandante'].sum()
+        / max(1, len(df_time[df_time['mandante'] == time])),
+        "media_visitante": df_time[df_time['visitante'] == time]['gols_visitante'].sum()
+        / max(1, len(df_time[df_time['visitante'] == time])),
+    }
+    df_time = df_time.sort_values("rodada")
+    df_time['tendencia'] = df_time['resultado'].map({'V': 1, 'E': 0, 'D': -1}).cumsum()
+    return metricas, df_time
+
+
+def rodadas_completas(df_jogos):
+    jogos_com_resultado = df_jogos[
+        df_jogos['gols_mandante'].notnull() &
+        df_jogos['gols_visitante'].notnull() &
+        (df_jogos['gols_mandante'] != '') &
+        (df_jogos['gols_visitante'] != '')
+    ]
+    return sorted(jogos_com_resultado.groupby('rodada').filter(
+        lambda x: x.shape[0] == df_jogos[df_jogos['rodada'] == x['rodada'].iloc[0]].shape[0]
+    )['rodada'].unique())
+
+
+def _times_brutos(ctx):
+    return sorted(t for t in pd.unique(ctx['bruto'][['mandante', 'visitante']].values.ravel('K')) if pd.notna(t))
+
+
+def antigo_ler_planilha(ctx):
+    def medir():
+        df = pd.read_excel(ctx['planilha'])
+        df['data'] = pd.to_datetime(df['data'])
+    return medir
+
+
+def antigo_extrair_wikipedia(ctx):
+    return lambda: extrair_bs4_read_html(ctx['pagina'])
+
+
+def antigo_analise_times(ctx):
+    times = _times_brutos(ctx)
+    return lambda: [analisar_time(ctx['bruto'], time_) for time_ in times]
+
+
+def antigo_rodadas_completas(ctx):
+    return lambda: rodadas_completas(ctx['bruto'])
+
+
+def antigo_ultimos_proximos(ctx):
+    times = _times_brutos(ctx)
+
+    def medir():
+        df_jogos = ctx['bruto']
+        for time_ in times:
+            filtrar_jogos(df_jogos, time_, ultimos=True, n=5)
+            df_futuros = df_jogos[df_jogos['gols_mandante'].isna() | df_jogos['gols_visitante'].isna()]
+            filtrar_jogos(df_futuros, time_, ultimos=False, n=5)
+    return medir
+
+
+ETAPAS = {
+    "ler_planilha": etapa_ler_planilha,
+    "ler_parquet": etapa_ler_parquet,
+    "normalizar_jogos": etapa_normalizar_jogos,
+    "extrair_wikipedia": etapa_extrair_wikipedia,
+    "analise_times": etapa_analise_times,
+    "classificacao": etapa_classificacao,
+    "rodadas_completas": etapa_rodadas_completas,
+    "ultimos_proximos": etapa_ultimos_proximos,
+    "ratings": etapa_ratings,
+    "simulador": etapa_simulador,
+    "eliminacao": etapa_eliminacao,
+}
+
+# Etapa -> o caminho antigo equivalente (o app lia a planilha com openpyxl a cada carga,
+# fria ou não: ler_planilha é a primeira leitura com o Parquet, ler_parquet as seguintes)
+ANTIGOS = {
+    "ler_planilha": antigo_ler_planilha,
+    "ler_parquet": antigo_ler_planilha,
+    "extrair_wikipedia": antigo_extrair_wikipedia,
+    "analise_times": antigo_analise_times,
+    "rodadas_completas": antigo_rodadas_completas,
+    "ultimos_proximos": antigo_ultimos_proximos,
+}
+
+
+# As repetições são intercaladas (uma execução de cada função por rodada): uma fase
+# lenta da máquina pega uma amostra de cada etapa, não todas as amostras de uma só
+def medir_etapas(funcoes, repeticoes):
+    tempos = {nome: [] for nome in funcoes}
+    for _ in range(repeticoes):
+        for nome, funcao in funcoes.items():
+            inicio = time.perf_counter()
+            funcao()
+            tempos[nome].append(time.perf_counter() - inicio)
+    resultados = {}
+    for nome, funcao in funcoes.items():
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[nome] = {"melhor_ms": round(min(tempos[nome]) * 1000, 3),
+                            "mediana_ms": round(float(np.median(tempos[nome])) * 1000, 3),
+                            "pico_memoria_mb": round(pico / 2**20, 3)}
+    return resultados
+
+
+def rodar(n_times=20, temporadas=1, disputadas=19, semente=0, repeticoes=REPETICOES, simulacoes=10_000,
+          pagina=CAMINHO_PAGINA, etapas=None, antigos=True):
+    with open(pagina, encoding="utf-8") as f:
+        html = f.read()
+    bruto = historico_sintetico(temporadas, n_times, disputadas, semente)
+    jogos = normalizar_jogos(bruto)  # as etapas de análise usam o frame no esquema, como o app
+    frame = {"bruto_mb": round(bruto.memory_usage(deep=True).sum() / 2**20, 3),
+             "normalizado_mb": round(jogos.memory_usage(deep=True).sum() / 2**20, 3)}
+    print(f"{'frame de jogos':>18}: {frame['bruto_mb']:.2f} MiB bruto -> {frame['normalizado_mb']:.2f} MiB no esquema")
+    pasta = tempfile.mkdtemp(prefix="bench_evolution_")
+    try:
+        planilha = os.path.join(pasta, "jogos.xlsx")
+        bruto.to_excel(planilha, index=False)
+        ctx = {"jogos": jogos, "bruto": bruto, "pagina": html, "planilha": planilha, "pasta": pasta, "simulacoes": simulacoes}
+        funcoes = {}
+        for nome in etapas or ETAPAS:
+            funcoes[nome] = ETAPAS[nome](ctx)
+            if antigos and nome in ANTIGOS:
+                funcoes[("antigo", nome)] = ANTIGOS[nome](ctx)
+        medidas = medir_etapas(funcoes, repeticoes)
+        resultados = {}
+        for nome in etapas or ETAPAS:
+            resultados[nome] = medidas[nome]
+            linha = (f"{nome:>18}: melhor {resultados[nome]['melhor_ms']:10.1f} ms | mediana "
+                     f"{resultados[nome]['mediana_ms']:10.1f} ms | pico {resultados[nome]['pico_memoria_mb']:8.1f} MiB")
+            if ("antigo", nome) in medidas:
+                antigo = resultados[nome]["antigo"] = medidas[("antigo", nome)]
+                resultados[nome]["aceleracao"] = round(antigo["melhor_ms"] / max(resultados[nome]["melhor_ms"], 1e-9), 2)
+                linha += f" | antigo {antigo['melhor_ms']:10.1f} ms (x{resultados[nome]['aceleracao']:.1f})"
+            print(linha)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                     "maquina": platform.machine(), "cpus": os.cpu_count()},
+        "parametros": {"times": n_times, "temporadas": temporadas, "disputadas": disputadas, "semente": semente,
+                       "repeticoes": repeticoes, "simulacoes": simulacoes, "jogos": int(len(jogos)),
+                       "pagina": os.path.basename(pagina)},
+        "frame": frame,
+        "etapas": resultados,
+    }
+
+
+# Razão entre o melhor tempo atual e o da baseline (o melhor oscila menos que a
+# mediana); acima da tolerância, e com diferença maior que a folga, é regressão.
+# A folga de cada etapa é a maior entre folga_ms e a dispersão (mediana - melhor) da
+# própria etapa na baseline: etapas com disco, como ler_planilha, oscilam bem mais.
+# O número de repetições não muda o que é medido, então não entra na comparação
+def comparar(resultado, baseline, tolerancia=TOLERANCIA, folga_ms=FOLGA_MS):
+    def parametros(dados):
+        return {k: v for k, v in dados["parametros"].items() if k != "repeticoes"}
+
+    indicativa = parametros(baseline) != parametros(resultado)
+    if indicativa:
+        print("Aviso: parâmetros diferentes dos da baseline; a comparação é só indicativa.")
+    regressoes = []
+    for nome, atual in resultado["etapas"].items():
+        anterior = baseline["etapas"].get(nome)
+        if anterior is None:
+            print(f"{nome:>18}: sem baseline")
+            continue
+        razao = atual["melhor_ms"] / max(anterior["melhor_ms"], 1e-9)
+        folga = max(folga_ms, anterior["mediana_ms"] - anterior["melhor_ms"])
+        regrediu = razao > tolerancia and atual["melhor_ms"] - anterior["melhor_ms"] > folga
+        marca = "REGRESSÃO" if regrediu else ""
+        print(f"{nome:>18}: {anterior['melhor_ms']:10.1f} -> {atual['melhor_ms']:10.1f} ms (x{razao:.2f}) {marca}")
+        if regrediu and not indicativa:
+            regressoes.append(nome)
+    return regressoes
+
+
+def gravar_json(dados, caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede as etapas de dados e de análise sobre ligas sintéticas.")
+    parser.add_argument("--times", type=int, default=20)
+    parser.add_argument("--temporadas", type=int, default=1, help="temporadas no histórico (centenas para estresse)")
+    parser.add_argument("--disputadas", type=int, default=19, help="rodadas disputadas na última temporada")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--simulacoes", type=int, default=10_000)
+    parser.add_argument("--pagina", default=CAMINHO_PAGINA, help="página da Wikipedia salva")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), help="só estas etapas")
+    parser.add_argument("--sem-antigos", action="store_true", help="não mede os caminhos antigos")
+    parser.add_argument("--saida", help="JSON de resultado (padrão: resultados/<data-hora>.json)")
+    parser.add_argument("--baseline", nargs="?", const=CAMINHO_BASELINE, help="compara com esta baseline")
+    parser.add_argument("--salvar-baseline", nargs="?", const=CAMINHO_BASELINE, help="grava o resultado como baseline")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--folga-ms", type=float, default=FOLGA_MS, help="diferença mínima para contar regressão")
+    args = parser.parse_args()
+
+    resultado = rodar(args.times, args.temporadas, args.disputadas, args.semente, args.repeticoes,
+                      args.simulacoes, args.pagina, args.etapas, not args.sem_antigos)
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    gravar_json(resultado, saida)
+    print(f"Resultado gravado em {saida}")
+    if args.salvar_baseline:
+        gravar_json(resultado, args.salvar_baseline)
+        print(f"Baseline gravada em {args.salvar_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressoes = comparar(resultado, baseline, args.tolerancia, args.folga_ms)
+        if regressoes:
+            # uma fase lenta da máquina pega várias etapas de uma vez: só conta o que se repete
+            print(f"Medindo de novo: {', '.join(regressoes)}")
+            nova = rodar(args.times, args.temporadas, args.disputadas, args.semente, args.repeticoes,
+                         args.simulacoes, args.pagina, regressoes, False)
+            regressoes = [nome for nome in comparar(nova, baseline, args.tolerancia, args.folga_ms) if nome in regressoes]
+        if regressoes:
+            sys.exit(f"Regressões acima de x{args.tolerancia}: {', '.join(regressoes)}")
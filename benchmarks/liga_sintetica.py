@@ -0,0 +1,171 @@
+import argparse
+import html
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from classificacao import MotorClassificacao
+
+# ---------- Ligas sintéticas determinísticas para os benchmarks ----------
+# Mesmo formato do jogos_atualizados.xlsx (data, rodada, mandante, visitante,
+# gols_mandante, gols_visitante): turno e returno em rodízio, uma rodada por
+# semana e placares Poisson. A mesma semente gera sempre a mesma liga.
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CAMINHO_PAGINA = os.path.join(PASTA_FIXTURES, "wikipedia_campeonato.html")
+
+
+# Turno e returno com n_times e placares até a rodada "disputadas" (padrão: todas)
+def liga_sintetica(n_times=20, disputadas=None, semente=0, ano=2025):
+    rng = np.random.default_rng(semente)
+    times = [f"Time {i:02d}" for i in range(n_times)]
+    ordem = list(range(n_times))
+    jogos = []
+    for rodada in range(1, n_times):
+        for i in range(n_times // 2):
+            casa, fora = ordem[i], ordem[-1 - i]
+            jogos.append((rodada, times[casa], times[fora]) if rodada % 2 else (rodada, times[fora], times[casa]))
+        ordem = [ordem[0], ordem[-1]] + ordem[1:-1]
+    jogos += [(rodada + n_times - 1, fora, casa) for rodada, casa, fora in jogos]
+    df = pd.DataFrame(jogos, columns=['rodada', 'mandante', 'visitante'])
+    df['data'] = pd.Timestamp(f'{ano}-03-29') + pd.to_timedelta((df['rodada'] - 1) * 7, unit='D')
+    disputado = df['rodada'] <= (disputadas if disputadas is not None else df['rodada'].max())
+    df['gols_mandante'] = np.where(disputado, rng.poisson(1.4, len(df)), np.nan)
+    df['gols_visitante'] = np.where(disputado, rng.poisson(1.1, len(df)), np.nan)
+    return df[['data', 'rodada', 'mandante', 'visitante', 'gols_mandante', 'gols_visitante']]
+
+
+# Várias temporadas seguidas (coluna "temporada"); só a última pode estar em andamento
+def historico_sintetico(n_temporadas=1, n_times=20, disputadas=None, semente=0, ano_final=2025):
+    frames = []
+    for k in range(n_temporadas):
+        ano = ano_final - n_temporadas + 1 + k
+        ultima = k == n_temporadas - 1
+        df = liga_sintetica(n_times, disputadas if ultima else None, semente + k, ano)
+        frames.append(df.assign(temporada=ano))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------- Página da Wikipedia sintética ----------
+# Reproduz o que o extrator encontra na página real: seções com texto, notas
+# de rodapé e tabelas que não interessam; a Classificação com a zona em
+# células rowspan; os Confrontos com "—" na diagonal, "a" nos jogos por
+# disputar e placares com travessão.
+def _zonas(n_times):
+    if n_times < 8:
+        return {1: "Campeão", n_times: "Rebaixamento"}
+    zonas = {}
+    for pos in range(1, n_times + 1):
+        if pos <= 4:
+            zonas[pos] = "Fase de grupos da Copa Libertadores"
+        elif pos <= 6:
+            zonas[pos] = "Fase preliminar da Copa Libertadores"
+        elif pos <= 12:
+            zonas[pos] = "Copa Sul-Americana"
+        elif pos > n_times - 4:
+            zonas[pos] = "Rebaixamento"
+    return zonas
+
+
+def _secao_enchimento(k):
+    return "\n".join([
+        f'<div class="mw-heading mw-heading2"><h2 id="Secao_{k}">Seção {k}</h2></div>',
+        "<p>" + 'Texto corrido da página com <a href="/wiki/Ligacao">ligações</a> internas. ' * 40
+        + '<sup class="reference"><a href="#nota">[1]</a></sup></p>',
+        '<table class="wikitable"><tr><th>Estádio</th><th>Cidade</th></tr>'
+        + "".join(f'<tr><td><a href="#">Estádio {i}</a></td><td>Cidade {i}</td></tr>' for i in range(20))
+        + "</table>",
+    ])
+
+
+def _tabela_classificacao(df_jogos):
+    tabela = MotorClassificacao(df_jogos).tabela()
+    zonas = _zonas(len(tabela))
+    linhas = ['<table class="wikitable" style="text-align:center"><tbody><tr><th>Pos</th>'
+              '<th>Equipe<div class="navbar"><a>v</a><a>d</a><a>e</a></div></th>'
+              '<th>Pts</th><th>J</th><th>V</th><th>E</th><th>D</th><th>GP</th><th>GC</th><th>SG</th>'
+              '<th>Classificação ou descenso</th></tr>']
+    posicoes = tabela['Pos'].tolist()
+    for i, linha in enumerate(tabela.itertuples(index=False)):
+        celulas = (f"<th>{linha.Pos}</th><td style=\"text-align:left\"><span class=\"flagicon\"></span>"
+                   f"<a href=\"/wiki/Time\">{html.escape(linha.Equipe)}</a></td><td><b>{linha.Pts}</b></td>"
+                   + "".join(f"<td>{getattr(linha, m)}</td>" for m in ['J', 'V', 'E', 'D', 'GP', 'GC'])
+                   + f"<td>{linha.SG:+d}</td>")
+        zona = zonas.get(posicoes[i], "")
+        if i == 0 or zona != zonas.get(posicoes[i - 1], ""):
+            extensao = 1
+            while i + extensao < len(posicoes) and zonas.get(posicoes[i + extensao], "") == zona:
+                extensao += 1
+            celulas += f'<td rowspan="{extensao}">{html.escape(zona)}<sup class="reference"><a>[a]</a></sup></td>'
+        linhas.append(f"<tr>{celulas}</tr>")
+    linhas.append("</tbody></table>")
+    return "\n".join(linhas)
+
+
+def _tabela_confrontos(df_jogos):
+    times = sorted(pd.unique(df_jogos[['mandante', 'visitante']].values.ravel('K')))
+    placares = {}
+    for m, v, gm, gv in zip(df_jogos['mandante'], df_jogos['visitante'],
+                            df_jogos['gols_mandante'], df_jogos['gols_visitante']):
+        placares[m, v] = f"{int(gm)}–{int(gv)}" if pd.notna(gm) and pd.notna(gv) else None
+    linhas = ['<table class="wikitable" style="font-size:90%"><tbody><tr><th>Mandante \\ Visitante</th>'
+              + "".join(f'<th><a title="{html.escape(t)}">{html.escape(t.split()[-1][:3].upper())}</a></th>'
+                        for t in times) + "</tr>"]
+    for m in times:
+        celulas = f'<th style="text-align:left"><a>{html.escape(m)}</a></th>'
+        for v in times:
+            if m == v:
+                celulas += '<td style="background:#ccc">—</td>'
+            elif placares.get((m, v)):
+                celulas += f'<td style="background:#BBF3BB"><a href="#r">{placares[m, v]}</a></td>'
+            elif (m, v) in placares:
+                celulas += '<td><a href="#">a</a></td>'
+            else:
+                celulas += "<td></td>"
+        linhas.append(f"<tr>{celulas}</tr>")
+    linhas.append("</tbody></table>")
+    return "\n".join(linhas)
+
+
+def pagina_wikipedia(df_jogos, secoes=30):
+    partes = ['<!DOCTYPE html><html><head><title>Campeonato</title></head><body><div id="content">']
+    for k in range(secoes):
+        partes.append(_secao_enchimento(k))
+        if k == secoes // 3:
+            partes.append('<div class="mw-heading mw-heading2"><h2 id="Classificação">Classificação</h2>'
+                          '<span class="mw-editsection">[editar]</span></div>')
+            partes.append(_tabela_classificacao(df_jogos))
+        if k == secoes // 3 + 2:
+            partes.append('<div class="mw-heading mw-heading3"><h3 id="Confrontos">Confrontos</h3></div>')
+            partes.append(_tabela_confrontos(df_jogos))
+    partes.append("</div></body></html>")
+    return "\n".join(partes)
+
+
+if __name__ == "__main__":
+    # Regrava a página de fixture (ou salva uma liga sintética em planilha)
+    parser = argparse.ArgumentParser(description="Gera ligas sintéticas e a página da Wikipedia de fixture.")
+    parser.add_argument("--times", type=int, default=20)
+    parser.add_argument("--temporadas", type=int, default=1)
+    parser.add_argument("--disputadas", type=int, default=19, help="rodadas disputadas na última temporada")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--pagina", default=CAMINHO_PAGINA, help="onde gravar a página HTML")
+    parser.add_argument("--planilha", help="também grava os jogos em .xlsx/.csv")
+    args = parser.parse_args()
+
+    df_jogos = historico_sintetico(args.temporadas, args.times, args.disputadas, args.semente)
+    ultima = df_jogos[df_jogos['temporada'] == df_jogos['temporada'].max()].drop(columns='temporada')
+    os.makedirs(os.path.dirname(os.path.abspath(args.pagina)), exist_ok=True)
+    with open(args.pagina, "w", encoding="utf-8", newline="\n") as f:
+        f.write(pagina_wikipedia(ultima))
+    print(f"Página gravada em {args.pagina}")
+    if args.planilha:
+        if args.planilha.endswith(".csv"):
+            df_jogos.to_csv(args.planilha, index=False)
+        else:
+            df_jogos.to_excel(args.planilha, index=False)
+        print(f"{len(df_jogos)} jogos gravados em {args.planilha}")
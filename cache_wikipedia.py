@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+# ---------- Cache em disco da página da Wikipedia ----------
+# Guarda o HTML bruto junto com ETag/Last-Modified e a hora da última consulta.
+# Enquanto o TTL não vence, o HTML vem do disco; depois disso uma thread em
+# segundo plano faz um GET condicional (If-None-Match / If-Modified-Since) e
+# troca o arquivo. A execução do Streamlit nunca espera a rede: sem cópia em
+# disco, a primeira consulta também vai para a thread e obter() devolve
+# (None, None) até ela terminar. Depois de uma falha, novas tentativas só
+# saem após uma espera que dobra a cada falha seguida (até BACKOFF_MAXIMO),
+# para que uma Wikipedia fora do ar não seja consultada a cada execução.
+
+URL_WIKIPEDIA = "https://pt.wikipedia.org/wiki/Campeonato_Brasileiro_de_Futebol_de_2025_-_S%C3%A9rie_A"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+PASTA_CACHE = os.path.join(os.path.dirname(__file__), "cache_wikipedia")
+TTL_PADRAO = int(os.environ.get("EVOLUTION_WIKIPEDIA_TTL", 30 * 60))  # segundos
+BACKOFF_INICIAL = 30  # segundos de espera depois da primeira falha
+BACKOFF_MAXIMO = 30 * 60
+
+
+class CacheWikipedia:
+    def __init__(self, url=URL_WIKIPEDIA, pasta=PASTA_CACHE, ttl=TTL_PADRAO, timeout=10, sessao=None,
+                 backoff=BACKOFF_INICIAL, backoff_maximo=BACKOFF_MAXIMO):
+        self.url = url
+        self.pasta = pasta
+        self.ttl = ttl
+        self.timeout = timeout
+        self.sessao = sessao or requests.Session()
+        self.backoff = backoff
+        self.backoff_maximo = backoff_maximo
+        self.ultimo_erro = None
+        self.falhas = 0  # falhas seguidas
+        self.proxima_tentativa = 0.0  # time.time() a partir do qual a rede pode ser consultada de novo
+        self._trava = threading.Lock()
+        self._thread = None
+
+        nome = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        self.caminho_html = os.path.join(pasta, f"{nome}.html")
+        self.caminho_meta = os.path.join(pasta, f"{nome}.json")
+
+    # ---------- Leitura do disco ----------
+    def ler_meta(self):
+        try:
+            with open(self.caminho_meta, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def ler_html(self):
+        try:
+            with open(self.caminho_html, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def expirado(self, meta=None):
+        meta = meta if meta is not None else self.ler_meta()
+        return meta is None or time.time() - meta.get("consultado_em", 0) >= self.ttl
+
+    # ---------- Escrita atômica (arquivo temporário + os.replace) ----------
+    def _gravar(self, caminho, conteudo):
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+    def _gravar_meta(self, meta):
+        self._gravar(self.caminho_meta, json.dumps(meta, ensure_ascii=False))
+
+    # ---------- Consulta à rede ----------
+    # Cabeçalhos do GET condicional (só quando há cópia em disco para reaproveitar)
+    def cabecalhos(self, meta=None):
+        meta = meta if meta is not None else (self.ler_meta() or {})
+        headers = dict(HEADERS)
+        if meta.get("etag") and os.path.exists(self.caminho_html):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified") and os.path.exists(self.caminho_html):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    # Registra a resposta de um GET (feito aqui ou por outro cliente, como o ingestao.py).
+    # Retorna True se o conteúdo mudou, False se não mudou (ou se veio 304)
+    def registrar_resposta(self, status, html=None, etag=None, last_modified=None):
+        meta = self.ler_meta() or {}
+        if status == 304:
+            meta["consultado_em"] = time.time()
+            self._gravar_meta(meta)
+            return False
+        versao = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        mudou = versao != meta.get("versao")
+        if mudou:
+            self._gravar(self.caminho_html, html)
+        self._gravar_meta({
+            "url": self.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "versao": versao,
+            "consultado_em": time.time(),
+        })
+        return mudou
+
+    def atualizar(self):
+        with self._trava:
+            resposta = self.sessao.get(self.url, headers=self.cabecalhos(), timeout=self.timeout)
+            if resposta.status_code != 304:
+                resposta.raise_for_status()
+            return self.registrar_resposta(resposta.status_code, resposta.text,
+                                           resposta.headers.get("ETag"), resposta.headers.get("Last-Modified"))
+
+    def _atualizar_sem_excecao(self):
+        try:
+            self.atualizar()
+        except (requests.exceptions.RequestException, OSError) as e:  # rede ou disco (pasta do cache, disco cheio)
+            self.ultimo_erro = e
+            self.falhas += 1
+            espera = min(self.backoff * 2 ** (self.falhas - 1), self.backoff_maximo)
+            self.proxima_tentativa = time.time() + espera
+        else:
+            self.ultimo_erro, self.falhas, self.proxima_tentativa = None, 0, 0.0
+
+    def baixando(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # Dispara no máximo uma atualização em segundo plano por vez, e nenhuma durante a
+    # espera depois de uma falha (retorna None nesse caso)
+    def atualizar_em_segundo_plano(self):
+        if self.baixando():
+            return self._thread
+        if time.time() < self.proxima_tentativa:
+            return None
+        self._thread = threading.Thread(target=self._atualizar_sem_excecao, name="atualiza-wikipedia", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    # ---------- Ponto de entrada usado pelo app ----------
+    # Retorna (html, versao) sem esperar a rede: se o TTL venceu, devolve a cópia atual
+    # e agenda a atualização; sem cópia, agenda a primeira consulta e retorna (None, None)
+    def obter(self):
+        meta = self.ler_meta()
+        html = self.ler_html()
+        if html is None or meta is None:
+            self.atualizar_em_segundo_plano()
+            return None, None
+        if self.expirado(meta):
+            self.atualizar_em_segundo_plano()
+        return html, meta["versao"]
+
+
+# Uma instância por (url, pasta) no processo, compartilhada entre as sessões
+_caches = {}
+_trava_caches = threading.Lock()
+
+
+def obter_cache_wikipedia(url=URL_WIKIPEDIA, pasta=PASTA_CACHE, ttl=TTL_PADRAO):
+    with _trava_caches:
+        cache = _caches.get((url, pasta))
+        if cache is None:
+            cache = _caches[(url, pasta)] = CacheWikipedia(url, pasta, ttl=ttl)
+        return cache
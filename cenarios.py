@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# ---------- Modo cenário ("e se...?") ----------
+# Parte dos totais de cada time com os jogos já disputados (vindos do
+# MotorClassificacao) e aplica cada placar hipotético como um delta nas duas
+# colunas do mandante e do visitante: trocar um placar custa O(1), sem copiar
+# nem reprocessar o frame de jogos. A tabela do cenário é só a reordenação
+# desses 20 vetores. Os placares ficam num dict {chave do jogo: (gm, gv)},
+# fácil de guardar na sessão e de recarregar depois.
+
+
+def chave_jogo(rodada, mandante, visitante):
+    return f"{int(rodada)}|{mandante}|{visitante}"
+
+
+# Delta de um jogo nas métricas (na ordem de METRICAS) de quem fez gols_pro x gols_contra
+def _delta(gols_pro, gols_contra):
+    vitoria, empate, derrota = gols_pro > gols_contra, gols_pro == gols_contra, gols_pro < gols_contra
+    return np.array([3 * vitoria + empate, 1, vitoria, empate, derrota,
+                     gols_pro, gols_contra, gols_pro - gols_contra], dtype=np.int32)
+
+
+class Cenario:
+    def __init__(self, motor, df_jogos):
+        self.motor = motor
+        self.totais = motor.totais().copy()  # (métricas, times), só com os jogos disputados
+
+        gols_m = pd.to_numeric(df_jogos['gols_mandante'], errors='coerce')
+        gols_v = pd.to_numeric(df_jogos['gols_visitante'], errors='coerce')
+        pendentes = df_jogos.loc[gols_m.isna() | gols_v.isna(), ['data', 'rodada', 'mandante', 'visitante']]
+        self.pendentes = pendentes.sort_values(['rodada', 'data'], kind='stable').reset_index(drop=True)
+        self.pendentes.insert(0, 'chave', [chave_jogo(*linha) for linha in
+                                           self.pendentes[['rodada', 'mandante', 'visitante']].itertuples(index=False)])
+
+        # chave -> (índice do mandante, índice do visitante) em motor.times
+        casa = np.searchsorted(motor.times, self.pendentes['mandante'].to_numpy(dtype=object))
+        fora = np.searchsorted(motor.times, self.pendentes['visitante'].to_numpy(dtype=object))
+        self._times = dict(zip(self.pendentes['chave'], zip(casa.tolist(), fora.tolist())))
+        self.resultados = {}
+
+    def _somar(self, chave, gols_mandante, gols_visitante, sinal):
+        casa, fora = self._times[chave]
+        self.totais[:, casa] += sinal * _delta(gols_mandante, gols_visitante)
+        self.totais[:, fora] += sinal * _delta(gols_visitante, gols_mandante)
+
+    # Define (ou, com placar None, remove) o resultado hipotético de um jogo pendente
+    def aplicar(self, chave, gols_mandante=None, gols_visitante=None):
+        if chave not in self._times:
+            return False
+        anterior = self.resultados.pop(chave, None)
+        if anterior is not None:
+            self._somar(chave, *anterior, -1)
+        if gols_mandante is not None and gols_visitante is not None:
+            self.resultados[chave] = (int(gols_mandante), int(gols_visitante))
+            self._somar(chave, *self.resultados[chave], 1)
+        return self.resultados.get(chave) != anterior
+
+    # Leva o cenário para o conjunto de placares informado aplicando só o que mudou.
+    # Chaves que não são jogos pendentes (outro arquivo de jogos, por exemplo) são ignoradas
+    def sincronizar(self, resultados):
+        mudancas = 0
+        for chave in [c for c in self.resultados if c not in resultados]:
+            mudancas += self.aplicar(chave)
+        for chave, (gols_mandante, gols_visitante) in resultados.items():
+            if self.resultados.get(chave) != (gols_mandante, gols_visitante):
+                mudancas += self.aplicar(chave, gols_mandante, gols_visitante)
+        return mudancas
+
+    # Jogos pendentes com os placares do cenário (NA onde não há placar), pronto para editar
+    def grade(self, resultados=None):
+        resultados = self.resultados if resultados is None else resultados
+        placares = [resultados.get(chave, (None, None)) for chave in self.pendentes['chave']]
+        grade = self.pendentes.copy()
+        grade['gols_mandante'] = pd.array([p[0] for p in placares], dtype='Int64')
+        grade['gols_visitante'] = pd.array([p[1] for p in placares], dtype='Int64')
+        return grade[['chave', 'data', 'rodada', 'mandante', 'gols_mandante', 'gols_visitante', 'visitante']]
+
+    def tabela(self):
+        extras = np.array([(0, *self._times[chave], gm, gv) for chave, (gm, gv) in self.resultados.items()],
+                          dtype=np.int64).reshape(-1, 5)
+        return self.motor._montar_tabela(self.totais, np.arange(len(self.motor.rodadas)), extras)
+
+
+# Placares preenchidos numa grade editada (saída de Cenario.grade): {chave: (gm, gv)}
+def resultados_da_grade(grade):
+    preenchidos = grade[grade['gols_mandante'].notna() & grade['gols_visitante'].notna()]
+    return {chave: (int(gm), int(gv)) for chave, gm, gv in
+            preenchidos[['chave', 'gols_mandante', 'gols_visitante']].itertuples(index=False)}
+
+
+# Diferença entre duas tabelas (ex.: real x cenário) por equipe; só times que mudaram
+def comparar_tabelas(tabela_base, tabela_cenario, sufixos=(" real", " cenário")):
+    colunas = ['Equipe', 'Pos', 'Pts', 'V', 'SG']
+    comparacao = tabela_base[colunas].merge(tabela_cenario[colunas], on='Equipe', suffixes=sufixos)
+    comparacao['Δ Pos'] = comparacao[f'Pos{sufixos[0]}'] - comparacao[f'Pos{sufixos[1]}']  # positivo = subiu
+    comparacao['Δ Pts'] = comparacao[f'Pts{sufixos[1]}'] - comparacao[f'Pts{sufixos[0]}']
+    mudou = (comparacao['Δ Pos'] != 0) | (comparacao['Δ Pts'] != 0)
+    return comparacao[mudou].sort_values(f'Pos{sufixos[1]}').reset_index(drop=True)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from estatisticas import montar_partidas_por_time
+
+# ---------- Motor de classificação por somas prefixadas ----------
+# Guarda, para cada time, os totais acumulados rodada a rodada. A tabela de
+# qualquer intervalo de rodadas (ex.: 5 a 12) é a diferença entre duas colunas
+# do acumulado seguida da ordenação pelos critérios de desempate da Série A:
+# pontos, vitórias, saldo de gols, gols pró e confronto direto (entre dois
+# times). Cartões e sorteio não estão nos dados; o último critério é o nome.
+
+METRICAS = ['Pts', 'J', 'V', 'E', 'D', 'GP', 'GC', 'SG']
+
+
+class MotorClassificacao:
+    def __init__(self, df_jogos):
+        partidas = montar_partidas_por_time(df_jogos)
+        self.times = np.array(sorted(partidas['time'].unique()), dtype=object)
+        self.rodadas = np.array(sorted(pd.unique(df_jogos['rodada'].dropna())))
+
+        jogadas = partidas[partidas['jogado']]
+        i_time = np.searchsorted(self.times, jogadas['time'].to_numpy(dtype=object))
+        i_rodada = np.searchsorted(self.rodadas, jogadas['rodada'].to_numpy())
+        resultado = jogadas['resultado'].to_numpy()
+        gols_pro = jogadas['gols_pro'].to_numpy(dtype=np.int64)
+        gols_contra = jogadas['gols_contra'].to_numpy(dtype=np.int64)
+
+        valores = np.stack([
+            np.where(resultado == 'V', 3, 0) + (resultado == 'E'),
+            np.ones(len(jogadas), dtype=np.int64),
+            resultado == 'V',
+            resultado == 'E',
+            resultado == 'D',
+            gols_pro,
+            gols_contra,
+            gols_pro - gols_contra,
+        ]).astype(np.int32)
+
+        # acumulado[m, t, r + 1] = total da métrica m do time t até a rodada r
+        por_rodada = np.zeros((len(METRICAS), len(self.times), len(self.rodadas) + 1), dtype=np.int32)
+        for m in range(len(METRICAS)):
+            np.add.at(por_rodada[m], (i_time, i_rodada + 1), valores[m])
+        self.acumulado = np.cumsum(por_rodada, axis=2, dtype=np.int32)
+
+        # Jogos disputados (só do ponto de vista do mandante) para o confronto direto
+        mandantes = jogadas[jogadas['mandante']]
+        self._jogos = np.stack([
+            np.searchsorted(self.rodadas, mandantes['rodada'].to_numpy()),
+            np.searchsorted(self.times, mandantes['time'].to_numpy(dtype=object)),
+            np.searchsorted(self.times, mandantes['adversario'].to_numpy(dtype=object)),
+            mandantes['gols_pro'].to_numpy(dtype=np.int64),
+            mandantes['gols_contra'].to_numpy(dtype=np.int64),
+        ], axis=1) if len(mandantes) else np.zeros((0, 5), dtype=np.int64)
+
+    # Posições [inicio, fim) no eixo de rodadas correspondentes a rodada_inicial..rodada_final
+    def _intervalo(self, rodada_inicial, rodada_final):
+        inicio = 0 if rodada_inicial is None else np.searchsorted(self.rodadas, rodada_inicial, side='left')
+        fim = len(self.rodadas) if rodada_final is None else np.searchsorted(self.rodadas, rodada_final, side='right')
+        return inicio, max(inicio, fim)
+
+    def totais(self, rodada_inicial=None, rodada_final=None):
+        inicio, fim = self._intervalo(rodada_inicial, rodada_final)
+        return self.acumulado[:, :, fim] - self.acumulado[:, :, inicio]
+
+    # Conjunto arbitrário de rodadas: soma dos trechos contíguos
+    def totais_rodadas(self, rodadas):
+        existentes = set(self.rodadas.tolist())
+        posicoes = np.unique(np.searchsorted(self.rodadas, [r for r in rodadas if r in existentes]))
+        totais = np.zeros(self.acumulado.shape[:2], dtype=np.int32)
+        if len(posicoes) == 0:
+            return totais, posicoes
+        quebras = np.flatnonzero(np.diff(posicoes) != 1) + 1
+        for trecho in np.split(posicoes, quebras):
+            totais += self.acumulado[:, :, trecho[-1] + 1] - self.acumulado[:, :, trecho[0]]
+        return totais, posicoes
+
+    # extras: jogos (no mesmo formato de _jogos) que não estão nos dados, como os placares de um cenário
+    def _pontos_confronto(self, a, b, posicoes, extras=None):
+        jogos = self._jogos[np.isin(self._jogos[:, 0], posicoes)]
+        if extras is not None and len(extras):
+            jogos = np.concatenate([jogos, extras])
+        pontos = {a: 0, b: 0}
+        for mandante, visitante in ((a, b), (b, a)):
+            for gm, gv in jogos[(jogos[:, 1] == mandante) & (jogos[:, 2] == visitante)][:, 3:5]:
+                if gm > gv:
+                    pontos[mandante] += 3
+                elif gm < gv:
+                    pontos[visitante] += 3
+                else:
+                    pontos[mandante] += 1
+                    pontos[visitante] += 1
+        return pontos[a], pontos[b]
+
+    def _ordenar(self, totais, posicoes, extras=None):
+        pts, _, v, _, _, gp, _, sg = totais
+        ordem = np.lexsort((self.times, -gp, -sg, -v, -pts))
+
+        # Confronto direto só se aplica a empates entre exatamente dois times
+        chave = np.stack([pts, v, sg, gp], axis=1)[ordem]
+        iguais = np.all(chave[1:] == chave[:-1], axis=1)
+        for i in np.flatnonzero(iguais):
+            sozinhos = (i == 0 or not iguais[i - 1]) and (i + 1 >= len(iguais) or not iguais[i + 1])
+            if sozinhos:
+                a, b = ordem[i], ordem[i + 1]
+                pontos_a, pontos_b = self._pontos_confronto(a, b, posicoes, extras)
+                if pontos_b > pontos_a:
+                    ordem[i], ordem[i + 1] = b, a
+        return ordem
+
+    def _montar_tabela(self, totais, posicoes, extras=None):
+        ordem = self._ordenar(totais, posicoes, extras)
+        tabela = pd.DataFrame(totais[:, ordem].T, columns=METRICAS)
+        tabela.insert(0, 'Equipe', self.times[ordem])
+        tabela.insert(0, 'Pos', np.arange(1, len(ordem) + 1))
+        return tabela
+
+    def tabela(self, rodada_inicial=None, rodada_final=None):
+        inicio, fim = self._intervalo(rodada_inicial, rodada_final)
+        return self._montar_tabela(self.totais(rodada_inicial, rodada_final), np.arange(inicio, fim))
+
+    def tabela_rodadas(self, rodadas):
+        totais, posicoes = self.totais_rodadas(rodadas)
+        return self._montar_tabela(totais, posicoes)
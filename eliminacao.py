@@ -0,0 +1,313 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from classificacao import MotorClassificacao
+from indices import mascara_disputados
+
+# ---------- Garantidos e eliminados (matemática das zonas) ----------
+# Para cada time calcula a melhor e a pior posição ainda possíveis olhando só
+# para os pontos; uma zona (título, Libertadores, rebaixamento...) está
+# garantida se o intervalo [melhor, pior] cabe nela e é impossível se não
+# encontra nenhuma posição dela. Empates em pontos contam a favor do time na
+# melhor posição e contra ele na pior (os desempates dependem de placares
+# ainda desconhecidos), então "garantida" e "impossível" nunca são afirmadas
+# sem certeza.
+#
+# "Pode terminar até a posição k?": o time vence tudo que falta; quem já está
+# acima continua acima e, dos que ainda podem passar, no máximo os que sobram
+# das k - 1 vagas são liberados. Os demais precisam ficar com no máximo os
+# pontos do time. Só os jogos entre esses candidatos importam, e o fluxo
+# máximo (jogos -> times) resolve a maioria dos casos sem busca: se dá para
+# segurar todos com vitórias (3 pontos) respeitando os limites, é possível.
+# O resto vai para um programa inteiro (scipy.optimize.milp, HiGHS: branch
+# and bound com poda pela relaxação linear), que também escolhe quem fica
+# livre em vez de enumerar as combinações.
+# "Pode terminar na posição k ou abaixo?" é o espelho: o time perde tudo e
+# k - 1 adversários precisam alcançar os pontos dele (nem com 3 pontos por
+# jogo divididos à vontade = impossível; vitórias suficientes = possível).
+# Se o programa inteiro passa de TEMPO_LIMITE, a resposta fica em aberto
+# (nunca vira certeza). Com o campeonato encerrado vale a tabela final, já
+# com os critérios de desempate.
+#
+# O SolverZonas guarda os limites da última execução: com mais jogos
+# disputados a melhor posição só pode piorar e a pior só pode melhorar, então
+# cada atualização começa dos limites anteriores e times já definidos não são
+# recalculados. Isso só vale se os jogos novos saíram dos pendentes de antes;
+# placar corrigido, jogo pendente incluído/removido ou time novo recomeça do zero.
+
+TEMPO_LIMITE = 2.0  # segundos por programa inteiro; estourou, a resposta fica em aberto
+GARANTIDA, IMPOSSIVEL, EM_ABERTO = "garantida", "impossível", "em aberto"
+
+
+# Fluxo máximo (Dinic) na rede fonte -> jogo -> times do jogo -> sorvedouro
+def _max_fluxo(jogos, oferta, capacidade):
+    times = sorted({t for jogo in jogos for t in jogo})
+    no_time = {t: 2 + len(jogos) + i for i, t in enumerate(times)}
+    n = 2 + len(jogos) + len(times)
+    destino, cap, adj = [], [], [[] for _ in range(n)]
+
+    def aresta(u, v, c):  # aresta e = ida, e ^ 1 = volta
+        for origem, fim, capacidade_aresta in ((u, v, c), (v, u, 0)):
+            adj[origem].append(len(destino))
+            destino.append(fim)
+            cap.append(capacidade_aresta)
+
+    for g, (a, b) in enumerate(jogos):
+        aresta(0, 2 + g, oferta)
+        aresta(2 + g, no_time[a], oferta)
+        aresta(2 + g, no_time[b], oferta)
+    for t in times:
+        aresta(no_time[t], 1, max(capacidade[t], 0))
+
+    fluxo = 0
+    while True:
+        nivel = [-1] * n
+        nivel[0] = 0
+        fila = deque([0])
+        while fila:
+            u = fila.popleft()
+            for e in adj[u]:
+                if cap[e] > 0 and nivel[destino[e]] < 0:
+                    nivel[destino[e]] = nivel[u] + 1
+                    fila.append(destino[e])
+        if nivel[1] < 0:
+            return fluxo
+        proxima = [0] * n
+
+        def empurrar(u, limite):
+            if u == 1:
+                return limite
+            while proxima[u] < len(adj[u]):
+                e = adj[u][proxima[u]]
+                v = destino[e]
+                if cap[e] > 0 and nivel[v] == nivel[u] + 1:
+                    enviado = empurrar(v, min(limite, cap[e]))
+                    if enviado:
+                        cap[e] -= enviado
+                        cap[e ^ 1] += enviado
+                        return enviado
+                proxima[u] += 1
+            return 0
+
+        while True:
+            enviado = empurrar(0, float("inf"))
+            if not enviado:
+                break
+            fluxo += enviado
+
+
+# Existe resultado dos jogos (entre os candidatos) em que, liberando no máximo
+# "livres" times, todos os outros ficam com no máximo "limite" pontos?
+# (ou, com minimo=True, pelo menos "quantos" deles chegam a "limite" pontos)
+# Programa inteiro: por jogo, binárias vitória do mandante / do visitante
+# (nenhuma = empate); por time, uma binária "liberado" / "escolhido".
+def _programa_inteiro(pontos, jogos, candidatos, limite, quantos, minimo):
+    posicao = {t: i for i, t in enumerate(candidatos)}
+    n_jogos, n_times = len(jogos), len(candidatos)
+    n_vars = 2 * n_jogos + n_times
+    # pontos_j = pontos[j] + soma sobre os jogos de j de (3 * vitória + empate) = pontos[j] + jogos_j + 2 * v_j - derrotas_j
+    coeficientes = np.zeros((n_times, n_vars))
+    constantes = np.array([pontos[t] for t in candidatos], dtype=float)
+    for g, (a, b) in enumerate(jogos):
+        ia, ib = posicao[a], posicao[b]
+        constantes[ia] += 1
+        constantes[ib] += 1
+        coeficientes[ia, 2 * g] += 2
+        coeficientes[ia, 2 * g + 1] -= 1
+        coeficientes[ib, 2 * g + 1] += 2
+        coeficientes[ib, 2 * g] -= 1
+    grande = 3 * n_jogos + limite + 1
+    restricoes = []
+    if n_jogos:
+        um_resultado = np.zeros((n_jogos, n_vars))
+        um_resultado[np.arange(n_jogos), 2 * np.arange(n_jogos)] = 1
+        um_resultado[np.arange(n_jogos), 2 * np.arange(n_jogos) + 1] = 1
+        restricoes.append(LinearConstraint(um_resultado, 0, 1))
+    chave = np.zeros((n_times, n_vars))
+    chave[np.arange(n_times), 2 * n_jogos + np.arange(n_times)] = grande
+    selecao = np.zeros((1, n_vars))
+    selecao[0, 2 * n_jogos:] = 1
+    if minimo:
+        # escolhido => pontos >= limite; pelo menos "quantos" escolhidos
+        restricoes.append(LinearConstraint(coeficientes - chave, limite - constantes - grande, np.inf))
+        restricoes.append(LinearConstraint(selecao, quantos, np.inf))
+    else:
+        # não liberado => pontos <= limite; no máximo "quantos" liberados
+        restricoes.append(LinearConstraint(coeficientes - chave, -np.inf, limite - constantes))
+        restricoes.append(LinearConstraint(selecao, 0, quantos))
+    resultado = milp(np.zeros(n_vars), constraints=restricoes, integrality=np.ones(n_vars),
+                     bounds=Bounds(0, 1), options={"time_limit": TEMPO_LIMITE})
+    if resultado.status == 0:
+        return True
+    if resultado.status == 2:  # inviável
+        return False
+    return None  # tempo esgotado: fica em aberto
+
+
+# Pontos atuais e jogos restantes (em índices de times) de um conjunto de jogos
+class EstadoCampeonato:
+    def __init__(self, df_jogos):
+        motor = MotorClassificacao(df_jogos)
+        self.times = motor.times
+        self.pontos = motor.totais()[0].astype(int).tolist()
+        pendentes = df_jogos[~mascara_disputados(df_jogos)]
+        casa = np.searchsorted(self.times, pendentes['mandante'].to_numpy(dtype=object))
+        fora = np.searchsorted(self.times, pendentes['visitante'].to_numpy(dtype=object))
+        self.jogos = list(zip(casa.tolist(), fora.tolist()))
+        self.restantes = np.bincount(casa, minlength=len(self.times)) + np.bincount(fora, minlength=len(self.times))
+        # campeonato encerrado: vale a tabela com todos os critérios de desempate
+        self.final = None
+        if not self.jogos:
+            tabela = motor.tabela()
+            self.final = dict(zip(np.searchsorted(self.times, tabela['Equipe'].to_numpy(dtype=object)), tabela['Pos']))
+
+    # True/False; None quando o programa inteiro não terminou no tempo limite
+    def pode_terminar_ate(self, t, k):
+        maximo_t = self.pontos[t] + 3 * int(self.restantes[t])  # vence tudo
+        jogos = [j for j in self.jogos if t not in j]
+        maximo = list(self.pontos)
+        for a, b in jogos:
+            maximo[a] += 3
+            maximo[b] += 3
+        outros = [j for j in range(len(self.times)) if j != t]
+        livres = k - 1 - sum(self.pontos[j] > maximo_t for j in outros)
+        candidatos = [j for j in outros if self.pontos[j] <= maximo_t < maximo[j]]
+        if livres < 0:
+            return False
+        if len(candidatos) <= livres:
+            return True
+
+        # só os jogos entre candidatos importam (contra os demais, o candidato perde)
+        conjunto = set(candidatos)
+        internos = [(a, b) for a, b in jogos if a in conjunto and b in conjunto]
+        # atalho: libera os mais fortes e tenta segurar os outros só com vitórias (fluxo máximo)
+        candidatos.sort(key=lambda j: (-self.pontos[j], -maximo[j]))
+        presos = set(candidatos[livres:])
+        jogos_presos = [(a, b) for a, b in internos if a in presos and b in presos]
+        vitorias = {j: (maximo_t - self.pontos[j]) // 3 for j in presos}
+        if _max_fluxo(jogos_presos, 1, vitorias) == len(jogos_presos):
+            return True
+        return _programa_inteiro(self.pontos, internos, candidatos, maximo_t, livres, minimo=False)
+
+    def pode_terminar_abaixo(self, t, k):
+        pontos_t = self.pontos[t]  # perde tudo
+        base = list(self.pontos)
+        jogos = []
+        for a, b in self.jogos:
+            if t in (a, b):
+                base[b if a == t else a] += 3
+            else:
+                jogos.append((a, b))
+        maximo = list(base)
+        for a, b in jogos:
+            maximo[a] += 3
+            maximo[b] += 3
+        outros = [j for j in range(len(self.times)) if j != t]
+        faltam_times = k - 1 - sum(base[j] >= pontos_t for j in outros)
+        candidatos = [j for j in outros if base[j] < pontos_t <= maximo[j]]
+        if faltam_times <= 0:
+            return True
+        if len(candidatos) < faltam_times:
+            return False
+
+        # contra quem não é candidato, o candidato vence
+        conjunto = set(candidatos)
+        internos = []
+        for a, b in jogos:
+            if a in conjunto and b in conjunto:
+                internos.append((a, b))
+            elif a in conjunto or b in conjunto:
+                base[a if a in conjunto else b] += 3
+        # necessário: nem com 3 pontos por jogo (divididos à vontade) os mais próximos chegam
+        faltam = {j: max(pontos_t - base[j], 0) for j in candidatos}
+        if _max_fluxo(internos, 3, faltam) < sum(sorted(faltam.values())[:faltam_times]):
+            return False
+        # atalho: os mais próximos chegam só com vitórias (fluxo máximo)
+        candidatos.sort(key=lambda j: faltam[j])
+        escolhidos = set(candidatos[:faltam_times])
+        vitorias = {j: -(-faltam[j] // 3) for j in escolhidos}
+        if _max_fluxo([(a, b) for a, b in internos if a in escolhidos or b in escolhidos], 1,
+                      {j: vitorias.get(j, 0) for j in candidatos}) == sum(vitorias.values()):
+            return True
+        return _programa_inteiro(base, internos, candidatos, pontos_t, faltam_times, minimo=True)
+
+    def melhor_posicao(self, t, inicio=1):
+        if self.final is not None:
+            return self.final[t]
+        maximo_t = self.pontos[t] + 3 * int(self.restantes[t])
+        k = max(inicio, 1 + sum(p > maximo_t for p in self.pontos))
+        while k < len(self.times) and self.pode_terminar_ate(t, k) is False:
+            k += 1
+        return k
+
+    def pior_posicao(self, t, fim=None):
+        if self.final is not None:
+            return self.final[t]
+        k = min(fim or len(self.times), len(self.times))
+        while k > 1 and self.pode_terminar_abaixo(t, k) is False:
+            k -= 1
+        return k
+
+
+def situacao_zona(melhor, pior, posicoes):
+    alcancaveis = set(range(melhor, pior + 1))
+    if alcancaveis <= set(posicoes):
+        return GARANTIDA
+    if not alcancaveis & set(posicoes):
+        return IMPOSSIVEL
+    return EM_ABERTO
+
+
+class SolverZonas:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._disputados = {}  # (rodada, mandante, visitante) -> placar, da última execução
+        self._pendentes = set()  # (rodada, mandante, visitante) sem placar, da última execução
+        self._limites = {}  # time -> (melhor, pior)
+
+    @staticmethod
+    def _placares(df_jogos):
+        disputados = df_jogos[mascara_disputados(df_jogos)]
+        return {(int(r), m, v): (int(gm), int(gv)) for r, m, v, gm, gv in
+                disputados[['rodada', 'mandante', 'visitante', 'gols_mandante', 'gols_visitante']].itertuples(index=False)}
+
+    @staticmethod
+    def _pendentes_de(df_jogos):
+        pendentes = df_jogos[~mascara_disputados(df_jogos)]
+        return {(int(r), m, v) for r, m, v in pendentes[['rodada', 'mandante', 'visitante']].itertuples(index=False)}
+
+    # Os limites anteriores só valem se o campeonato novo é o anterior com alguns
+    # pendentes decididos: mesmos times, nenhum placar mudou ou sumiu, nenhum jogo
+    # pendente entrou e todo jogo disputado novo estava pendente antes
+    def _continua(self, times, placares, pendentes):
+        return (set(self._limites) == set(times)
+                and pendentes <= self._pendentes
+                and all(placares.get(chave) == placar for chave, placar in self._disputados.items())
+                and all(chave in self._pendentes for chave in placares.keys() - self._disputados.keys()))
+
+    # zonas: {zona: [posições]} (simulador.zonas_por_posicao). Uma linha por time, na ordem da tabela
+    def atualizar(self, df_jogos, zonas):
+        with self._trava:
+            estado = EstadoCampeonato(df_jogos)
+            placares, pendentes = self._placares(df_jogos), self._pendentes_de(df_jogos)
+            limites = self._limites if self._continua(estado.times, placares, pendentes) else {}
+
+            linhas = []
+            for t, nome in enumerate(estado.times):
+                melhor_anterior, pior_anterior = limites.get(nome, (1, len(estado.times)))
+                if melhor_anterior == pior_anterior:
+                    melhor, pior = melhor_anterior, pior_anterior  # posição já definida
+                else:
+                    melhor = estado.melhor_posicao(t, melhor_anterior)
+                    pior = estado.pior_posicao(t, pior_anterior)
+                linhas.append({'Equipe': nome, 'Pts': estado.pontos[t], 'Jogos restantes': int(estado.restantes[t]),
+                               'Melhor posição': melhor, 'Pior posição': pior,
+                               **{zona: situacao_zona(melhor, pior, posicoes) for zona, posicoes in zonas.items()}})
+            self._limites = {linha['Equipe']: (linha['Melhor posição'], linha['Pior posição']) for linha in linhas}
+            self._disputados, self._pendentes = placares, pendentes
+            return pd.DataFrame(linhas).sort_values(['Pts', 'Melhor posição'], ascending=[False, True],
+                                                    kind='stable').reset_index(drop=True)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from armazenamento import ler_tabela
+
+# ---------- Esquema do frame de jogos ----------
+# Normaliza df_jogos uma vez na carga, em vez de cada módulo tratar strings
+# vazias, floats e NaN por conta própria:
+#   data           -> datetime64
+#   rodada         -> int16 (obrigatória)
+#   mandante/visitante -> um único categorical para as duas colunas (os
+#                     filtros por time viram comparações de códigos inteiros)
+#   gols_*         -> Int8 anulável (NA = jogo sem placar; texto como
+#                     "adiado" também vira NA)
+#   temporada      -> int16; competicao -> categorical (quando existirem)
+# Valores que não cabem no esquema (rodada ou time vazio, placar negativo ou
+# fracionário, data ou temporada inválida) levantam ErroEsquema com as linhas
+# afetadas, já numeradas como na planilha.
+
+COLUNAS_JOGOS = ['data', 'rodada', 'mandante', 'visitante', 'gols_mandante', 'gols_visitante']
+COLUNAS_TIMES = ['mandante', 'visitante']
+COLUNAS_GOLS = ['gols_mandante', 'gols_visitante']
+# Da classificação oficial as telas só usam a zona de cada posição (a tabela vem dos jogos)
+COLUNAS_CLASSIFICACAO = ['Pos', 'Classificação ou descenso']
+MAX_GOLS = np.iinfo(np.int8).max
+MAX_LINHAS_ERRO = 5  # quantas linhas problemáticas citar na mensagem
+
+
+class ErroEsquema(ValueError):
+    pass
+
+
+def validar_colunas(df):
+    faltando = set(COLUNAS_JOGOS) - set(df.columns)
+    if faltando:
+        raise ErroEsquema(f"Colunas ausentes no arquivo de jogos: {sorted(faltando)}")
+
+
+# Índice inteiro = posição na leitura: vira o número da linha na planilha (cabeçalho na linha 1)
+def _erro(coluna, mascara, df, motivo):
+    linhas = df.index[np.asarray(mascara)]
+    if len(linhas):
+        if pd.api.types.is_integer_dtype(linhas):
+            onde, linhas = "linha(s) da planilha", (linhas + 2).tolist()
+        else:
+            onde, linhas = "linha(s) do frame", linhas.tolist()
+        exemplos = ", ".join(str(i) for i in linhas[:MAX_LINHAS_ERRO])
+        raise ErroEsquema(f"{coluna}: {motivo} em {len(linhas)} {onde} (ex.: {exemplos})")
+
+
+# Já está no esquema? (ex.: frame lido de uma cópia Parquet gravada já normalizada)
+def normalizado(df):
+    tipos = df.dtypes
+    return (set(COLUNAS_JOGOS) <= set(df.columns)
+            and pd.api.types.is_datetime64_dtype(tipos['data'])
+            and tipos['rodada'] == np.int16
+            and all(tipos[c] == 'Int8' for c in COLUNAS_GOLS)
+            and all(isinstance(tipos[c], pd.CategoricalDtype) for c in COLUNAS_TIMES)
+            and tipos['mandante'] == tipos['visitante'])
+
+
+# Strings sem espaços nas pontas e "" como ausente (colunas numéricas/datas passam direto)
+def _texto(serie):
+    if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+            or isinstance(serie.dtype, pd.CategoricalDtype)):
+        return serie
+    texto = serie.astype(object).where(serie.notna(), None)
+    texto = texto.map(lambda v: v.strip() if isinstance(v, str) else v)
+    return texto.where(texto != "", None)
+
+
+def _gols(df, coluna):
+    texto = _texto(df[coluna])
+    gols = pd.to_numeric(texto, errors='coerce')  # texto não numérico = jogo sem placar
+    _erro(coluna, gols.notna() & ((gols < 0) | (gols > MAX_GOLS) | (gols % 1 != 0)), df, "placar inválido")
+    return gols.astype('Int8')
+
+
+# categorias: times já conhecidos (para vários frames compartilharem os mesmos códigos)
+def normalizar_jogos(df, categorias=None):
+    validar_colunas(df)
+    if categorias is None and normalizado(df):
+        return df
+
+    # linhas totalmente vazias (fim de planilha) saem antes da validação
+    df = df[df[COLUNAS_JOGOS].notna().any(axis=1)].copy()
+
+    data = pd.to_datetime(df['data'], errors='coerce')
+    _erro('data', data.isna() & _texto(df['data']).notna(), df, "data inválida")
+    df['data'] = data
+
+    rodada = pd.to_numeric(_texto(df['rodada']), errors='coerce')
+    _erro('rodada', rodada.isna() | (rodada % 1 != 0) | (rodada < 0), df, "rodada ausente ou inválida")
+    df['rodada'] = rodada.astype(np.int16)
+
+    for coluna in COLUNAS_GOLS:
+        df[coluna] = _gols(df, coluna)
+
+    times = {coluna: _texto(df[coluna]) for coluna in COLUNAS_TIMES}
+    for coluna, valores in times.items():
+        _erro(coluna, valores.isna(), df, "time ausente")
+    encontrados = pd.unique(pd.concat(times.values()).dropna())
+    tipo = pd.CategoricalDtype(sorted(set(categorias or []) | set(encontrados)))
+    for coluna, valores in times.items():
+        df[coluna] = valores.astype(tipo)
+
+    if 'temporada' in df.columns:
+        temporada = pd.to_numeric(_texto(df['temporada']), errors='coerce')
+        _erro('temporada', temporada.isna() | (temporada % 1 != 0), df, "temporada ausente ou inválida")
+        df['temporada'] = temporada.astype(np.int16)
+    if 'competicao' in df.columns:
+        df['competicao'] = df['competicao'].astype('category')
+    return df.reset_index(drop=True)
+
+
+# Leitura da planilha de jogos já no esquema; a cópia Parquet (armazenamento.py)
+# guarda o frame normalizado, então as leituras seguintes só conferem os tipos
+def ler_jogos(caminho):
+    return normalizar_jogos(ler_tabela(caminho, preparar=normalizar_jogos))
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# ---------- Tabela longa "time x partida" ----------
+# Cada jogo de df_jogos vira duas linhas: uma do ponto de vista do mandante e
+# outra do visitante. Assim todas as métricas de todos os times saem de um
+# único groupby, sem apply linha a linha nem máscaras repetidas por time.
+
+TENDENCIA_RESULTADO = {'V': 1, 'E': 0, 'D': -1}
+
+
+# mandante + visitante empilhados (e o inverso, para o adversário). Com o frame
+# no esquema (esquema.py) os dois lados compartilham o categorical e só os
+# códigos inteiros são concatenados
+def _times_empilhados(df_jogos):
+    mandante, visitante = df_jogos['mandante'], df_jogos['visitante']
+    if isinstance(mandante.dtype, pd.CategoricalDtype) and mandante.dtype == visitante.dtype:
+        cod_m, cod_v = mandante.cat.codes.to_numpy(), visitante.cat.codes.to_numpy()
+        categorias = mandante.dtype
+        return (pd.Categorical.from_codes(np.concatenate([cod_m, cod_v]), dtype=categorias),
+                pd.Categorical.from_codes(np.concatenate([cod_v, cod_m]), dtype=categorias))
+    mandante, visitante = mandante.to_numpy(dtype=object), visitante.to_numpy(dtype=object)
+    return np.concatenate([mandante, visitante]), np.concatenate([visitante, mandante])
+
+
+def montar_partidas_por_time(df_jogos):
+    gols_mandante = pd.to_numeric(df_jogos['gols_mandante'], errors='coerce').to_numpy(dtype=float)
+    gols_visitante = pd.to_numeric(df_jogos['gols_visitante'], errors='coerce').to_numpy(dtype=float)
+    n = len(df_jogos)
+    times, adversarios = _times_empilhados(df_jogos)
+
+    partidas = pd.DataFrame({
+        'jogo': np.tile(np.arange(n), 2),
+        'data': np.tile(df_jogos['data'].to_numpy(), 2),
+        'rodada': np.tile(df_jogos['rodada'].to_numpy(), 2),
+        'time': times,
+        'adversario': adversarios,
+        'mandante': np.repeat([True, False], n),
+        'gols_pro': np.concatenate([gols_mandante, gols_visitante]),
+        'gols_contra': np.concatenate([gols_visitante, gols_mandante]),
+    })
+    if 'temporada' in df_jogos.columns:
+        partidas.insert(0, 'temporada', np.tile(df_jogos['temporada'].to_numpy(), 2))
+    partidas = partidas[partidas['time'].notna()]
+
+    # Jogos sem placar (NaN) ficam com resultado vazio e não contam como jogados
+    jogado = partidas['gols_pro'].notna() & partidas['gols_contra'].notna()
+    partidas['resultado'] = np.select(
+        [partidas['gols_pro'] > partidas['gols_contra'], partidas['gols_pro'] == partidas['gols_contra']],
+        ['V', 'E'],
+        default='D'
+    )
+    partidas.loc[~jogado, 'resultado'] = None
+    partidas['jogado'] = jogado
+    return partidas.reset_index(drop=True)
+
+
+# ---------- Métricas do dashboard para todos os times de uma vez ----------
+def resumir_times(partidas):
+    jogado = partidas['jogado'].to_numpy()
+    mandante = partidas['mandante'].to_numpy()
+    resultado = partidas['resultado'].to_numpy()
+    gols_pro = np.nan_to_num(partidas['gols_pro'].to_numpy(dtype=float))
+    gols_contra = np.nan_to_num(partidas['gols_contra'].to_numpy(dtype=float))
+
+    colunas = pd.DataFrame({
+        'time': partidas['time'].to_numpy(),
+        'jogos': jogado,
+        'vitorias': resultado == 'V',
+        'empates': resultado == 'E',
+        'derrotas': resultado == 'D',
+        'gols_feitos': gols_pro,
+        'gols_sofridos': gols_contra,
+        'gols_mandante': np.where(mandante, gols_pro, 0),
+        'gols_visitante': np.where(~mandante, gols_pro, 0),
+        'gols_sofridos_visitante': np.where(~mandante, gols_contra, 0),
+        'jogos_mandante': jogado & mandante,
+        'jogos_visitante': jogado & ~mandante,
+    })
+    resumo = colunas.groupby('time', sort=True).sum().astype(int)
+
+    resumo['pontos'] = resumo['vitorias'] * 3 + resumo['empates']
+    resumo['saldo'] = resumo['gols_feitos'] - resumo['gols_sofridos']
+    resumo['aproveitamento'] = np.where(
+        resumo['jogos'] > 0, resumo['pontos'] / (resumo['jogos'].clip(lower=1) * 3) * 100, 0.0
+    )
+    resumo['media_mandante'] = resumo['gols_mandante'] / resumo['jogos_mandante'].clip(lower=1)
+    resumo['media_visitante'] = resumo['gols_visitante'] / resumo['jogos_visitante'].clip(lower=1)
+    return resumo
+
+
+# Linha de um time como dict (mantém inteiros como int para exibição)
+def metricas_time(resumo, time):
+    return resumo.loc[[time]].to_dict('records')[0]
+
+
+def estatisticas_times(df_jogos):
+    return resumir_times(montar_partidas_por_time(df_jogos))
+
+
+# ---------- Evolução (tendência) de todos os times ----------
+def tendencia_times(partidas):
+    ordem = ['temporada', 'rodada', 'data'] if 'temporada' in partidas.columns else ['rodada', 'data']
+    jogadas = partidas[partidas['jogado']].sort_values(ordem, kind='stable')
+    tendencia = jogadas[['time', 'data', 'rodada', 'resultado']].copy()
+    tendencia['tendencia'] = (
+        tendencia['resultado'].map(TENDENCIA_RESULTADO).groupby(tendencia['time']).cumsum()
+    )
+    return tendencia
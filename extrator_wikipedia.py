@@ -0,0 +1,183 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+# ---------- Extrator de tabelas da Wikipedia (lxml, uma passada) ----------
+# Percorre a página uma única vez com iterparse, procurando todos os títulos
+# pedidos ao mesmo tempo. A primeira tabela "wikitable" depois de cada título
+# vira um DataFrame montado direto das células (com rowspan/colspan), sem
+# serializar de volta para string nem passar por pd.read_html. Elementos já
+# processados são descartados para manter a memória baixa, e a leitura para
+# assim que todas as tabelas foram encontradas.
+
+RE_INTEIRO = re.compile(r"^[+\-]?\d+$")
+RE_PLACAR = r"^\s*(\d+)\s*[–\-−]\s*(\d+)\s*$"
+
+
+def _texto(elemento):
+    return " ".join("".join(elemento.itertext()).split())
+
+
+# Remove notas de rodapé, estilos embutidos e tabelas aninhadas (legendas, layout de
+# célula: não são linhas da tabela), preservando o texto que vem depois
+def _limpar(tabela):
+    for e in tabela.xpath(".//sup[contains(@class, 'reference')] | .//style | .//table"):
+        pai = e.getparent()
+        if e.tail:
+            anterior = e.getprevious()
+            if anterior is not None:
+                anterior.tail = (anterior.tail or "") + e.tail
+            else:
+                pai.text = (pai.text or "") + e.tail
+        pai.remove(e)
+
+
+def _inteiro(valor, padrao=1):
+    try:
+        return max(1, int(valor))
+    except (TypeError, ValueError):
+        return padrao
+
+
+# Expande rowspan/colspan: retorna lista de linhas [(texto, eh_cabecalho), ...]
+def _grade(tabela):
+    linhas = []
+    pendentes = {}  # coluna -> [linhas restantes, texto, eh_cabecalho]
+    for tr in tabela.iter("tr"):
+        celulas = iter([c for c in tr if c.tag in ("td", "th")])
+        linha = []
+        col = 0
+        while True:
+            if col in pendentes:
+                restantes, texto, cabecalho = pendentes[col]
+                linha.append((texto, cabecalho))
+                if restantes <= 1:
+                    del pendentes[col]
+                else:
+                    pendentes[col][0] -= 1
+                col += 1
+                continue
+            celula = next(celulas, None)
+            if celula is None:
+                break
+            texto, cabecalho = _texto(celula), celula.tag == "th"
+            rowspan = _inteiro(celula.get("rowspan"))
+            for _ in range(_inteiro(celula.get("colspan"))):
+                if rowspan > 1:
+                    pendentes[col] = [rowspan - 1, texto, cabecalho]
+                linha.append((texto, cabecalho))
+                col += 1
+        # Células de rowspan que continuam depois da última célula da linha
+        while col in pendentes:
+            restantes, texto, cabecalho = pendentes[col]
+            linha.append((texto, cabecalho))
+            if restantes <= 1:
+                del pendentes[col]
+            else:
+                pendentes[col][0] -= 1
+            col += 1
+        if linha:
+            linhas.append(linha)
+    return linhas
+
+
+# Colunas só com inteiros (aceita "+18" e o sinal "−" da Wikipedia) viram int64/Int64
+def _converter_coluna(valores):
+    normalizados = [v.replace("−", "-") if v is not None else None for v in valores]
+    preenchidos = [v for v in normalizados if v is not None]
+    if preenchidos and all(RE_INTEIRO.match(v) for v in preenchidos):
+        if len(preenchidos) == len(normalizados):
+            return pd.array([int(v) for v in normalizados], dtype="int64")
+        return pd.array([int(v) if v is not None else None for v in normalizados], dtype="Int64")
+    return pd.array(valores, dtype="string")
+
+
+def tabela_para_dataframe(tabela):
+    _limpar(tabela)
+    linhas = _grade(tabela)
+    n_cabecalho = 0
+    while n_cabecalho < len(linhas) and all(cabecalho for _, cabecalho in linhas[n_cabecalho]):
+        n_cabecalho += 1
+    n_colunas = max(len(linha) for linha in linhas)
+
+    colunas = []
+    for c in range(n_colunas):
+        partes = []
+        for linha in linhas[:n_cabecalho]:
+            texto = linha[c][0] if c < len(linha) else ""
+            if texto and texto not in partes:
+                partes.append(texto)
+        colunas.append(" ".join(partes) or str(c))
+
+    dados = [[texto or None for texto, _ in linha] + [None] * (n_colunas - len(linha))
+             for linha in linhas[n_cabecalho:]]
+    por_coluna = list(zip(*dados)) if dados else [()] * n_colunas
+    return pd.DataFrame({coluna: _converter_coluna(valores) for coluna, valores in zip(colunas, por_coluna)})
+
+
+def extrair_tabelas(html, titulos):
+    pendentes = {titulo: titulo.lower() for titulo in titulos}
+    encontradas = {titulo: None for titulo in titulos}
+    procurando = []  # títulos cujo cabeçalho já apareceu e aguardam a próxima wikitable
+
+    conteudo = html.encode("utf-8") if isinstance(html, str) else html
+    eventos = etree.iterparse(io.BytesIO(conteudo), events=("end",), tag=("h2", "h3", "table"),
+                              html=True, encoding="utf-8", recover=True)
+    for _, elemento in eventos:
+        if elemento.tag in ("h2", "h3"):
+            texto = _texto(elemento).lower()
+            for titulo, chave in list(pendentes.items()):
+                if chave in texto:
+                    procurando.append(titulo)
+                    del pendentes[titulo]
+        elif procurando and "wikitable" in (elemento.get("class") or "").split():
+            df = tabela_para_dataframe(elemento)
+            for titulo in procurando:
+                encontradas[titulo] = df
+            procurando = []
+            if not pendentes:
+                break
+
+        # Libera o que já foi lido (o elemento e os irmãos anteriores), exceto dentro de outra
+        # tabela: uma tabela aninhada (legenda, layout de célula) ainda faz parte da externa
+        if next(elemento.iterancestors("table"), None) is None:
+            elemento.clear(keep_tail=True)
+            pai = elemento.getparent()
+            while pai is not None and elemento.getprevious() is not None:
+                del pai[0]
+    return encontradas
+
+
+# ---------- "Confrontos" (mandante x visitante) -> formato longo de df_jogos ----------
+# As colunas do quadro são siglas na mesma ordem das linhas; a diagonal fica de fora
+# e as células sem placar ("a", vazias) não trazem resultado. O quadro não tem data
+# nem rodada: elas vêm do calendário (df_jogos da planilha), casando cada par
+# mandante x visitante, que se enfrenta uma vez por temporada. Placares do quadro
+# substituem os do calendário; os demais jogos ficam como estão. Um placar cujo par
+# não está no calendário (outra temporada, nome diferente) levanta ValueError.
+def confrontos_para_jogos(tabela, calendario):
+    mandantes = tabela.iloc[:, 0].astype(str).str.strip().to_numpy()
+    placares = tabela.iloc[:, 1:].astype("string")
+    if placares.shape[1] != len(mandantes):
+        raise ValueError("Quadro de confrontos não é quadrado (mandantes x visitantes).")
+
+    i, j = np.nonzero(~np.eye(len(mandantes), dtype=bool))
+    gols = pd.Series(placares.to_numpy()[i, j], dtype="string").str.extract(RE_PLACAR).astype(float)
+    gols.index = pd.Index(mandantes[i]) + "|" + pd.Index(mandantes[j])
+    gols = gols.dropna()
+
+    chaves = calendario["mandante"].astype(str) + "|" + calendario["visitante"].astype(str)
+    fora = gols.index.difference(chaves)
+    if len(fora):
+        exemplos = ", ".join(c.replace("|", " x ") for c in fora[:5])
+        raise ValueError(f"{len(fora)} placar(es) do quadro de confrontos fora do calendário (ex.: {exemplos})")
+
+    novos = gols.reindex(chaves).to_numpy()
+    jogos = calendario.copy()
+    for k, coluna in enumerate(["gols_mandante", "gols_visitante"]):
+        atuais = jogos[coluna].astype("Float64").to_numpy(dtype=float, na_value=np.nan)
+        jogos[coluna] = np.where(np.isnan(novos[:, k]), atuais, novos[:, k])
+    return jogos
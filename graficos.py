@@ -0,0 +1,26 @@
+# ---------- Gráficos da análise de um time ----------
+# Usados pelo app e pelo relatório em lote (relatorios.py). O plotly só é
+# importado quando um gráfico é montado, então quem só precisa das métricas
+# não paga o import.
+
+CORES_RESULTADOS = {'Vitórias': '#25c863', 'Empates': '#f4a261', 'Derrotas': '#e63946'}
+
+
+# Barras de vitórias/empates/derrotas a partir de metricas_time (estatisticas.py)
+def figura_resultados(m, time, cores=None):
+    import plotly.graph_objects as go
+
+    valores = {'Vitórias': m['vitorias'], 'Empates': m['empates'], 'Derrotas': m['derrotas']}
+    fig = go.Figure(data=[
+        go.Bar(name=nome, x=["Resultados"], y=[valor], marker_color=(cores or {}).get(nome))
+        for nome, valor in valores.items()
+    ])
+    fig.update_layout(barmode='group', title=f"Resultados do {time}", template="plotly_white")
+    return fig
+
+
+# Linha da tendência acumulada (+1/0/-1) do time, a partir de tendencia_times
+def figura_tendencia(df_tendencia, time, eixo_x="rodada"):
+    import plotly.express as px
+
+    return px.line(df_tendencia, x=eixo_x, y="tendencia", markers=True, title=f"Evolução da Performance - {time}")
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ---------- Gravação incremental das tabelas raspadas ----------
+# Cada tabela é quebrada em unidades com chave estável (Classificação: uma
+# linha por equipe; Confrontos: uma célula por mandante x visitante) e cada
+# unidade vira um hash. O estado (hashes + número de versão) fica num JSON ao
+# lado da planilha. A cada gravação:
+#   - tabela com o mesmo hash total da última vez: nada a fazer;
+#   - senão, só as unidades novas/alteradas/removidas vão para o log de
+#     mudanças (JSON-lines, só acrescenta), a planilha é regravada num arquivo
+#     temporário e trocada com os.replace, e a versão sobe 1.
+# Sem mudança não há escrita em disco; quem lê a planilha nunca vê um arquivo
+# pela metade, e a versão serve de chave para os caches de leitura.
+# Gravações do mesmo arquivo são serializadas por uma trava por caminho (vale
+# para todas as instâncias do processo) e por uma trava de arquivo (vale entre
+# processos), então duas sessões nunca partem da mesma versão.
+
+_travas = {}  # caminho absoluto da planilha -> threading.Lock
+_travas_guarda = threading.Lock()
+
+
+def _trava_do_caminho(caminho):
+    with _travas_guarda:
+        return _travas.setdefault(os.path.abspath(caminho), threading.Lock())
+
+
+@contextmanager
+def _trava_arquivo(caminho):
+    with open(caminho, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _chave_linhas(tabela):
+    colunas = [c for c in tabela.columns if str(c).startswith("Equipe")]
+    return tabela[colunas[0] if colunas else tabela.columns[0]].astype(str)
+
+
+# Classificação e afins: unidade = linha (chave = equipe); Confrontos: unidade = célula
+def unidades(titulo, tabela):
+    if titulo == "Confrontos":
+        mandantes = tabela.iloc[:, 0].astype(str).tolist()
+        valores = tabela.iloc[:, 1:]
+        return {
+            f"{m}|{v}": (None if pd.isna(x) else str(x))
+            for m, linha in zip(mandantes, valores.itertuples(index=False))
+            for v, x in zip(valores.columns, linha)
+        }
+    registros = tabela.astype(object).where(tabela.notna(), None).to_dict("records")
+    return {chave: registro for chave, registro in zip(_chave_linhas(tabela), registros)}
+
+
+def _hash(valor):
+    return hashlib.sha1(json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class GravadorTabelas:
+    def __init__(self, caminho_xlsx):
+        self.caminho_xlsx = caminho_xlsx
+        base = os.path.splitext(caminho_xlsx)[0]
+        self.caminho_estado = f"{base}.estado.json"
+        self.caminho_log = f"{base}.mudancas.jsonl"
+        self.caminho_trava = f"{base}.trava"
+        self._trava = _trava_do_caminho(caminho_xlsx)
+
+    def ler_estado(self):
+        try:
+            with open(self.caminho_estado, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"versao": 0, "tabelas": {}}
+
+    def versao(self):
+        return self.ler_estado()["versao"]
+
+    def _gravar_planilha(self, tabelas):
+        temporario = f"{os.path.splitext(self.caminho_xlsx)[0]}.{os.getpid()}.{threading.get_ident()}.tmp.xlsx"
+        with pd.ExcelWriter(temporario) as writer:
+            for titulo, tabela in tabelas.items():
+                tabela.to_excel(writer, sheet_name=titulo, index=False)
+        os.replace(temporario, self.caminho_xlsx)
+
+    def _gravar_estado(self, estado):
+        temporario = f"{self.caminho_estado}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_estado)
+
+    # Diferença por unidade entre o estado guardado e a tabela nova
+    def _diferenca(self, titulo, tabela, anteriores):
+        atuais = unidades(titulo, tabela)
+        hashes = {chave: _hash(valor) for chave, valor in atuais.items()}
+        mudancas = []
+        for chave, h in hashes.items():
+            if anteriores.get(chave) != h:
+                mudancas.append({"tabela": titulo, "chave": chave,
+                                 "tipo": "alterada" if chave in anteriores else "nova", "valor": atuais[chave]})
+        for chave in anteriores.keys() - hashes.keys():
+            mudancas.append({"tabela": titulo, "chave": chave, "tipo": "removida", "valor": None})
+        return hashes, mudancas
+
+    # tabelas: {título da aba: DataFrame}. Retorna (versão, mudou)
+    def gravar(self, tabelas):
+        with self._trava, _trava_arquivo(self.caminho_trava):
+            estado = self.ler_estado()
+            novo = {"versao": estado["versao"], "tabelas": {}}
+            mudancas = []
+            for titulo, tabela in tabelas.items():
+                anterior = estado["tabelas"].get(titulo, {"hash": None, "unidades": {}})
+                hash_tabela = _hash(pd.util.hash_pandas_object(tabela.astype(str), index=False).tolist()
+                                    + [str(c) for c in tabela.columns])
+                if hash_tabela == anterior["hash"]:
+                    novo["tabelas"][titulo] = anterior
+                    continue
+                hashes, mudancas_tabela = self._diferenca(titulo, tabela, anterior["unidades"])
+                novo["tabelas"][titulo] = {"hash": hash_tabela, "unidades": hashes}
+                mudancas += mudancas_tabela
+            for titulo in estado["tabelas"].keys() - tabelas.keys():
+                mudancas += [{"tabela": titulo, "chave": chave, "tipo": "removida", "valor": None}
+                             for chave in estado["tabelas"][titulo]["unidades"]]
+
+            planilha_existe = os.path.exists(self.caminho_xlsx)
+            if not mudancas and planilha_existe and novo["tabelas"] == estado["tabelas"]:
+                return estado["versao"], False
+
+            novo["versao"] = estado["versao"] + 1
+            if mudancas:
+                quando = datetime.now().isoformat(timespec="seconds")
+                with open(self.caminho_log, "a", encoding="utf-8") as f:
+                    for mudanca in mudancas:
+                        f.write(json.dumps({"versao": novo["versao"], "quando": quando, **mudanca},
+                                           ensure_ascii=False, default=str) + "\n")
+            self._gravar_planilha(tabelas)
+            self._gravar_estado(novo)  # o estado vai por último: se algo falhar antes, a próxima gravação refaz
+            return novo["versao"], True
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+# ---------- Índices pré-calculados sobre df_jogos ----------
+
+
+# Placar válido nas duas colunas (aceita NaN e strings vazias vindas da planilha)
+def mascara_disputados(df_jogos):
+    gols_mandante = pd.to_numeric(df_jogos['gols_mandante'], errors='coerce')
+    gols_visitante = pd.to_numeric(df_jogos['gols_visitante'], errors='coerce')
+    return gols_mandante.notna() & gols_visitante.notna()
+
+
+# Uma linha por rodada: jogos marcados, jogos disputados, primeira/última data
+# e se a rodada está completa. Calculado numa única passada agrupada.
+def indice_rodadas(df_jogos):
+    indice = pd.DataFrame({
+        'rodada': df_jogos['rodada'].to_numpy(),
+        'disputado': mascara_disputados(df_jogos).to_numpy(),
+        'data': df_jogos['data'].to_numpy(),
+    }).groupby('rodada', sort=True).agg(
+        jogos=('disputado', 'size'),
+        disputados=('disputado', 'sum'),
+        primeira_data=('data', 'min'),
+        ultima_data=('data', 'max'),
+    )
+    indice['completa'] = indice['disputados'] == indice['jogos']
+    return indice
+
+
+def listar_rodadas_completas(indice):
+    return indice.index[indice['completa']].tolist()
+
+
+# Rodadas com algum jogo ainda sem placar (onde estão os próximos jogos)
+def listar_rodadas_pendentes(indice):
+    return indice.index[~indice['completa']].tolist()
+
+
+# Rodada atual = última rodada com algum jogo disputado (ou a primeira, se nenhuma)
+def obter_rodada_atual(indice):
+    com_jogos = indice.index[indice['disputados'] > 0].tolist()
+    if com_jogos:
+        return com_jogos[-1]
+    return indice.index.tolist()[0] if len(indice) else 1
+
+
+# ---------- Índice time -> posições dos jogos ----------
+# O frame é ordenado por data uma única vez; para cada time guardamos as
+# posições (já em ordem de data) dos jogos disputados e dos pendentes.
+# "Últimos N" vira uma fatia do fim e "próximos N" uma fatia do começo
+# (ou um searchsorted pela data de corte), sem sort nem máscara por clique.
+class IndiceJogos:
+    def __init__(self, df_jogos):
+        self.jogos = df_jogos.sort_values('data', kind='stable').reset_index(drop=True)
+        self.datas = self.jogos['data'].to_numpy()
+        disputado = mascara_disputados(self.jogos).to_numpy()
+        self.disputados = np.flatnonzero(disputado)
+        self.pendentes = np.flatnonzero(~disputado)
+
+        n = len(self.jogos)
+        posicoes = np.concatenate([np.arange(n), np.arange(n)])
+        times = np.concatenate([self.jogos['mandante'].to_numpy(dtype=object), self.jogos['visitante'].to_numpy(dtype=object)])
+        validos = pd.notna(times)
+        posicoes, times = posicoes[validos], times[validos]
+        codigos, nomes = pd.factorize(times)
+        ordem = np.lexsort((posicoes, codigos))
+        grupos = np.split(posicoes[ordem], np.flatnonzero(np.diff(codigos[ordem])) + 1) if len(ordem) else []
+        self.por_time = {}
+        for nome, grupo in zip(nomes, grupos):
+            self.por_time[nome] = (grupo[disputado[grupo]], grupo[~disputado[grupo]])
+
+    def _posicoes(self, time, disputados):
+        if not time:
+            return self.disputados if disputados else self.pendentes
+        vazio = np.empty(0, dtype=np.intp)
+        return self.por_time.get(time, (vazio, vazio))[0 if disputados else 1]
+
+    # Jogos disputados mais recentes primeiro (até a data de corte, se houver)
+    def ultimos(self, time=None, n=5, ate=None):
+        posicoes = self._posicoes(time, disputados=True)
+        if ate is not None:
+            posicoes = posicoes[:np.searchsorted(self.datas[posicoes], np.datetime64(ate), side='right')]
+        return self.jogos.iloc[posicoes[-n:][::-1]] if n else self.jogos.iloc[[]]
+
+    # Jogos sem placar mais próximos primeiro (a partir da data de corte, se houver)
+    def proximos(self, time=None, n=5, a_partir_de=None):
+        posicoes = self._posicoes(time, disputados=False)
+        if a_partir_de is not None:
+            posicoes = posicoes[np.searchsorted(self.datas[posicoes], np.datetime64(a_partir_de), side='left'):]
+        return self.jogos.iloc[posicoes[:n]]
+
+
+# ---------- Confrontos diretos ----------
+# Montado uma vez por conjunto de jogos. Matrizes times x times com jogos,
+# vitórias, empates e gols de i contra j (linha = time, coluna = adversário),
+# e, para cada par, os encontros em ordem de data num layout CSR (os jogos de
+# um par ficam contíguos em "encontros", de inicio[par] a inicio[par + 1]).
+# Retrospecto e gols de um par são leituras diretas nas matrizes; os últimos
+# N encontros são uma fatia; o mapa da liga inteira é a própria matriz.
+class IndiceConfrontos:
+    METRICAS = ['jogos', 'vitorias', 'empates', 'derrotas', 'gols_pro', 'gols_contra', 'saldo', 'pontos']
+
+    def __init__(self, df_jogos):
+        jogos = df_jogos[mascara_disputados(df_jogos)].sort_values('data', kind='stable').reset_index(drop=True)
+        self.times = np.array(sorted(pd.unique(jogos[['mandante', 'visitante']].values.ravel('K'))), dtype=object)
+        self.posicao = {t: i for i, t in enumerate(self.times)}
+        n = len(self.times)
+
+        casa = np.searchsorted(self.times, jogos['mandante'].to_numpy(dtype=object))
+        fora = np.searchsorted(self.times, jogos['visitante'].to_numpy(dtype=object))
+        gols_casa = pd.to_numeric(jogos['gols_mandante']).to_numpy(dtype=np.int64)
+        gols_fora = pd.to_numeric(jogos['gols_visitante']).to_numpy(dtype=np.int64)
+
+        self.jogos = np.zeros((n, n), dtype=np.int32)
+        self.vitorias = np.zeros((n, n), dtype=np.int32)
+        self.empates = np.zeros((n, n), dtype=np.int32)
+        self.gols = np.zeros((n, n), dtype=np.int32)
+        np.add.at(self.jogos, (casa, fora), 1)
+        np.add.at(self.jogos, (fora, casa), 1)
+        np.add.at(self.vitorias, (casa, fora), gols_casa > gols_fora)
+        np.add.at(self.vitorias, (fora, casa), gols_fora > gols_casa)
+        np.add.at(self.empates, (casa, fora), gols_casa == gols_fora)
+        np.add.at(self.empates, (fora, casa), gols_casa == gols_fora)
+        np.add.at(self.gols, (casa, fora), gols_casa)
+        np.add.at(self.gols, (fora, casa), gols_fora)
+
+        # par não ordenado -> código a * n + b (a < b); ordena os jogos por par mantendo a data
+        par = np.minimum(casa, fora) * n + np.maximum(casa, fora)
+        ordem = np.argsort(par, kind='stable')
+        self.encontros = jogos.iloc[ordem].reset_index(drop=True)
+        self.inicio = np.searchsorted(par[ordem], np.arange(n * n + 1))
+
+    def matriz(self, metrica='saldo'):
+        valores = {
+            'jogos': self.jogos,
+            'vitorias': self.vitorias,
+            'empates': self.empates,
+            'derrotas': self.vitorias.T,
+            'gols_pro': self.gols,
+            'gols_contra': self.gols.T,
+            'saldo': self.gols - self.gols.T,
+            'pontos': 3 * self.vitorias + self.empates,
+        }[metrica]
+        return pd.DataFrame(valores, index=self.times, columns=self.times)
+
+    # Retrospecto de time contra adversario (do ponto de vista de time)
+    def retrospecto(self, time, adversario):
+        i, j = self.posicao.get(time), self.posicao.get(adversario)
+        if i is None or j is None:
+            return dict.fromkeys(self.METRICAS, 0)
+        return {
+            'jogos': int(self.jogos[i, j]),
+            'vitorias': int(self.vitorias[i, j]),
+            'empates': int(self.empates[i, j]),
+            'derrotas': int(self.vitorias[j, i]),
+            'gols_pro': int(self.gols[i, j]),
+            'gols_contra': int(self.gols[j, i]),
+            'saldo': int(self.gols[i, j] - self.gols[j, i]),
+            'pontos': int(3 * self.vitorias[i, j] + self.empates[i, j]),
+        }
+
+    # Últimos n encontros do par, mais recente primeiro
+    def ultimos(self, time, adversario, n=5):
+        i, j = self.posicao.get(time), self.posicao.get(adversario)
+        if i is None or j is None or not n:
+            return self.encontros.iloc[[]]
+        par = min(i, j) * len(self.times) + max(i, j)
+        inicio, fim = self.inicio[par], self.inicio[par + 1]
+        return self.encontros.iloc[max(inicio, fim - n):fim][::-1]
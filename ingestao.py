@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import aiohttp
+
+from cache_wikipedia import PASTA_CACHE, URL_WIKIPEDIA, CacheWikipedia
+from extrator_wikipedia import extrair_tabelas
+
+# ---------- Ingestão concorrente de várias competições/temporadas ----------
+# Um único ClientSession (pool de conexões) baixa todas as fontes ao mesmo
+# tempo, limitado por um semáforo. Erros de rede, 429 e 5xx são repetidos com
+# espera exponencial + jitter. Cada página passa pelo extrator assim que chega
+# (numa thread, para não travar o laço de eventos enquanto as outras baixam) e
+# é registrada no cache em disco (cache_wikipedia.py), que também fornece o
+# GET condicional: página sem mudança volta 304 e vem do disco. Qualquer erro
+# de uma fonte fica em resultado["erro"]; as demais seguem normalmente.
+#
+#   python ingestao.py                      # fontes padrão
+#   python ingestao.py --fontes fontes.json # [{"competicao", "temporada", "url", "titulos"?}]
+
+TITULOS_PADRAO = ["Classificação", "Confrontos"]
+URL_PAGINA = "https://pt.wikipedia.org/wiki/Campeonato_Brasileiro_de_Futebol_de_{ano}_-_S%C3%A9rie_{serie}"
+
+FONTES_PADRAO = [
+    {"competicao": "serie_a", "temporada": 2025, "url": URL_WIKIPEDIA},
+    {"competicao": "serie_b", "temporada": 2025, "url": URL_PAGINA.format(ano=2025, serie="B")},
+    {"competicao": "serie_a", "temporada": 2024, "url": URL_PAGINA.format(ano=2024, serie="A")},
+    {"competicao": "serie_b", "temporada": 2024, "url": URL_PAGINA.format(ano=2024, serie="B")},
+]
+
+CONCORRENCIA = 4
+TENTATIVAS = 4
+ESPERA_BASE = 0.5  # segundos; dobra a cada tentativa
+TIMEOUT = 10
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+class ErroRepetivel(Exception):
+    pass
+
+
+async def _baixar(sessao, cache, timeout):
+    async with sessao.get(cache.url, headers=cache.cabecalhos(), timeout=aiohttp.ClientTimeout(total=timeout)) as resposta:
+        if resposta.status in STATUS_REPETIR:
+            raise ErroRepetivel(f"HTTP {resposta.status}")
+        if resposta.status == 304:
+            return 304, None, None, None
+        resposta.raise_for_status()
+        return resposta.status, await resposta.text(), resposta.headers.get("ETag"), resposta.headers.get("Last-Modified")
+
+
+# Baixa (com repetição), registra no cache e extrai as tabelas de uma fonte
+async def ingerir_fonte(sessao, semaforo, fonte, pasta_cache=PASTA_CACHE, tentativas=TENTATIVAS,
+                        espera_base=ESPERA_BASE, timeout=TIMEOUT):
+    cache = CacheWikipedia(fonte["url"], pasta_cache, timeout=timeout)
+    resultado = {"competicao": fonte["competicao"], "temporada": fonte["temporada"], "url": fonte["url"],
+                 "status": None, "mudou": False, "tentativas": 0, "erro": None, "tabelas": {}}
+    inicio = time.perf_counter()
+    for tentativa in range(1, tentativas + 1):
+        resultado["tentativas"] = tentativa
+        try:
+            async with semaforo:
+                status, html, etag, last_modified = await _baixar(sessao, cache, timeout)
+            break
+        except (ErroRepetivel, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            resultado["erro"] = f"{type(e).__name__}: {e}"
+            if tentativa == tentativas:
+                resultado["segundos"] = time.perf_counter() - inicio
+                return resultado
+            await asyncio.sleep(espera_base * 2 ** (tentativa - 1) * (1 + random.random()))
+        except aiohttp.ClientResponseError as e:  # 4xx que não adianta repetir
+            resultado["erro"] = f"HTTP {e.status}"
+            resultado["segundos"] = time.perf_counter() - inicio
+            return resultado
+        except Exception as e:  # ex.: corpo que não decodifica; também não adianta repetir
+            resultado["erro"] = f"{type(e).__name__}: {e}"
+            resultado["segundos"] = time.perf_counter() - inicio
+            return resultado
+
+    resultado["status"], resultado["erro"] = status, None
+    # cache em disco e extrator rodam em threads enquanto as outras fontes continuam baixando;
+    # uma falha aqui (disco, página inesperada) fica no resultado desta fonte, sem derrubar as outras
+    try:
+        resultado["mudou"] = await asyncio.to_thread(cache.registrar_resposta, status, html, etag, last_modified)
+        if html is None:
+            html = await asyncio.to_thread(cache.ler_html)
+        resultado["tabelas"] = await asyncio.to_thread(extrair_tabelas, html, fonte.get("titulos", TITULOS_PADRAO))
+    except Exception as e:
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+async def ingerir_async(fontes, concorrencia=CONCORRENCIA, **opcoes):
+    conector = aiohttp.TCPConnector(limit=concorrencia, limit_per_host=concorrencia)
+    async with aiohttp.ClientSession(connector=conector) as sessao:
+        semaforo = asyncio.Semaphore(concorrencia)
+        tarefas = [ingerir_fonte(sessao, semaforo, fonte, **opcoes) for fonte in fontes]
+        return [await tarefa for tarefa in asyncio.as_completed(tarefas)]
+
+
+# Ponto de entrada síncrono: lista de resultados na ordem em que ficaram prontos
+def ingerir(fontes=None, concorrencia=CONCORRENCIA, **opcoes):
+    return asyncio.run(ingerir_async(fontes or FONTES_PADRAO, concorrencia, **opcoes))
+
+
+def gravar_planilhas(resultados, pasta):
+    import pandas as pd
+
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    for r in resultados:
+        tabelas = {titulo: t for titulo, t in r["tabelas"].items() if t is not None}
+        if not tabelas:
+            continue
+        caminho = os.path.join(pasta, f"{r['competicao']}_{r['temporada']}.xlsx")
+        with pd.ExcelWriter(caminho) as writer:
+            for titulo, tabela in tabelas.items():
+                tabela.to_excel(writer, sheet_name=titulo[:31], index=False)
+        caminhos.append(caminho)
+    return caminhos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Baixa e extrai várias competições/temporadas ao mesmo tempo.")
+    parser.add_argument("--fontes", help="JSON com a lista de fontes (padrão: Séries A e B de 2024 e 2025)")
+    parser.add_argument("--concorrencia", type=int, default=CONCORRENCIA)
+    parser.add_argument("--tentativas", type=int, default=TENTATIVAS)
+    parser.add_argument("--pasta-cache", default=PASTA_CACHE)
+    parser.add_argument("--saida", help="grava as tabelas de cada fonte em <saida>/<competicao>_<temporada>.xlsx")
+    args = parser.parse_args()
+
+    fontes = FONTES_PADRAO
+    if args.fontes:
+        with open(args.fontes, encoding="utf-8") as f:
+            fontes = json.load(f)
+    inicio = time.perf_counter()
+    resultados = ingerir(fontes, args.concorrencia, tentativas=args.tentativas, pasta_cache=args.pasta_cache)
+    for r in resultados:
+        tabelas = ", ".join(f"{t}: {'ok' if v is not None else '-'}" for t, v in r["tabelas"].items())
+        situacao = r["erro"] or f"HTTP {r['status']}{' (mudou)' if r['mudou'] else ''}"
+        print(f"{r['competicao']} {r['temporada']}: {situacao} | {r['tentativas']} tentativa(s) | "
+              f"{r['segundos']:.2f} s | {tabelas}")
+    print(f"{len(resultados)} fonte(s) em {time.perf_counter() - inicio:.2f} s")
+    if args.saida:
+        for caminho in gravar_planilhas(resultados, args.saida):
+            print(f"Gravado {caminho}")
+    if any(r["erro"] for r in resultados):
+        sys.exit(1)
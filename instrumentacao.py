@@ -0,0 +1,166 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# ---------- Instrumentação das execuções do app ----------
+# Mede o tempo de cada seção do script e de cada função cacheada (com
+# acerto/falha de cache e número de linhas do resultado), agrupado por
+# execução (rerun). Ao fim da execução grava uma linha JSON por rerun e/ou o
+# arquivo de texto do Prometheus com os totais do processo.
+# Ligada por EVOLUTION_METRICAS=1. Desligada, medir() devolve um contexto
+# vazio e instrumentar_cache() devolve o decorador de cache original: o
+# custo é uma checagem de booleano por seção e nada por função cacheada.
+
+ATIVO = os.environ.get("EVOLUTION_METRICAS", "0") == "1"
+FORMATOS = os.environ.get("EVOLUTION_METRICAS_FORMATO", "jsonl").split(",")  # jsonl, prometheus
+PASTA_METRICAS = os.environ.get(
+    "EVOLUTION_METRICAS_PASTA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metricas"))
+
+_local = threading.local()
+_trava = threading.Lock()
+_totais = {}  # (tipo, nome) -> {"chamadas", "segundos", "acertos", "falhas"}
+_VAZIO = nullcontext({})  # aceita m["linhas"] = ... mesmo desligada
+
+
+def _linhas(resultado):
+    forma = getattr(resultado, "shape", None)
+    return int(forma[0]) if forma else None
+
+
+def _registrar(tipo, nome, segundos, linhas=None, acerto=None):
+    evento = {"tipo": tipo, "nome": nome, "ms": round(segundos * 1000, 3)}
+    if linhas is not None:
+        evento["linhas"] = linhas
+    if acerto is not None:
+        evento["cache"] = "acerto" if acerto else "falha"
+    eventos = getattr(_local, "eventos", None)
+    if eventos is not None:
+        eventos.append(evento)
+    with _trava:
+        total = _totais.setdefault((tipo, nome), {"chamadas": 0, "segundos": 0.0, "acertos": 0, "falhas": 0})
+        total["chamadas"] += 1
+        total["segundos"] += segundos
+        if acerto is not None:
+            total["acertos" if acerto else "falhas"] += 1
+
+
+# ---------- Execução (um rerun do script) ----------
+def iniciar_execucao():
+    if ATIVO:
+        _local.eventos = []
+        _local.inicio = time.perf_counter()
+
+
+def eventos_execucao():
+    return list(getattr(_local, "eventos", None) or [])
+
+
+def finalizar_execucao():
+    if not ATIVO or getattr(_local, "eventos", None) is None:
+        return None
+    execucao = {
+        "quando": datetime.now().isoformat(timespec="milliseconds"),
+        "total_ms": round((time.perf_counter() - _local.inicio) * 1000, 3),
+        "eventos": _local.eventos,
+    }
+    _local.eventos = None
+    os.makedirs(PASTA_METRICAS, exist_ok=True)
+    if "jsonl" in FORMATOS:
+        with _trava, open(os.path.join(PASTA_METRICAS, "execucoes.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+    if "prometheus" in FORMATOS:
+        gravar_prometheus(os.path.join(PASTA_METRICAS, "evolution.prom"))
+    return execucao
+
+
+# ---------- Seções do script ----------
+# with medir("carregar jogos") as m: ...; m["linhas"] = len(df)
+@contextmanager
+def _medir(tipo, nome):
+    extra = {}
+    inicio = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        _registrar(tipo, nome, time.perf_counter() - inicio, extra.get("linhas"))
+
+
+def medir(nome):
+    return _medir("secao", nome) if ATIVO else _VAZIO
+
+
+# ---------- Funções cacheadas ----------
+# Uso: @instrumentar_cache(st.cache_data) no lugar de @st.cache_data.
+# A função interna marca que rodou (falha de cache); a externa mede o tempo
+# da chamada inteira. O Streamlit segue usando o código e a assinatura da
+# função original (functools.wraps), então as chaves de cache não mudam.
+def instrumentar_cache(decorador_cache):
+    if not ATIVO:
+        return decorador_cache
+
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def interna(*args, **kwargs):
+            _local.executou = True
+            return funcao(*args, **kwargs)
+
+        cacheada = decorador_cache(interna)
+
+        @functools.wraps(funcao)
+        def externa(*args, **kwargs):
+            anterior = getattr(_local, "executou", False)
+            _local.executou = False
+            inicio = time.perf_counter()
+            try:
+                resultado = cacheada(*args, **kwargs)
+                acerto = not _local.executou
+            finally:
+                _local.executou = anterior
+            _registrar("cache", funcao.__name__, time.perf_counter() - inicio, _linhas(resultado), acerto)
+            return resultado
+
+        externa.clear = getattr(cacheada, "clear", None)
+        return externa
+    return decorar
+
+
+# ---------- Exportação ----------
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def texto_prometheus():
+    with _trava:
+        totais = {chave: dict(valor) for chave, valor in _totais.items()}
+    linhas = [
+        "# HELP evolution_chamadas_total Chamadas por seção do script ou função cacheada.",
+        "# TYPE evolution_chamadas_total counter",
+    ]
+    linhas += [f'evolution_chamadas_total{{tipo="{tipo}",nome="{_rotulo(nome)}"}} {t["chamadas"]}'
+               for (tipo, nome), t in sorted(totais.items())]
+    linhas += [
+        "# HELP evolution_segundos_total Tempo acumulado por seção do script ou função cacheada.",
+        "# TYPE evolution_segundos_total counter",
+    ]
+    linhas += [f'evolution_segundos_total{{tipo="{tipo}",nome="{_rotulo(nome)}"}} {t["segundos"]:.6f}'
+               for (tipo, nome), t in sorted(totais.items())]
+    linhas += [
+        "# HELP evolution_cache_total Acertos e falhas de cache por função cacheada.",
+        "# TYPE evolution_cache_total counter",
+    ]
+    for (tipo, nome), t in sorted(totais.items()):
+        if tipo == "cache":
+            linhas.append(f'evolution_cache_total{{nome="{_rotulo(nome)}",resultado="acerto"}} {t["acertos"]}')
+            linhas.append(f'evolution_cache_total{{nome="{_rotulo(nome)}",resultado="falha"}} {t["falhas"]}')
+    return "\n".join(linhas) + "\n"
+
+
+def gravar_prometheus(caminho):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(texto_prometheus())
+    os.replace(temporario, caminho)
@@ -0,0 +1,266 @@
+import json
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from indices import mascara_disputados
+
+# ---------- Ratings incrementais (Elo e Poisson) ----------
+# Mantém, para todos os times, um Elo e forças de ataque/defesa de um modelo
+# de Poisson (em escala log, atualizadas por gradiente a cada jogo). O estado
+# fica em disco em duas partes: um JSON pequeno com os ratings atuais e um
+# registro append-only (JSONL) com cada jogo aplicado, na ordem, e a trajetória
+# depois dele. Ao chegar uma rodada nova, os placares do frame são comparados
+# com o registro numa passada vetorizada; só os jogos novos passam pelo modelo
+# e vão para o disco (O(jogos da rodada) em aplicação e gravação), sem refazer
+# o histórico. Um jogo é identificado por temporada|rodada|mandante|visitante,
+# então um adiado que muda de data não é aplicado de novo; entra na ordem em
+# que chega. Placar corrigido num jogo já aplicado refaz os ratings a partir
+# do registro (o modelo é online, não dá para "desaplicar" um jogo).
+# Com o catálogo de temporadas, só as partições a partir da última temporada
+# do registro precisam ser passadas a atualizar() (ultima_temporada()); as
+# anteriores já estão no checkpoint.
+
+CAMINHO_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ratings_checkpoint.json")
+
+ELO_INICIAL = 1500.0
+ELO_K = 20.0
+ELO_MANDO = 60.0  # pontos de Elo somados ao mandante no cálculo do esperado
+TAXA_POISSON = 0.05
+MAX_GOLS = 10
+
+
+# Sem a coluna "temporada" (planilha única), a temporada é o ano do primeiro jogo do frame
+# inteiro: a planilha da temporada seguinte não casa com os jogos já aplicados da anterior
+def temporada_do_frame(df_jogos):
+    datas = pd.to_datetime(df_jogos['data']).dropna()
+    return int(datas.min().year) if len(datas) else None
+
+
+# Identifica um jogo no registro: temporada|rodada|mandante|visitante (a data pode mudar)
+def chaves_jogos(df_jogos, temporada=None):
+    chaves = (df_jogos['rodada'].astype(int).astype(str) + '|'
+              + df_jogos['mandante'].astype(str) + '|' + df_jogos['visitante'].astype(str))
+    if 'temporada' in df_jogos.columns:
+        return df_jogos['temporada'].astype(str) + '|' + chaves
+    return f"{temporada}|" + chaves
+
+
+def _placares(df_jogos):
+    return (df_jogos['gols_mandante'].astype(int).astype(str) + 'x'
+            + df_jogos['gols_visitante'].astype(int).astype(str))
+
+
+def _caminho_registro(caminho_checkpoint):
+    return os.path.splitext(caminho_checkpoint)[0] + ".jogos.jsonl"
+
+
+def _gravar_atomico(caminho, escrever):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        escrever(f)
+    os.replace(temporario, caminho)
+
+
+def _multiplicador_saldo(saldo):
+    saldo = abs(saldo)
+    if saldo <= 1:
+        return 1.0
+    if saldo == 2:
+        return 1.5
+    return (11 + saldo) / 8
+
+
+class MotorRatings:
+    def __init__(self, caminho_checkpoint=CAMINHO_CHECKPOINT):
+        self.caminho_checkpoint = caminho_checkpoint
+        self.caminho_registro = _caminho_registro(caminho_checkpoint)
+        self._trava = threading.Lock()
+        self._zerar()
+        self.carregar()
+
+    def _zerar(self):
+        self.times = {}  # time -> {"elo", "ataque", "defesa", "jogos"}
+        self.gols_casa = math.log(1.4)  # log da média de gols do mandante
+        self.gols_fora = math.log(1.1)
+        self.registro = []  # {"chave", "jogo": [data, rodada, mandante, visitante, gm, gv], "historico"} na ordem aplicada
+        self.aplicados = {}  # chave -> placar aplicado ("2x1")
+        self.historico = []  # [data, rodada, time, elo, ataque, defesa] após cada jogo
+
+    # ---------- Checkpoint ----------
+    def carregar(self):
+        registro, regravar = [], False
+        try:
+            with open(self.caminho_registro, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro.append(json.loads(linha))
+                    except json.JSONDecodeError:  # última linha cortada no meio de uma gravação
+                        regravar = True
+                        break
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.caminho_checkpoint, encoding="utf-8") as f:
+                estado = json.load(f)
+        except FileNotFoundError:
+            estado = {}
+        if any(entrada["chave"].count("|") < 3 for entrada in registro):
+            # chaves sem temporada (formato antigo): não casam com as atuais, recomeça do zero
+            registro, estado, regravar = [], {}, True
+
+        # o registro é gravado antes do estado: jogos a mais no registro são reaplicados;
+        # estado sem registro correspondente (ou no formato antigo) é refeito do registro
+        n_jogos = estado.get("n_jogos")
+        if n_jogos is None or n_jogos > len(registro):
+            n_jogos = 0
+        else:
+            self.times = estado["times"]
+            self.gols_casa, self.gols_fora = estado["gols_casa"], estado["gols_fora"]
+        for entrada in registro[:n_jogos]:
+            self._registrar(entrada)
+        for entrada in registro[n_jogos:]:
+            self._aplicar_entrada(entrada)
+        if regravar:  # sem isso, a próxima linha anexada grudaria no pedaço cortado (ou nas chaves antigas)
+            self._regravar_registro(registro)
+
+    def _marcar(self, entrada):
+        gols_m, gols_v = entrada["jogo"][4:]
+        self.registro.append(entrada)
+        self.aplicados[entrada["chave"]] = f"{int(gols_m)}x{int(gols_v)}"
+
+    # Entrada já refletida nos ratings carregados: só volta para o registro e a trajetória
+    def _registrar(self, entrada):
+        self._marcar(entrada)
+        self.historico.extend(entrada["historico"])
+
+    def _aplicar_entrada(self, entrada):
+        n_historico = len(self.historico)
+        self.aplicar_jogo(*entrada["jogo"])
+        entrada["historico"] = self.historico[n_historico:]
+        self._marcar(entrada)
+
+    def _regravar_registro(self, registro):
+        _gravar_atomico(self.caminho_registro, lambda f: f.writelines(
+            json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in registro))
+
+    # novas: entradas que ainda não estão no registro em disco (None = regravar o registro inteiro)
+    def salvar(self, novas=None):
+        if novas is None:
+            self._regravar_registro(self.registro)
+        elif novas:
+            with open(self.caminho_registro, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in novas)
+        estado = {
+            "times": self.times,
+            "gols_casa": self.gols_casa,
+            "gols_fora": self.gols_fora,
+            "n_jogos": len(self.registro),
+        }
+        _gravar_atomico(self.caminho_checkpoint, lambda f: json.dump(estado, f, ensure_ascii=False))
+
+    def _time(self, nome):
+        if nome not in self.times:
+            self.times[nome] = {"elo": ELO_INICIAL, "ataque": 0.0, "defesa": 0.0, "jogos": 0}
+        return self.times[nome]
+
+    # ---------- Atualização por jogo ----------
+    def aplicar_jogo(self, data, rodada, mandante, visitante, gols_m, gols_v):
+        casa, fora = self._time(mandante), self._time(visitante)
+
+        esperado = 1 / (1 + 10 ** ((fora["elo"] - casa["elo"] - ELO_MANDO) / 400))
+        real = 1.0 if gols_m > gols_v else (0.5 if gols_m == gols_v else 0.0)
+        delta = ELO_K * _multiplicador_saldo(gols_m - gols_v) * (real - esperado)
+        casa["elo"] += delta
+        fora["elo"] -= delta
+
+        # gradiente da log-verossimilhança de Poisson para cada lado do placar
+        lambda_m = math.exp(self.gols_casa + casa["ataque"] - fora["defesa"])
+        lambda_v = math.exp(self.gols_fora + fora["ataque"] - casa["defesa"])
+        erro_m, erro_v = gols_m - lambda_m, gols_v - lambda_v
+        casa["ataque"] += TAXA_POISSON * erro_m
+        fora["defesa"] -= TAXA_POISSON * erro_m
+        fora["ataque"] += TAXA_POISSON * erro_v
+        casa["defesa"] -= TAXA_POISSON * erro_v
+        self.gols_casa += TAXA_POISSON * 0.1 * erro_m
+        self.gols_fora += TAXA_POISSON * 0.1 * erro_v
+
+        casa["jogos"] += 1
+        fora["jogos"] += 1
+        data = str(pd.Timestamp(data).date())
+        rodada = None if pd.isna(rodada) else int(rodada)
+        for nome, t in ((mandante, casa), (visitante, fora)):
+            self.historico.append([data, rodada, nome, round(t["elo"], 2), round(t["ataque"], 4), round(t["defesa"], 4)])
+
+    # Aplica só os jogos com placar que ainda não estão no registro, em ordem de data;
+    # placar diferente do já aplicado refaz os ratings a partir do registro corrigido
+    def atualizar(self, df_jogos, salvar=True):
+        disputados = df_jogos[mascara_disputados(df_jogos)]
+        chaves = chaves_jogos(disputados, None if 'temporada' in df_jogos.columns else temporada_do_frame(df_jogos))
+        placares = _placares(disputados)
+        with self._trava:
+            anteriores = chaves.map(self.aplicados)
+            novos = disputados[anteriores.isna()].sort_values('data', kind='stable')
+            mudou = anteriores.notna() & (anteriores != placares)
+            corrigidos = dict(zip(chaves[mudou], zip(disputados.loc[mudou, 'gols_mandante'],
+                                                     disputados.loc[mudou, 'gols_visitante'])))
+            if corrigidos:
+                registro = self.registro
+                for entrada in registro:
+                    if entrada["chave"] in corrigidos:
+                        entrada["jogo"][4:] = [float(g) for g in corrigidos[entrada["chave"]]]
+                self._zerar()
+                for entrada in registro:
+                    self._aplicar_entrada(entrada)
+
+            entradas = []
+            for linha in novos.itertuples(index=True):
+                data = str(pd.Timestamp(linha.data).date())
+                rodada = None if pd.isna(linha.rodada) else int(linha.rodada)
+                entradas.append({"chave": chaves[linha.Index], "jogo": [
+                    data, rodada, str(linha.mandante), str(linha.visitante),
+                    float(linha.gols_mandante), float(linha.gols_visitante)]})
+                self._aplicar_entrada(entradas[-1])
+            if (entradas or corrigidos) and salvar:
+                self.salvar(None if corrigidos else entradas)
+        return len(novos) + len(corrigidos)
+
+    # Temporada do último jogo aplicado (None sem jogos ou sem data)
+    def ultima_temporada(self):
+        temporadas = [int(t) for t in {e["chave"].split("|", 1)[0] for e in self.registro} if t.isdigit()]
+        return max(temporadas, default=None)
+
+    # ---------- Consultas ----------
+    def tabela(self):
+        tabela = pd.DataFrame.from_dict(self.times, orient="index")
+        tabela.index.name = "time"
+        return tabela.sort_values("elo", ascending=False)
+
+    def trajetoria(self, times=None):
+        historico = pd.DataFrame(self.historico, columns=["data", "rodada", "time", "elo", "ataque", "defesa"])
+        historico["data"] = pd.to_datetime(historico["data"])
+        return historico[historico["time"].isin(times)] if times is not None else historico
+
+    def prever(self, mandante, visitante):
+        novo = {"elo": ELO_INICIAL, "ataque": 0.0, "defesa": 0.0}
+        casa, fora = self.times.get(mandante, novo), self.times.get(visitante, novo)
+        esperado_elo = 1 / (1 + 10 ** ((fora["elo"] - casa["elo"] - ELO_MANDO) / 400))
+        lambda_m = math.exp(self.gols_casa + casa["ataque"] - fora["defesa"])
+        lambda_v = math.exp(self.gols_fora + fora["ataque"] - casa["defesa"])
+
+        gols = np.arange(MAX_GOLS + 1)
+        fatoriais = np.array([math.factorial(g) for g in gols], dtype=float)
+        p_m = np.exp(-lambda_m) * lambda_m ** gols / fatoriais
+        p_v = np.exp(-lambda_v) * lambda_v ** gols / fatoriais
+        placares = np.outer(p_m, p_v)
+        return {
+            "elo_esperado_mandante": esperado_elo,
+            "gols_esperados_mandante": lambda_m,
+            "gols_esperados_visitante": lambda_v,
+            "vitoria_mandante": float(np.tril(placares, -1).sum()),
+            "empate": float(np.trace(placares)),
+            "vitoria_visitante": float(np.triu(placares, 1).sum()),
+        }
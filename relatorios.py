@@ -0,0 +1,163 @@
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from esquema import ler_jogos
+from estatisticas import metricas_time, montar_partidas_por_time, resumir_times, tendencia_times
+
+# ---------- Relatório em lote (sem Streamlit) ----------
+# Gera, para cada time, o mesmo conteúdo de analisar_time do app: métricas e
+# os dois gráficos, em HTML estático (ou PNG, com kaleido instalado). As
+# métricas de todos os times saem de uma única passada agrupada no processo
+# principal; a montagem e a gravação dos gráficos de cada time rodam num pool
+# de processos. O plotly só é importado nos processos que montam gráficos
+# (graficos.py).
+#
+#   python relatorios.py jogos_atualizados.xlsx --saida relatorios --rodadas 1-10
+
+PASTA_RELATORIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relatorios")
+
+ROTULOS_METRICAS = [
+    ("Jogos", "jogos", "{}"),
+    ("Vitórias", "vitorias", "{}"),
+    ("Empates", "empates", "{}"),
+    ("Derrotas", "derrotas", "{}"),
+    ("Pontos", "pontos", "{}"),
+    ("Aproveitamento", "aproveitamento", "{:.2f}%"),
+    ("Saldo de Gols", "saldo", "{}"),
+    ("Gols Feitos (Total)", "gols_feitos", "{}"),
+    ("Gols Mandante", "gols_mandante", "{}"),
+    ("Gols Visitante", "gols_visitante", "{}"),
+    ("Gols Sofridos como Visitante", "gols_sofridos_visitante", "{}"),
+    ("Média Gols Mandante", "media_mandante", "{:.2f}"),
+    ("Média Gols Visitante", "media_visitante", "{:.2f}"),
+]
+
+
+def nome_arquivo(time_):
+    return re.sub(r"[^\w\-]+", "_", time_, flags=re.UNICODE).strip("_") or "time"
+
+
+# ---------- Núcleo importável ----------
+# Métricas e tendência de todos os times (sem gráficos): {time: (métricas, tendência)}
+def dados_relatorio(df_jogos, rodadas=None):
+    if rodadas:
+        df_jogos = df_jogos[df_jogos['rodada'].isin(rodadas)]
+    partidas = montar_partidas_por_time(df_jogos)
+    resumo = resumir_times(partidas)
+    tendencia = tendencia_times(partidas)
+    return {
+        time_: (metricas_time(resumo, time_), grupo[['rodada', 'data', 'tendencia']].reset_index(drop=True))
+        for time_, grupo in tendencia.groupby('time', sort=True)
+    }
+
+
+# Análise de um time pronta para exibir: métricas + as duas figuras em JSON.
+# Pura (só depende dos argumentos), então pode ser cacheada por
+# (versão dos jogos, time, rodadas); None quando o time não jogou nessas rodadas.
+def analise_time(df_jogos, time_, rodadas=None, eixo_x="rodada"):
+    from graficos import figura_resultados, figura_tendencia
+
+    jogos_time = df_jogos[(df_jogos['mandante'] == time_) | (df_jogos['visitante'] == time_)]
+    if rodadas:
+        jogos_time = jogos_time[jogos_time['rodada'].isin(rodadas)]
+    partidas = montar_partidas_por_time(jogos_time)
+    resumo = resumir_times(partidas)
+    if time_ not in resumo.index:
+        return None
+    m = metricas_time(resumo, time_)
+    tendencia = tendencia_times(partidas)
+    df_tendencia = tendencia[tendencia['time'] == time_]
+    return {
+        "metricas": m,
+        "figuras": [figura_resultados(m, time_).to_json(), figura_tendencia(df_tendencia, time_, eixo_x).to_json()],
+    }
+
+
+def html_time(time_, m, figuras):
+    itens = "".join(f"<li><b>{rotulo}:</b> {formato.format(m[chave])}</li>" for rotulo, chave, formato in ROTULOS_METRICAS)
+    graficos_html = "".join(fig.to_html(full_html=False, include_plotlyjs="cdn" if i == 0 else False)
+                            for i, fig in enumerate(figuras))
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(time_)}</title></head>"
+            f"<body><h2>Desempenho do {html.escape(time_)}</h2><ul>{itens}</ul>{graficos_html}</body></html>")
+
+
+# Roda em cada processo do pool: monta os gráficos de um time e grava os arquivos
+def gerar_relatorio_time(time_, m, df_tendencia, pasta, formatos=("html",)):
+    from graficos import figura_resultados, figura_tendencia
+
+    figuras = [figura_resultados(m, time_), figura_tendencia(df_tendencia, time_)]
+    base = os.path.join(pasta, nome_arquivo(time_))
+    arquivos = []
+    if "html" in formatos:
+        with open(f"{base}.html", "w", encoding="utf-8") as f:
+            f.write(html_time(time_, m, figuras))
+        arquivos.append(f"{base}.html")
+    if "png" in formatos:
+        for sufixo, fig in zip(["resultados", "tendencia"], figuras):
+            fig.write_image(f"{base}_{sufixo}.png")
+            arquivos.append(f"{base}_{sufixo}.png")
+    return arquivos
+
+
+def _gerar_lote(tarefas):
+    return [gerar_relatorio_time(*tarefa) for tarefa in tarefas]
+
+
+def gerar_relatorios(df_jogos, pasta=PASTA_RELATORIOS, rodadas=None, formatos=("html",), processos=None):
+    os.makedirs(pasta, exist_ok=True)
+    dados = dados_relatorio(df_jogos, rodadas)
+    tarefas = [(time_, m, df_tendencia, pasta, tuple(formatos)) for time_, (m, df_tendencia) in dados.items()]
+
+    processos = min(processos or os.cpu_count() or 1, len(tarefas)) or 1
+    if processos == 1:
+        arquivos = _gerar_lote(tarefas)
+    else:
+        # cada processo recebe uma fatia dos times (o import do plotly acontece uma vez por processo)
+        grupos = [tarefas[i::processos] for i in range(processos)]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            arquivos = [a for lote in executor.map(_gerar_lote, grupos) for a in lote]
+
+    # Índice com a tabela de todos os times e links para os relatórios individuais
+    linhas = "".join(
+        f"<tr><td><a href=\"{nome_arquivo(t)}.html\">{html.escape(t)}</a></td>"
+        + "".join(f"<td>{formato.format(m[chave])}</td>" for _, chave, formato in ROTULOS_METRICAS) + "</tr>"
+        for t, (m, _) in sorted(dados.items(), key=lambda item: -item[1][0]['pontos']))
+    cabecalho = "".join(f"<th>{rotulo}</th>" for rotulo, _, _ in ROTULOS_METRICAS)
+    with open(os.path.join(pasta, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Relatório</title></head><body>"
+                f"<table><tr><th>Time</th>{cabecalho}</tr>{linhas}</table></body></html>")
+    return arquivos
+
+
+# "1-10" ou "1,3,5" (ou "1-5,8") -> lista de rodadas; texto inválido levanta ValueError
+def intervalo_rodadas(texto):
+    rodadas = []
+    for parte in texto.split(","):
+        inicio, _, fim = parte.partition("-")
+        rodadas += list(range(int(inicio), int(fim or inicio) + 1))
+    return rodadas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o relatório de todos os times sem abrir o app.")
+    parser.add_argument("jogos", help="planilha de jogos (.xlsx/.csv)")
+    parser.add_argument("--saida", default=PASTA_RELATORIOS)
+    parser.add_argument("--rodadas", type=intervalo_rodadas, help="ex.: 1-10 ou 1,3,5 (padrão: todas)")
+    parser.add_argument("--formatos", nargs="+", choices=["html", "png"], default=["html"])
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    if "png" in args.formatos:
+        import importlib.util
+        if importlib.util.find_spec("kaleido") is None:
+            sys.exit("PNG exige o pacote kaleido (pip install kaleido).")
+
+    inicio = time.perf_counter()
+    df_jogos = ler_jogos(args.jogos)
+    arquivos = gerar_relatorios(df_jogos, args.saida, args.rodadas, args.formatos, args.processos)
+    print(f"{len(arquivos)} arquivo(s) em {args.saida} ({time.perf_counter() - inicio:.1f} s)")
@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from estatisticas import montar_partidas_por_time, resumir_times
+
+# ---------- Simulador Monte Carlo do restante da temporada ----------
+# 1) Ajusta força de ataque e de defesa de cada time (modelo de Poisson com
+#    fator casa) a partir dos jogos já disputados.
+# 2) Sorteia os placares dos jogos sem resultado em lotes NumPy
+#    (simulações x jogos) e soma pontos, vitórias, saldo e gols pró por
+#    multiplicação de matrizes.
+# 3) Ordena cada temporada simulada pelos critérios de desempate e conta em
+#    que posição cada time terminou.
+# Os lotes têm tamanho fixo e semente própria (SeedSequence.spawn), então o
+# resultado para uma mesma semente não depende de quantos processos rodaram.
+# Os processos são criados com "spawn", não "fork": o app chama o simulador de
+# dentro do servidor do Streamlit, que tem outras threads (recarga da base,
+# atualização da Wikipedia, SQLite), e um fork no meio de uma trava segurada
+# por uma delas deixaria o processo filho travado para sempre.
+
+TAMANHO_LOTE = 10_000
+PSEUDO_JOGOS = 3  # jogos "médios" somados a cada time para suavizar as forças no começo do campeonato
+
+
+# ---------- Forças de ataque/defesa ----------
+def ajustar_forcas(df_jogos, iteracoes=50):
+    partidas = montar_partidas_por_time(df_jogos)
+    jogadas = partidas[partidas['jogado'] & partidas['mandante']]
+    times = np.array(sorted(partidas['time'].unique()), dtype=object)
+    if jogadas.empty:
+        return times, np.ones(len(times)), np.ones(len(times)), 1.4, 1.1
+
+    casa = np.searchsorted(times, jogadas['time'].to_numpy(dtype=object))
+    fora = np.searchsorted(times, jogadas['adversario'].to_numpy(dtype=object))
+    gols_casa = jogadas['gols_pro'].to_numpy(dtype=float)
+    gols_fora = jogadas['gols_contra'].to_numpy(dtype=float)
+    media_casa, media_fora = gols_casa.mean(), gols_fora.mean()
+
+    n = len(times)
+    gols_feitos = np.bincount(casa, gols_casa, n) + np.bincount(fora, gols_fora, n)
+    gols_sofridos = np.bincount(casa, gols_fora, n) + np.bincount(fora, gols_casa, n)
+    ataque, defesa = np.ones(n), np.ones(n)
+    for _ in range(iteracoes):
+        # gols esperados de cada time se a força dele fosse 1
+        esperado_ataque = np.bincount(casa, media_casa * defesa[fora], n) + np.bincount(fora, media_fora * defesa[casa], n)
+        pseudo = PSEUDO_JOGOS * (media_casa + media_fora) / 2
+        ataque = (gols_feitos + pseudo) / (esperado_ataque + pseudo)
+        esperado_defesa = np.bincount(fora, media_casa * ataque[casa], n) + np.bincount(casa, media_fora * ataque[fora], n)
+        defesa = (gols_sofridos + pseudo) / (esperado_defesa + pseudo)
+    return times, ataque, defesa, media_casa, media_fora
+
+
+# ---------- Estado inicial e jogos restantes ----------
+def preparar_simulacao(df_jogos):
+    times, ataque, defesa, media_casa, media_fora = ajustar_forcas(df_jogos)
+    resumo = resumir_times(montar_partidas_por_time(df_jogos)).reindex(times, fill_value=0)
+    base = resumo[['pontos', 'vitorias', 'saldo', 'gols_feitos']].to_numpy(dtype=np.int32).T
+
+    gols_m = pd.to_numeric(df_jogos['gols_mandante'], errors='coerce')
+    gols_v = pd.to_numeric(df_jogos['gols_visitante'], errors='coerce')
+    restantes = df_jogos[gols_m.isna() | gols_v.isna()]
+    casa = np.searchsorted(times, restantes['mandante'].to_numpy(dtype=object))
+    fora = np.searchsorted(times, restantes['visitante'].to_numpy(dtype=object))
+    return {
+        'times': times,
+        'base': base,  # pontos, vitórias, saldo, gols pró (times)
+        'casa': casa,
+        'fora': fora,
+        'lambda_casa': media_casa * ataque[casa] * defesa[fora],
+        'lambda_fora': media_fora * ataque[fora] * defesa[casa],
+    }
+
+
+def _simular_lote(estado, n_simulacoes, semente):
+    rng = np.random.default_rng(semente)
+    n_times = len(estado['times'])
+    n_jogos = len(estado['casa'])
+    contagem = np.zeros((n_times, n_times), dtype=np.int64)
+
+    # matrizes (jogos x times) que levam o resultado de cada jogo ao mandante/visitante
+    mandante = np.zeros((n_jogos, n_times), dtype=np.float32)
+    visitante = np.zeros((n_jogos, n_times), dtype=np.float32)
+    mandante[np.arange(n_jogos), estado['casa']] = 1
+    visitante[np.arange(n_jogos), estado['fora']] = 1
+
+    gm = rng.poisson(estado['lambda_casa'], size=(n_simulacoes, n_jogos)).astype(np.float32)
+    gv = rng.poisson(estado['lambda_fora'], size=(n_simulacoes, n_jogos)).astype(np.float32)
+    vitoria_m = (gm > gv).astype(np.float32)
+    vitoria_v = (gv > gm).astype(np.float32)
+    empate = (gm == gv).astype(np.float32)
+
+    # somas inteiras pequenas: exatas em float32; a chave abaixo é montada em float64
+    pontos = ((3 * vitoria_m + empate) @ mandante + (3 * vitoria_v + empate) @ visitante).astype(np.float64)
+    vitorias = (vitoria_m @ mandante + vitoria_v @ visitante).astype(np.float64)
+    saldo = ((gm - gv) @ mandante + (gv - gm) @ visitante).astype(np.float64)
+    gols = (gm @ mandante + gv @ visitante).astype(np.float64)
+
+    base_pts, base_v, base_sg, base_gp = estado['base']
+    # chave única de ordenação: pontos > vitórias > saldo > gols pró > sorteio
+    chave = ((pontos + base_pts) * 1e9 + (vitorias + base_v) * 1e6
+             + (saldo + base_sg + 500) * 1e3 + np.minimum(gols + base_gp, 999)
+             + rng.random((n_simulacoes, n_times)))
+    ordem = np.argsort(-chave, axis=1)
+    posicoes = np.empty_like(ordem)
+    np.put_along_axis(posicoes, ordem, np.arange(n_times)[None, :].repeat(n_simulacoes, axis=0), axis=1)
+    contagem += np.bincount((np.arange(n_times)[None, :] * n_times + posicoes).ravel(),
+                            minlength=n_times * n_times).reshape(n_times, n_times)
+    return contagem
+
+
+def _simular_lotes(estado, lotes):
+    return sum(_simular_lote(estado, n, semente) for n, semente in lotes)
+
+
+def simular(df_jogos, n_simulacoes=100_000, semente=2025, processos=None, estado=None):
+    estado = estado if estado is not None else preparar_simulacao(df_jogos)
+    n_times = len(estado['times'])
+    tamanhos = [TAMANHO_LOTE] * (n_simulacoes // TAMANHO_LOTE)
+    if n_simulacoes % TAMANHO_LOTE:
+        tamanhos.append(n_simulacoes % TAMANHO_LOTE)
+    lotes = list(zip(tamanhos, np.random.SeedSequence(semente).spawn(len(tamanhos))))
+
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(lotes) == 1:
+        contagem = _simular_lotes(estado, lotes)
+    else:
+        grupos = [lotes[i::processos] for i in range(min(processos, len(lotes)))]
+        with ProcessPoolExecutor(max_workers=len(grupos), mp_context=multiprocessing.get_context("spawn")) as executor:
+            contagem = sum(executor.map(_simular_lotes, [estado] * len(grupos), grupos))
+
+    probabilidades = pd.DataFrame(contagem / n_simulacoes, index=estado['times'],
+                                  columns=np.arange(1, n_times + 1))
+    probabilidades.index.name = 'time'
+    return probabilidades
+
+
+# ---------- Zonas da tabela ----------
+# Lê a coluna "Classificação ou descenso" da tabela oficial: zona -> posições
+def zonas_por_posicao(df_class, coluna_posicao='Pos', coluna_zona='Classificação ou descenso'):
+    zonas = {'Título': [1]}
+    if df_class is None or not {coluna_posicao, coluna_zona} <= set(df_class.columns):
+        return zonas
+    for posicao, zona in zip(df_class[coluna_posicao], df_class[coluna_zona]):
+        if isinstance(zona, str) and zona.strip():
+            zonas.setdefault(zona.strip(), []).append(int(posicao))
+    return zonas
+
+
+def probabilidades_zonas(probabilidades, zonas):
+    return pd.DataFrame({
+        zona: probabilidades[[p for p in posicoes if p in probabilidades.columns]].sum(axis=1)
+        for zona, posicoes in zonas.items()
+    })
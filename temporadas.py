@@ -0,0 +1,129 @@
+import functools
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from armazenamento import ler_tabela
+from esquema import COLUNAS_JOGOS, normalizar_jogos
+
+# ---------- Base de jogos particionada por competição e temporada ----------
+# Cada (competição, temporada) vira um Parquet em dados/<competicao>/<ano>.parquet
+# e o catálogo (dados/catalogo.json) guarda um resumo de cada partição. As
+# consultas abrem só as partições pedidas (e, com pyarrow, só as linhas dos
+# times pedidos), então 20+ temporadas de histórico não precisam estar todas
+# na memória de cada sessão.
+
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+COMPETICAO_PADRAO = "serie_a"
+
+
+# Partições lidas ficam num LRU do processo (a chave inclui o mtime do arquivo)
+@functools.lru_cache(maxsize=32)
+def _ler_particao(caminho, mtime_ns, colunas, times):
+    filtros = None
+    if times:
+        filtros = [[('mandante', 'in', list(times))], [('visitante', 'in', list(times))]]
+    return pd.read_parquet(caminho, columns=list(colunas) if colunas else None, filters=filtros)
+
+
+class CatalogoTemporadas:
+    def __init__(self, pasta=PASTA_DADOS):
+        self.pasta = pasta
+        self.caminho_catalogo = os.path.join(pasta, "catalogo.json")
+        self._trava = threading.Lock()
+
+    def ler(self):
+        try:
+            with open(self.caminho_catalogo, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"particoes": []}
+
+    # Muda sempre que alguma partição é gravada (serve de chave para caches)
+    def versao(self):
+        try:
+            return os.stat(self.caminho_catalogo).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def particoes(self, competicoes=None, temporadas=None):
+        return [p for p in self.ler()["particoes"]
+                if (competicoes is None or p["competicao"] in competicoes)
+                and (temporadas is None or p["temporada"] in temporadas)]
+
+    def competicoes(self):
+        return sorted({p["competicao"] for p in self.ler()["particoes"]})
+
+    def temporadas(self, competicao=COMPETICAO_PADRAO):
+        return sorted(p["temporada"] for p in self.particoes([competicao]))
+
+    def _gravar_catalogo(self, catalogo):
+        temporario = f"{self.caminho_catalogo}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(catalogo, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho_catalogo)
+
+    # ---------- Escrita de partições ----------
+    def registrar(self, df_jogos, competicao, temporada):
+        df = normalizar_jogos(df_jogos)[COLUNAS_JOGOS]  # ErroEsquema (ValueError) se não couber no esquema
+
+        caminho = os.path.join(self.pasta, competicao, f"{temporada}.parquet")
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+
+        times = pd.unique(df[['mandante', 'visitante']].values.ravel('K'))
+        particao = {
+            "competicao": competicao,
+            "temporada": int(temporada),
+            "arquivo": os.path.relpath(caminho, self.pasta),
+            "jogos": int(len(df)),
+            "disputados": int(df['gols_mandante'].notna().sum()),
+            "times": sorted(str(t) for t in times if pd.notna(t)),
+            "rodadas": sorted(int(r) for r in df['rodada'].dropna().unique()),
+            "primeira_data": str(df['data'].min().date()) if len(df) else None,
+            "ultima_data": str(df['data'].max().date()) if len(df) else None,
+        }
+        with self._trava:
+            catalogo = self.ler()
+            catalogo["particoes"] = sorted(
+                [p for p in catalogo["particoes"] if (p["competicao"], p["temporada"]) != (competicao, int(temporada))]
+                + [particao],
+                key=lambda p: (p["competicao"], p["temporada"]))
+            self._gravar_catalogo(catalogo)
+        return particao
+
+    def importar_planilha(self, caminho, competicao, temporada):
+        return self.registrar(ler_tabela(caminho), competicao, temporada)
+
+    # ---------- Consulta ----------
+    # Junta as partições pedidas, com as colunas "competicao" e "temporada".
+    # "times" filtra as linhas na leitura (jogos em que algum deles participou)
+    # e também descarta partições em que nenhum deles jogou.
+    def carregar(self, competicoes=None, temporadas=None, colunas=None, times=None):
+        times = tuple(sorted(times)) if times else None
+        colunas = tuple(colunas) if colunas else None
+        frames = []
+        for p in self.particoes(competicoes, temporadas):
+            if times and not set(times) & set(p["times"]):
+                continue
+            caminho = os.path.join(self.pasta, p["arquivo"])
+            df = _ler_particao(caminho, os.stat(caminho).st_mtime_ns, colunas, times)
+            frames.append(df.assign(competicao=p["competicao"], temporada=p["temporada"]))
+        if not frames:
+            return pd.DataFrame(columns=list(colunas or COLUNAS_JOGOS) + ['competicao', 'temporada'])
+        jogos = pd.concat(frames, ignore_index=True)
+        # cada partição tem suas categorias de times; o frame junto volta a ter um categorical só
+        return normalizar_jogos(jogos) if set(COLUNAS_JOGOS) <= set(jogos.columns) else jogos
+
+
+if __name__ == "__main__":
+    # python temporadas.py <planilha de jogos> <competicao> <temporada>
+    if len(sys.argv) != 4:
+        sys.exit("uso: python temporadas.py <planilha de jogos> <competicao> <temporada>")
+    particao = CatalogoTemporadas().importar_planilha(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    print(f"{particao['competicao']} {particao['temporada']}: {particao['jogos']} jogos registrados")
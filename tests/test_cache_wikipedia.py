@@ -0,0 +1,146 @@
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_wikipedia import CacheWikipedia
+
+# ---------- Cache da Wikipedia contra um servidor HTTP local ----------
+# O servidor responde com o corpo e o ETag configurados no teste, 304 quando o
+# If-None-Match bate com o ETag atual, ou o status de erro configurado; cada
+# requisição fica registrada com o If-None-Match recebido.
+
+
+class ServidorStub:
+    def __init__(self):
+        self.corpo, self.etag, self.erro = "<html>v1</html>", '"v1"', None
+        self.requisicoes = []
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requisicoes.append(self.headers.get("If-None-Match"))
+                if stub.erro:
+                    self.send_response(stub.erro)
+                    self.end_headers()
+                    return
+                if self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                corpo = stub.corpo.encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", stub.etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}/pagina"
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def fechar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+class TesteCacheWikipedia(unittest.TestCase):
+    def setUp(self):
+        self.stub = ServidorStub()
+        self.pasta = tempfile.mkdtemp(prefix="cache_wikipedia_")
+
+    def tearDown(self):
+        self.stub.fechar()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def cache(self, **kwargs):
+        return CacheWikipedia(self.stub.url, self.pasta, timeout=5, **kwargs)
+
+    # obter() + espera da thread em segundo plano
+    def obter_e_esperar(self, cache):
+        resultado = cache.obter()
+        if cache._thread is not None:
+            cache._thread.join(5)
+        return resultado
+
+    def test_sem_copia_nao_bloqueia_e_baixa_em_segundo_plano(self):
+        cache = self.cache(ttl=3600)
+        self.assertEqual(self.obter_e_esperar(cache), (None, None))
+        html, versao = cache.obter()
+        self.assertEqual(html, "<html>v1</html>")
+        self.assertIsNotNone(versao)
+        self.assertEqual(self.stub.requisicoes, [None])
+
+    def test_dentro_do_ttl_nao_consulta_a_rede(self):
+        cache = self.cache(ttl=3600)
+        self.obter_e_esperar(cache)
+        for _ in range(3):
+            self.assertEqual(self.obter_e_esperar(cache)[0], "<html>v1</html>")
+        self.assertEqual(len(self.stub.requisicoes), 1)
+
+    def test_ttl_vencido_revalida_com_304(self):
+        cache = self.cache(ttl=0)
+        self.obter_e_esperar(cache)
+        consultado_em = cache.ler_meta()["consultado_em"]
+        html, versao = self.obter_e_esperar(cache)  # devolve a cópia e revalida em segundo plano
+        self.assertEqual(html, "<html>v1</html>")
+        self.assertEqual(self.stub.requisicoes, [None, '"v1"'])
+        self.assertGreater(cache.ler_meta()["consultado_em"], consultado_em)
+        self.assertEqual(cache.obter()[1], versao)
+
+    def test_ttl_vencido_com_pagina_nova(self):
+        cache = self.cache(ttl=0)
+        self.obter_e_esperar(cache)
+        self.stub.corpo, self.stub.etag = "<html>v2</html>", '"v2"'
+        html, versao = self.obter_e_esperar(cache)  # ainda a cópia antiga; a nova chega em segundo plano
+        self.assertEqual(html, "<html>v1</html>")
+        html, versao_nova = cache.obter()
+        self.assertEqual(html, "<html>v2</html>")
+        self.assertNotEqual(versao_nova, versao)
+
+    def test_falha_registra_erro_e_espera_antes_de_tentar_de_novo(self):
+        self.stub.erro = 503
+        cache = self.cache(ttl=3600, backoff=0.3)
+        self.assertEqual(self.obter_e_esperar(cache), (None, None))
+        self.assertIsNotNone(cache.ultimo_erro)
+        # durante a espera: nenhuma consulta nova e retorno imediato
+        inicio = time.perf_counter()
+        for _ in range(5):
+            self.assertEqual(self.obter_e_esperar(cache), (None, None))
+        self.assertLess(time.perf_counter() - inicio, 0.2)
+        self.assertEqual(len(self.stub.requisicoes), 1)
+        # a espera dobra a cada falha seguida
+        time.sleep(0.35)
+        self.obter_e_esperar(cache)
+        self.assertEqual((len(self.stub.requisicoes), cache.falhas), (2, 2))
+        self.assertGreater(cache.proxima_tentativa - time.time(), 0.4)
+        # servidor de volta: depois da espera, a cópia chega e o erro some
+        self.stub.erro = None
+        time.sleep(0.65)
+        self.obter_e_esperar(cache)
+        self.assertEqual(cache.obter()[0], "<html>v1</html>")
+        self.assertIsNone(cache.ultimo_erro)
+        self.assertEqual(cache.falhas, 0)
+
+    def test_falha_na_revalidacao_mantem_a_copia(self):
+        cache = self.cache(ttl=0, backoff=60)
+        self.obter_e_esperar(cache)
+        self.stub.erro = 500
+        for _ in range(3):
+            self.assertEqual(self.obter_e_esperar(cache)[0], "<html>v1</html>")
+        self.assertEqual(len(self.stub.requisicoes), 2)  # só uma tentativa até a espera vencer
+        self.assertIsNotNone(cache.ultimo_erro)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# ---------- Cadastro de usuários em SQLite ----------
+# Substitui a leitura/reescrita de usuarios_registrados.xlsx a cada login ou
+# cadastro. A coluna "usuario" tem índice único (busca O(log n) e nenhum
+# cadastro se perde quando dois chegam juntos), o banco roda em modo WAL para
+# várias sessões lerem ao mesmo tempo, e as senhas são guardadas com PBKDF2
+# salgado. O número de iterações é configurável; hashes antigos são refeitos
+# no próximo login bem-sucedido.
+
+PASTA_BASE = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_BANCO = os.path.join(PASTA_BASE, "usuarios.db")
+CAMINHO_XLSX_LEGADO = os.path.join(PASTA_BASE, "usuarios_registrados.xlsx")
+ITERACOES = int(os.environ.get("EVOLUTION_PBKDF2_ITERACOES", 600_000))
+ALGORITMO = "pbkdf2_sha256"
+SENHA_INUTILIZAVEL = "!"  # não é um hash válido: nenhuma senha confere (ex.: senha vazia na planilha antiga)
+
+_local = threading.local()
+
+
+# ---------- Hash de senha ----------
+def gerar_hash(senha, iteracoes=None):
+    iteracoes = iteracoes or ITERACOES
+    sal = secrets.token_bytes(16)
+    derivada = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), sal, iteracoes)
+    return "$".join([ALGORITMO, str(iteracoes),
+                     base64.b64encode(sal).decode("ascii"), base64.b64encode(derivada).decode("ascii")])
+
+
+def verificar_hash(senha, senha_hash):
+    try:
+        algoritmo, iteracoes, sal, esperado = senha_hash.split("$")
+    except ValueError:
+        return False
+    if algoritmo != ALGORITMO:
+        return False
+    derivada = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), base64.b64decode(sal), int(iteracoes))
+    return hmac.compare_digest(derivada, base64.b64decode(esperado))
+
+
+def precisa_refazer_hash(senha_hash):
+    return senha_hash.split("$")[1] != str(ITERACOES)
+
+
+# ---------- Conexão (uma por thread, reaproveitada entre execuções) ----------
+def conectar(caminho_banco=CAMINHO_BANCO):
+    conexoes = getattr(_local, "conexoes", None)
+    if conexoes is None:
+        conexoes = _local.conexoes = {}
+    conexao = conexoes.get(caminho_banco)
+    if conexao is None:
+        conexao = sqlite3.connect(caminho_banco, timeout=30, isolation_level=None)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS usuarios (
+                id INTEGER PRIMARY KEY,
+                usuario TEXT NOT NULL UNIQUE,
+                senha_hash TEXT NOT NULL,
+                criado_em TEXT NOT NULL
+            )""")
+        conexao.execute("CREATE TABLE IF NOT EXISTS migracoes (nome TEXT PRIMARY KEY, aplicada_em TEXT NOT NULL)")
+        conexoes[caminho_banco] = conexao
+    return conexao
+
+
+def registrar_usuario(nome, senha, caminho_banco=CAMINHO_BANCO):
+    conexao = conectar(caminho_banco)
+    try:
+        conexao.execute("INSERT INTO usuarios (usuario, senha_hash, criado_em) VALUES (?, ?, ?)",
+                        (nome, gerar_hash(senha), datetime.now().isoformat(timespec="seconds")))
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def autenticar_usuario(nome, senha, caminho_banco=CAMINHO_BANCO):
+    conexao = conectar(caminho_banco)
+    linha = conexao.execute("SELECT senha_hash FROM usuarios WHERE usuario = ?", (nome,)).fetchone()
+    if linha is None or not verificar_hash(senha, linha[0]):
+        return False
+    if precisa_refazer_hash(linha[0]):
+        conexao.execute("UPDATE usuarios SET senha_hash = ? WHERE usuario = ?", (gerar_hash(senha), nome))
+    return True
+
+
+# ---------- Migração única do usuarios_registrados.xlsx ----------
+# Roda uma vez por banco (fica registrada na tabela "migracoes"). Usuários já
+# existentes no banco são mantidos; as senhas em texto puro viram hash. Linha
+# sem senha nunca autenticava na planilha: o usuário é migrado (o nome segue
+# reservado) com um hash com que nenhuma senha confere.
+def migrar_xlsx(caminho_xlsx=CAMINHO_XLSX_LEGADO, caminho_banco=CAMINHO_BANCO):
+    conexao = conectar(caminho_banco)
+    nome_migracao = f"xlsx:{os.path.basename(caminho_xlsx)}"
+    if conexao.execute("SELECT 1 FROM migracoes WHERE nome = ?", (nome_migracao,)).fetchone():
+        return 0
+    if not os.path.exists(caminho_xlsx):
+        return 0
+
+    df = pd.read_excel(caminho_xlsx, dtype=str).dropna(subset=["usuario"])
+    agora = datetime.now().isoformat(timespec="seconds")
+    linhas = [(u, gerar_hash(s) if isinstance(s, str) else SENHA_INUTILIZAVEL, agora)
+              for u, s in zip(df["usuario"], df["senha"])]
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        antes = conexao.total_changes
+        conexao.executemany(
+            "INSERT OR IGNORE INTO usuarios (usuario, senha_hash, criado_em) VALUES (?, ?, ?)", linhas)
+        migrados = conexao.total_changes - antes
+        conexao.execute("INSERT OR IGNORE INTO migracoes (nome, aplicada_em) VALUES (?, ?)", (nome_migracao, agora))
+        conexao.execute("COMMIT")
+    except Exception:
+        conexao.execute("ROLLBACK")
+        raise
+    return migrados
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else CAMINHO_XLSX_LEGADO
+    print(f"{migrar_xlsx(caminho)} usuário(s) migrado(s) de {caminho} para {CAMINHO_BANCO}")